@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Скрипт автоподбора detection_size, frame_skip и потоков инференса.
+
+Параметры измеряются на кадрах источника на этой машине, результат
+сохраняется для хоста в autotune.file и применяется при запуске системы,
+если включен autotune.enabled:
+    python scripts/autotune.py --video "rtsp://.../subtype=1" --target-fps 12.5
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.core.autotune import calibrate, save_result
+from src.utils.config import config
+from src.utils.threads import configure_threads
+
+
+def parse_args():
+    """Парсинг аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Подбор параметров детекции под целевой FPS на этой машине"
+    )
+
+    parser.add_argument(
+        "--video",
+        "-v",
+        type=str,
+        default="test_video/video.mkv",
+        help="Источник кадров для замеров (файл или RTSP-поток камеры)",
+    )
+
+    parser.add_argument(
+        "--target-fps",
+        type=float,
+        default=None,
+        help="Целевая частота кадров источника (по умолчанию autotune.target_fps, "
+        "0 - частота источника)",
+    )
+
+    parser.add_argument(
+        "--target-latency",
+        type=float,
+        default=None,
+        help="Максимальная задержка детекции (95%%), мс "
+        "(по умолчанию autotune.target_latency_ms)",
+    )
+
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=None,
+        help="Количество кадров для замеров (по умолчанию autotune.frames)",
+    )
+
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Только показать результат, не сохранять",
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    """Основная функция."""
+    args = parse_args()
+
+    if args.target_fps is not None:
+        config.set("autotune.target_fps", args.target_fps, save=False)
+    if args.target_latency is not None:
+        config.set("autotune.target_latency_ms", args.target_latency, save=False)
+    if args.frames is not None:
+        config.set("autotune.frames", args.frames, save=False)
+
+    configure_threads()
+    result = calibrate(args.video)
+    if result is None:
+        print("Ошибка: автоподбор не выполнен")
+        return 1
+
+    print("\n" + "=" * 72)
+    print(
+        f"Цель: {result['target_fps']:.1f} FPS"
+        + (
+            f", задержка до {result['target_latency_ms']} мс"
+            if result["target_latency_ms"]
+            else ""
+        )
+        + f"; чтение кадра {result['read_ms']:.1f} мс"
+    )
+    print(
+        f"{'Вход':>5} {'Пропуск':>8} {'Потоки':>7} {'мс':>7} {'95%, мс':>8} "
+        f"{'FPS':>7} {'Полнота':>8}"
+    )
+    print("-" * 72)
+    chosen = result["settings"]
+    for item in result["candidates"]:
+        marker = (
+            " <- выбрано"
+            if item["detection_size"] == chosen["detection.detection_size"]
+            and item["frame_skip"] == chosen["detection.frame_skip"]
+            else ("" if item["meets_target"] else " (не успевает)")
+        )
+        print(
+            f"{item['detection_size']:>5} {item['frame_skip']:>8} {item['threads']:>7} "
+            f"{item['latency_ms']:>7.1f} {item['p95_ms']:>8.1f} {item['fps']:>7.1f} "
+            f"{item['recall']:>8.3f}{marker}"
+        )
+
+    print("\nВыбранные настройки:")
+    for key, value in chosen.items():
+        print(f"  {key}: {value}")
+
+    if not args.dry_run:
+        save_result(result)
+        print(
+            f"\nСохранено в {config.get('autotune.file', 'config/autotune.json')}; "
+            f"включите autotune.enabled, чтобы применять при запуске"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
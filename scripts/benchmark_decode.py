@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Скрипт для сравнения бэкендов декодирования видео (OpenCV и ffmpeg)."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import cv2
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.core.video import VideoReader
+from src.utils.config import config
+from src.utils.logger import logger
+
+
+def benchmark_backend(
+    name: str,
+    settings: Dict[str, Any],
+    video_source: str,
+    frames: int,
+    detection_size: int,
+) -> Dict[str, Any]:
+    """
+    Измеряет скорость получения кадров, готовых для детектора.
+
+    Args:
+        name: Название конфигурации
+        settings: Настройки видео (применяются только в памяти)
+        video_source: Путь к видео файлу
+        frames: Количество кадров для чтения
+        detection_size: Размер большей стороны кадра для детекции
+
+    Returns:
+        Словарь с результатами (кадров в секунду, размер кадра, байт на кадр)
+    """
+    for key, value in settings.items():
+        config.set(key, value, save=False)
+
+    reader = VideoReader(video_source)
+    if not reader.open():
+        logger.error(f"Не удалось открыть видео для конфигурации {name}")
+        return {"name": name, "fps": 0.0, "frames": 0, "shape": None, "bytes": 0}
+
+    shape = None
+    read_count = 0
+    start_time = time.perf_counter()
+    try:
+        while read_count < frames:
+            ret, frame = reader.read_frame()
+            if not ret:
+                break
+
+            # Для OpenCV кадр еще нужно уменьшить до размера детекции
+            height, width = frame.shape[:2]
+            if max(width, height) > detection_size:
+                scale = detection_size / max(width, height)
+                frame = cv2.resize(frame, (int(width * scale), int(height * scale)))
+
+            shape = frame.shape
+            read_count += 1
+    finally:
+        elapsed = time.perf_counter() - start_time
+        reader.close()
+
+    return {
+        "name": name,
+        "fps": read_count / elapsed if elapsed > 0 else 0.0,
+        "frames": read_count,
+        "shape": shape,
+        "bytes": reader.width * reader.height * 3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Сравнение cv2.VideoCapture и ffmpeg-процесса на тестовом видео"
+    )
+    parser.add_argument("--video", default="test_video/video.mkv", help="Видеофайл")
+    parser.add_argument("--frames", type=int, default=300, help="Кадров на тест")
+    parser.add_argument(
+        "--detection-size", type=int, default=640, help="Размер кадра для детекции"
+    )
+    args = parser.parse_args()
+
+    if not Path(args.video).exists():
+        print(f"Ошибка: Не найден видеофайл {args.video}")
+        return 1
+
+    common = {
+        "video.capture_mode": "sync",
+        "video.target_fps": 0,
+        "video.loop": False,
+    }
+    configurations = [
+        {
+            "name": "OpenCV (полный кадр + cv2.resize)",
+            "settings": {**common, "video.backend": "opencv"},
+        },
+        {
+            "name": "ffmpeg (полный кадр)",
+            "settings": {
+                **common,
+                "video.backend": "ffmpeg",
+                "video.ffmpeg.max_side": 0,
+            },
+        },
+        {
+            "name": "ffmpeg (scale в фильтре)",
+            "settings": {
+                **common,
+                "video.backend": "ffmpeg",
+                "video.ffmpeg.max_side": args.detection_size,
+            },
+        },
+    ]
+
+    print("\nБЕНЧМАРК ДЕКОДИРОВАНИЯ\n")
+    print(f"Используется видео: {args.video}, кадров на тест: {args.frames}\n")
+
+    results = []
+    for cfg in configurations:
+        result = benchmark_backend(
+            cfg["name"], cfg["settings"], args.video, args.frames, args.detection_size
+        )
+        results.append(result)
+        print(f"✓ {result['name']}: {result['fps']:.1f} кадров/с")
+
+    baseline_fps = results[0]["fps"] if results else 0.0
+
+    print("\nИТОГОВЫЕ РЕЗУЛЬТАТЫ:\n")
+    print(f"{'Конфигурация':<40} {'кадр/с':>8} {'Прирост':>10} {'КБ/кадр':>10}")
+    print("-" * 72)
+    for result in results:
+        improvement = (
+            (result["fps"] - baseline_fps) / baseline_fps * 100
+            if baseline_fps > 0
+            else 0
+        )
+        print(
+            f"{result['name']:<40} {result['fps']:>8.1f} {improvement:>9.1f}% "
+            f"{result['bytes'] / 1024:>10.0f}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
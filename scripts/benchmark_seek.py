@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Скрипт для измерения задержки перемотки VideoReader с индексом ключевых кадров и без него."""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import cv2
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.core.seek_index import KeyframeIndex
+from src.core.video import VideoReader
+from src.utils.config import config
+from src.utils.logger import logger
+
+
+def make_pattern(name: str, frame_count: int, seeks: int, seed: int) -> List[int]:
+    """
+    Построение последовательности номеров кадров для перемотки.
+
+    Args:
+        name: Тип последовательности ("random", "scrub", "step_back")
+        frame_count: Количество кадров в видео
+        seeks: Количество перемоток
+        seed: Начальное значение генератора случайных чисел
+
+    Returns:
+        Список номеров кадров
+    """
+    rng = random.Random(seed)
+    if name == "random":
+        return [rng.randrange(frame_count) for _ in range(seeks)]
+
+    start = rng.randrange(frame_count // 2)
+    if name == "scrub":
+        # Прокрутка вперед небольшими шагами, как в интерактивных инструментах
+        return [min(frame_count - 1, start + i * 5) for i in range(seeks)]
+    # Покадровый шаг назад
+    start = max(start, seeks)
+    return [start - i for i in range(seeks)]
+
+
+def benchmark_seek(
+    video_source: str,
+    pattern: List[int],
+    use_index: bool,
+    index: KeyframeIndex,
+) -> Dict[str, Any]:
+    """
+    Измерение задержки получения кадров по номерам.
+
+    Args:
+        video_source: Путь к видео файлу
+        pattern: Номера кадров
+        use_index: Использовать индекс ключевых кадров
+        index: Индекс для проверки точности попадания
+
+    Returns:
+        Словарь со средней, медианной и 95-перцентильной задержкой и числом промахов
+    """
+    config.set("video.seek_index", use_index, save=False)
+    config.set("video.backend", "opencv", save=False)
+    config.set("video.capture_mode", "sync", save=False)
+
+    reader = VideoReader(video_source)
+    if not reader.open():
+        logger.error("Не удалось открыть видео")
+        return {}
+
+    if use_index:
+        reader.get_seek_index()  # Построение индекса не входит в измерение
+
+    latencies = []
+    misses = 0
+    tolerance = 500.0 / index.fps if index.fps > 0 else 1.0
+    try:
+        for frame_index in pattern:
+            cached = reader.seek_stats["cached"]
+            start_time = time.perf_counter()
+            ret, _ = reader.get_frame_by_index(frame_index)
+            latencies.append((time.perf_counter() - start_time) * 1000.0)
+
+            # Кадр из кэша перемотки не сдвигает позицию захвата
+            if reader.seek_stats["cached"] > cached:
+                continue
+            landed = reader.cap.get(cv2.CAP_PROP_POS_MSEC)
+            if not ret or abs(landed - index.pts_of(frame_index)) > tolerance:
+                misses += 1
+        stats = dict(reader.seek_stats)
+    finally:
+        reader.close()
+
+    latencies.sort()
+    return {
+        "avg": sum(latencies) / len(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "misses": misses,
+        "stats": stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Задержка перемотки VideoReader с индексом ключевых кадров и без него"
+    )
+    parser.add_argument("--video", default="test_video/video.mkv", help="Видеофайл")
+    parser.add_argument("--seeks", type=int, default=40, help="Перемоток на тест")
+    parser.add_argument("--seed", type=int, default=1, help="Зерно случайных позиций")
+    args = parser.parse_args()
+
+    if not Path(args.video).exists():
+        print(f"Ошибка: Не найден видеофайл {args.video}")
+        return 1
+
+    start_time = time.perf_counter()
+    index = KeyframeIndex.load_or_build(args.video)
+    if index is None:
+        print("Ошибка: не удалось построить индекс ключевых кадров")
+        return 1
+    index_time = time.perf_counter() - start_time
+
+    print("\nБЕНЧМАРК ПЕРЕМОТКИ\n")
+    print(
+        f"Видео: {args.video}, кадров: {index.frame_count}, "
+        f"ключевых: {len(index.keyframes)}, индекс получен за {index_time * 1000:.0f} мс\n"
+    )
+    print(
+        f"{'Шаблон':<12} {'Режим':<12} {'сред. мс':>9} {'p50 мс':>8} "
+        f"{'p95 мс':>8} {'промахи':>8}"
+    )
+    print("-" * 62)
+
+    for pattern_name in ("random", "scrub", "step_back"):
+        pattern = make_pattern(pattern_name, index.frame_count, args.seeks, args.seed)
+        for use_index in (False, True):
+            result = benchmark_seek(args.video, pattern, use_index, index)
+            if not result:
+                return 1
+            mode = "индекс" if use_index else "POS_FRAMES"
+            print(
+                f"{pattern_name:<12} {mode:<12} {result['avg']:>9.1f} "
+                f"{result['p50']:>8.1f} {result['p95']:>8.1f} {result['misses']:>8}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Скрипт для декодирования клипа в кэш кадров .npy.
+
+Кэш используется как источник видео для повторяемых бенчмарков, например:
+    python scripts/cache_frames.py --video test_video/video.mkv --max-side 640
+    python scripts/benchmark_fps.py --frame-cache test_video/video_640.npy
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.core.frame_cache import build_frame_cache
+
+
+def parse_args():
+    """Парсинг аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Однократное декодирование клипа в кэш кадров (numpy memmap)"
+    )
+
+    parser.add_argument(
+        "--video", "-v", type=str, default="test_video/video.mkv", help="Видеофайл"
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        default=None,
+        help="Путь к кэшу (по умолчанию рядом с видео: <имя>_<размер>.npy)",
+    )
+
+    parser.add_argument(
+        "--max-side",
+        type=int,
+        default=640,
+        help="Размер большей стороны кадра (0 - исходное разрешение)",
+    )
+
+    parser.add_argument(
+        "--start-frame", type=int, default=0, help="Номер первого кадра клипа"
+    )
+
+    parser.add_argument(
+        "--frames", type=int, default=0, help="Количество кадров (0 - до конца видео)"
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    """Основная функция."""
+    args = parse_args()
+
+    video_path = Path(args.video)
+    if not video_path.exists():
+        print(f"Ошибка: Не найден видеофайл {video_path}")
+        return 1
+
+    output = args.output or str(
+        video_path.with_name(f"{video_path.stem}_{args.max_side or 'full'}.npy")
+    )
+
+    frames = build_frame_cache(
+        str(video_path), output, args.max_side, args.start_frame, args.frames
+    )
+    if frames == 0:
+        print("Ошибка: не удалось создать кэш кадров")
+        return 1
+
+    size_mb = Path(output).stat().st_size / (1024 * 1024)
+    print(f"Кэш кадров: {output} ({frames} кадров, {size_mb:.0f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
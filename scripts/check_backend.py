@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Скрипт для проверки совпадения детекций бэкенда с моделью ultralytics.
+
+Эталоном служит модель ultralytics (detection.model_path), проверяется
+бэкенд из --backend на кадрах из test_imgs/ и, при указании, из видео:
+    python scripts/check_backend.py --backend onnx --video test_video/video.mkv
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.core.detector_backend import (
+    DetectorBackend,
+    compare_detections,
+    create_backend,
+)
+from src.core.video import VideoReader
+from src.utils.config import ScopedConfig, config
+
+
+def parse_args():
+    """Парсинг аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Проверка детекций бэкенда относительно ultralytics"
+    )
+
+    parser.add_argument(
+        "--backend", "-b", type=str, default="onnx", help="Проверяемый бэкенд"
+    )
+
+    parser.add_argument(
+        "--images",
+        type=str,
+        default="test_imgs",
+        help="Папка с кадрами (*.jpg, *.png)",
+    )
+
+    parser.add_argument(
+        "--video",
+        "-v",
+        type=str,
+        default=None,
+        help="Видео для дополнительных кадров",
+    )
+
+    parser.add_argument(
+        "--frames", type=int, default=20, help="Количество кадров из видео"
+    )
+
+    parser.add_argument(
+        "--iou", type=float, default=0.5, help="Минимальный IoU совпадения рамок"
+    )
+
+    parser.add_argument(
+        "--min-recall",
+        type=float,
+        default=0.95,
+        help="Минимальная доля найденных эталонных детекций",
+    )
+
+    return parser.parse_args()
+
+
+def load_frames(images_dir: str, video: str, count: int) -> List[np.ndarray]:
+    """Загрузка кадров из папки и равномерно по видео."""
+    frames = []
+    for path in sorted(Path(images_dir).glob("*")):
+        if path.suffix.lower() in (".jpg", ".jpeg", ".png"):
+            frame = cv2.imread(str(path))
+            if frame is not None:
+                frames.append(frame)
+
+    if video and count > 0:
+        reader = VideoReader(video)
+        if reader.open():
+            step = max(1, reader.frame_count // count) if reader.frame_count > 0 else 1
+            for index in range(count):
+                ret, frame = reader.get_frame_by_index(index * step)
+                if not ret:
+                    break
+                frames.append(frame.copy())
+            reader.close()
+    return frames
+
+
+def run_backend(backend: DetectorBackend, frames: List[np.ndarray], conf: float):
+    """Детекция на всех кадрах с замером времени (первый кадр - прогрев)."""
+    backend.detect(frames[0], conf)
+    results = []
+    start_time = time.time()
+    for frame in frames:
+        results.append(backend.detect(frame, conf))
+    return results, (time.time() - start_time) / len(frames) * 1000
+
+
+def main():
+    """Основная функция."""
+    args = parse_args()
+
+    frames = load_frames(args.images, args.video, args.frames)
+    if not frames:
+        print("Ошибка: нет кадров для проверки")
+        return 1
+
+    conf = config.get("detection.confidence", 0.5)
+    reference = create_backend(
+        ScopedConfig(config, {"detection.backend": "ultralytics"})
+    )
+    candidate = create_backend(
+        ScopedConfig(config, {"detection.backend": args.backend})
+    )
+
+    reference_results, reference_ms = run_backend(reference, frames, conf)
+    candidate_results, candidate_ms = run_backend(candidate, frames, conf)
+
+    matched = total_reference = total_candidate = 0
+    ious = []
+    max_conf_diff = 0.0
+    for index, (ref, cand) in enumerate(zip(reference_results, candidate_results)):
+        stats = compare_detections(ref, cand, args.iou)
+        matched += stats["matched"]
+        total_reference += stats["reference"]
+        total_candidate += stats["candidate"]
+        if stats["matched"]:
+            ious.append(stats["mean_iou"])
+        max_conf_diff = max(max_conf_diff, stats["max_conf_diff"])
+        print(
+            f"Кадр {index}: эталон {stats['reference']}, "
+            f"{args.backend} {stats['candidate']}, совпало {stats['matched']}, IoU {stats['mean_iou']:.3f}"
+        )
+
+    recall = matched / total_reference if total_reference else 1.0
+    precision = matched / total_candidate if total_candidate else 1.0
+    print("\n" + "=" * 60)
+    print(f"Кадров: {len(frames)}, порог уверенности {conf}")
+    print(f"Полнота: {recall:.3f}, точность: {precision:.3f}")
+    print(f"Средний IoU: {np.mean(ious) if ious else 0.0:.3f}")
+    print(f"Максимальная разница уверенности: {max_conf_diff:.3f}")
+    print(
+        f"Время на кадр: ultralytics {reference_ms:.1f} мс, "
+        f"{args.backend} {candidate_ms:.1f} мс"
+    )
+
+    if recall < args.min_recall:
+        print(f"ОШИБКА: полнота ниже {args.min_recall}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,55 +1,57 @@
 #!/usr/bin/env python3
 """
-Скрипт для скачивания моделей YOLO в папку config.
+Скрипт для скачивания моделей YOLO в папку config и подготовки их вариантов.
+
+С флагом --build веса экспортируются в ONNX, OpenVINO, TorchScript и INT8
+для фиксированных размеров входа, детекции каждого варианта сверяются
+с исходной моделью на кадрах из test_imgs/, задержка измеряется на этой
+машине, а результаты записываются в манифест config/<модель>.manifest.json.
+При detection.backend: auto система использует самый быстрый вариант:
+
+    python scripts/download_model.py --build --sizes 640,416
 """
 
 import argparse
 import sys
 from pathlib import Path
 import shutil
+from typing import Any, Dict, List
+
+import cv2
+import numpy as np
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from ultralytics import YOLO
 
+from src.core.detector_backend import create_backend
+from src.core.model_manifest import measure_latency, save_manifest, select_artifact
+from src.core.quantization import evaluate_drift, quantize_model, sample_frames
+from src.utils.config import ScopedConfig, config
 
-def main():
+EXPORT_FORMATS = ("onnx", "openvino", "torchscript", "int8")
 
-    parser = argparse.ArgumentParser(
-        description="Скачивание моделей YOLO в папку config"
-    )
-    parser.add_argument(
-        "--model",
-        default="yolo11m.pt",
-        help="Название модели для скачивания (по умолчанию: yolo11m.pt)",
-    )
-    parser.add_argument(
-        "--force", action="store_true", help="Перезаписать существующую модель"
-    )
 
-    args = parser.parse_args()
+def download_model(name: str, model_path: Path) -> bool:
+    """
+    Скачивание весов модели в model_path.
 
-    config_dir = Path(__file__).parent.parent / "config"
-    config_dir.mkdir(exist_ok=True)
+    Args:
+        name: Название модели (например, yolo11m.pt)
+        model_path: Путь для сохранения
 
-    model_path = config_dir / args.model
-
-    if model_path.exists() and not args.force:
-        size_mb = model_path.stat().st_size / (1024 * 1024)
-        print(f"Модель {args.model} уже существует ({size_mb:.1f} MB)")
-        print(f"Путь: {model_path}")
-        print("Используйте --force для перезаписи")
-        return 0
-
-    print(f"Скачивание модели {args.model} в {model_path}...")
+    Returns:
+        True, если модель сохранена
+    """
+    print(f"Скачивание модели {name} в {model_path}...")
 
     try:
-        model = YOLO(args.model)
+        YOLO(name)
 
         possible_paths = [
-            Path.home() / ".cache" / "ultralytics" / args.model,
-            Path(args.model),
-            Path.cwd() / args.model,
+            Path.home() / ".cache" / "ultralytics" / name,
+            Path(name),
+            Path.cwd() / name,
         ]
 
         source_path = None
@@ -65,18 +67,328 @@ def main():
             size_mb = model_path.stat().st_size / (1024 * 1024)
             print(f"Размер модели: {size_mb:.1f} MB")
 
-            if source_path.name == args.model and source_path.parent == Path.cwd():
+            if source_path.name == name and source_path.parent == Path.cwd():
                 source_path.unlink()
                 print(f"Временный файл удален")
 
         else:
-            print(f"Не удалось найти скачанную модель {args.model}")
-            return 1
+            print(f"Не удалось найти скачанную модель {name}")
+            return False
 
     except Exception as e:
         print(f"Ошибка при скачивании модели: {str(e)}")
+        return False
+
+    return True
+
+
+def _move(source: str, target: Path) -> Path:
+    """Перенос результата экспорта ultralytics на место с размером в имени."""
+    if target.is_dir():
+        shutil.rmtree(target)
+    elif target.exists():
+        target.unlink()
+    shutil.move(source, target)
+    return target
+
+
+def export_artifacts(
+    model_path: Path,
+    sizes: List[int],
+    formats: List[str],
+    calibration: List[np.ndarray],
+) -> List[Dict[str, Any]]:
+    """
+    Экспорт весов в оптимизированные форматы для каждого размера входа.
+
+    Args:
+        model_path: Путь к весам .pt
+        sizes: Размеры входа
+        formats: Форматы из EXPORT_FORMATS
+        calibration: Калибровочные кадры для INT8
+
+    Returns:
+        Описания вариантов: backend, path, format, precision, input_size
+    """
+    model = YOLO(str(model_path))
+    stem = model_path.stem
+    artifacts = []
+
+    for size in sizes:
+        print(f"\nЭкспорт для размера входа {size}...")
+        prefix = model_path.with_name(f"{stem}_{size}")
+
+        onnx_path = None
+        if "onnx" in formats or "int8" in formats:
+            exported = model.export(format="onnx", imgsz=size, simplify=True)
+            onnx_path = _move(exported, prefix.with_suffix(".onnx"))
+            if "onnx" in formats:
+                artifacts.append(
+                    {"backend": "onnx", "path": str(onnx_path), "format": "onnx"}
+                )
+
+        if "openvino" in formats:
+            exported = model.export(format="openvino", imgsz=size)
+            directory = _move(
+                exported, model_path.with_name(f"{stem}_{size}_openvino_model")
+            )
+            artifacts.append(
+                {
+                    "backend": "openvino",
+                    "path": str(directory / f"{stem}.xml"),
+                    "format": "openvino",
+                }
+            )
+
+        if "torchscript" in formats:
+            exported = model.export(format="torchscript", imgsz=size)
+            artifacts.append(
+                {
+                    "backend": "ultralytics",
+                    "path": str(_move(exported, prefix.with_suffix(".torchscript"))),
+                    "format": "torchscript",
+                }
+            )
+
+        if "int8" in formats:
+            int8_path = model_path.with_name(f"{stem}_{size}_int8.onnx")
+            if quantize_model(str(onnx_path), str(int8_path), calibration):
+                # Модель QDQ выполняют и ONNX Runtime, и OpenVINO
+                for backend in ("onnx", "openvino"):
+                    artifacts.append(
+                        {
+                            "backend": backend,
+                            "path": str(int8_path),
+                            "format": "int8",
+                            "precision": "int8",
+                        }
+                    )
+            else:
+                print(f"Ошибка: INT8-квантование для размера {size} не выполнено")
+            if "onnx" not in formats:
+                onnx_path.unlink()  # Промежуточный экспорт только для квантования
+
+        for artifact in artifacts:
+            artifact.setdefault("input_size", size)
+            artifact.setdefault("precision", "fp32")
+
+    return artifacts
+
+
+def validate_artifacts(
+    model_path: Path,
+    artifacts: List[Dict[str, Any]],
+    frames: List[np.ndarray],
+    runs: int,
+    min_recall: float,
+) -> List[Dict[str, Any]]:
+    """
+    Сверка детекций вариантов с исходной моделью и измерение задержки.
+
+    Исходная модель .pt тоже попадает в манифест со своей задержкой, поэтому
+    она выбирается, если на этой машине экспорт не дает выигрыша.
+
+    Args:
+        model_path: Путь к весам .pt
+        artifacts: Описания вариантов из export_artifacts
+        frames: Кадры для проверки
+        runs: Количество замеров задержки
+        min_recall: Минимальные полнота и точность относительно исходной модели
+
+    Returns:
+        Описания вариантов с задержкой и результатами сверки
+    """
+    conf = config.get("detection.confidence", 0.5)
+    results = []
+    references = {}
+
+    def load(backend: str, path: str, size: int):
+        return create_backend(
+            ScopedConfig(
+                config,
+                {
+                    "detection": {
+                        "backend": backend,
+                        "model_path": path,
+                        "detection_size": size,
+                    }
+                },
+            )
+        )
+
+    for size in sorted({artifact["input_size"] for artifact in artifacts}):
+        reference = load("ultralytics", str(model_path), size)
+        references[size] = reference
+        results.append(
+            {
+                "backend": "ultralytics",
+                "path": str(model_path),
+                "format": "pytorch",
+                "precision": "fp32",
+                "input_size": size,
+                "valid": True,
+                **measure_latency(reference, frames, runs, conf),
+            }
+        )
+
+    for artifact in artifacts:
+        size = artifact["input_size"]
+        name = f"{artifact['format']} ({artifact['backend']}, {size})"
+        try:
+            backend = load(artifact["backend"], artifact["path"], size)
+            drift = evaluate_drift(references[size], backend, frames, conf)
+            latency = measure_latency(backend, frames, runs, conf)
+            backend.close()
+        except Exception as e:
+            print(f"{name}: ошибка проверки: {str(e)}")
+            continue
+
+        parity = {
+            key: drift[key]
+            for key in ("recall", "precision", "mean_iou", "max_conf_diff")
+        }
+        valid = parity["recall"] >= min_recall and parity["precision"] >= min_recall
+        results.append({**artifact, **latency, "valid": valid, "parity": parity})
+        if not valid:
+            print(
+                f"{name}: расхождение с исходной моделью, полнота "
+                f"{parity['recall']:.3f}, точность {parity['precision']:.3f}"
+            )
+
+    return results
+
+
+def load_sample_frames(directory: str = "test_imgs") -> List[np.ndarray]:
+    """Загрузка кадров для проверки из каталога изображений."""
+    frames = []
+    for path in sorted(Path(directory).glob("*")):
+        if path.suffix.lower() in (".jpg", ".jpeg", ".png"):
+            frame = cv2.imread(str(path))
+            if frame is not None:
+                frames.append(frame)
+    return frames
+
+
+def build(args, model_path: Path) -> int:
+    """Подготовка вариантов модели и запись манифеста."""
+    sizes = [int(size) for size in args.sizes.split(",")]
+    formats = [name.strip() for name in args.formats.split(",")]
+    unknown = set(formats) - set(EXPORT_FORMATS)
+    if unknown:
+        print(f"Неизвестные форматы: {', '.join(sorted(unknown))}")
+        return 1
+
+    frames = load_sample_frames(args.images)
+    if not frames:
+        print(f"Ошибка: нет изображений для проверки в {args.images}")
+        return 1
+
+    calibration = []
+    if "int8" in formats:
+        calibration = sample_frames(args.video, args.calibration_frames)
+        if not calibration:
+            print(f"Ошибка: не удалось получить калибровочные кадры из {args.video}")
+            return 1
+
+    artifacts = export_artifacts(model_path, sizes, formats, calibration)
+    results = validate_artifacts(
+        model_path, artifacts, frames, args.runs, args.min_recall
+    )
+    manifest = save_manifest(str(model_path), results)
+    if manifest is None:
+        return 1
+
+    print("\n" + "=" * 78)
+    print(f"{'Вариант':<40} {'вход':>5} {'мс/кадр':>8} {'95%, мс':>8} {'полнота':>9}")
+    print("-" * 78)
+    for result in sorted(results, key=lambda item: item["latency_ms"]):
+        name = f"{result['format']} ({result['backend']})"
+        recall = result.get("parity", {}).get("recall", 1.0)
+        print(
+            f"{name:<40} {result['input_size']:>5} {result['latency_ms']:>8.1f} "
+            f"{result['p95_ms']:>8.1f} {recall:>9.3f}"
+            + ("" if result["valid"] else "  (не прошел сверку)")
+        )
+
+    print(f"\nМанифест: {manifest}")
+    for size in sizes:
+        selected = select_artifact(str(model_path), size)
+        if selected is not None:
+            print(f"Размер {size}: будет использован {selected[1]} ({selected[0]})")
+    return 0
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Скачивание моделей YOLO в папку config"
+    )
+    parser.add_argument(
+        "--model",
+        default="yolo11m.pt",
+        help="Название модели для скачивания (по умолчанию: yolo11m.pt)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Перезаписать существующую модель"
+    )
+    parser.add_argument(
+        "--build",
+        action="store_true",
+        help="Экспортировать модель, проверить варианты и записать манифест",
+    )
+    parser.add_argument(
+        "--sizes",
+        default="640",
+        help="Размеры входа для экспорта через запятую (по умолчанию: 640)",
+    )
+    parser.add_argument(
+        "--formats",
+        default=",".join(EXPORT_FORMATS),
+        help=f"Форматы через запятую (по умолчанию: {','.join(EXPORT_FORMATS)})",
+    )
+    parser.add_argument(
+        "--images", default="test_imgs", help="Каталог кадров для сверки детекций"
+    )
+    parser.add_argument(
+        "--video",
+        default="test_video/video.mkv",
+        help="Видео для калибровки INT8",
+    )
+    parser.add_argument(
+        "--calibration-frames",
+        type=int,
+        default=200,
+        help="Количество калибровочных кадров INT8",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=20, help="Количество замеров задержки"
+    )
+    parser.add_argument(
+        "--min-recall",
+        type=float,
+        default=0.9,
+        help="Минимальные полнота и точность относительно исходной модели",
+    )
+
+    args = parser.parse_args()
+
+    config_dir = Path(__file__).parent.parent / "config"
+    config_dir.mkdir(exist_ok=True)
+
+    model_path = config_dir / args.model
+
+    if model_path.exists() and not args.force:
+        size_mb = model_path.stat().st_size / (1024 * 1024)
+        print(f"Модель {args.model} уже существует ({size_mb:.1f} MB)")
+        print(f"Путь: {model_path}")
+        if not args.build:
+            print("Используйте --force для перезаписи")
+            return 0
+    elif not download_model(args.model, model_path):
         return 1
 
+    if args.build:
+        return build(args, model_path)
     return 0
 
 
@@ -53,6 +53,8 @@ def main():
     print("Управление:")
     print("- ПРОБЕЛ: сохранить текущий кадр и выйти")
     print("- ESC или 'q': выйти без сохранения")
+    print("- ',' / '.': кадр назад / вперед (только для видеофайлов)")
+    print("- 'a' / 'd': секунда назад / вперед (только для видеофайлов)")
     print("- Любая другая клавиша: следующий кадр")
     print("=====================================")
 
@@ -61,11 +63,20 @@ def main():
 
     frame_saved = False
     current_frame = None
+    # Номер кадра для видеофайлов: перемотка выполняется по индексу ключевых кадров
+    position = 0
+    step = max(1, int(round(video_reader.fps)))
 
     try:
         while True:
 
-            success, frame = video_reader.read_frame()
+            if video_reader.is_live:
+                success, frame = video_reader.read_frame()
+                position = video_reader.current_frame_index
+            elif 0 < video_reader.frame_count <= position:
+                success = False
+            else:
+                success, frame = video_reader.get_frame_by_index(position)
 
             if not success:
                 logger.warning("Достигнут конец видео или ошибка чтения")
@@ -73,9 +84,7 @@ def main():
 
             current_frame = frame.copy()
 
-            info_text = (
-                f"Кадр: {video_reader.current_frame_index}/{video_reader.frame_count}"
-            )
+            info_text = f"Кадр: {position}/{video_reader.frame_count}"
             cv2.putText(
                 frame, info_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2
             )
@@ -102,9 +111,7 @@ def main():
                         output_path.parent.mkdir(parents=True, exist_ok=True)
 
                         if cv2.imwrite(str(output_path), current_frame):
-                            logger.info(
-                                f"Кадр {video_reader.current_frame_index} сохранен в {output_path}"
-                            )
+                            logger.info(f"Кадр {position} сохранен в {output_path}")
                             print(f"\nКадр сохранен: {output_path}")
                             frame_saved = True
                             break
@@ -117,6 +124,15 @@ def main():
                 print("\nВыход без сохранения")
                 break
 
+            elif key == ord(","):
+                position = max(0, position - 1)
+            elif key == ord("a"):
+                position = max(0, position - step)
+            elif key == ord("d"):
+                position += step
+            else:
+                position += 1
+
     except KeyboardInterrupt:
         print("\nПрервано пользователем")
 
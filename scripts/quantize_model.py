@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Скрипт для INT8-квантования детектора по кадрам из записанного видео.
+
+Калибровка выполняется на кадрах видео, точность проверяется на отложенных
+кадрах того же видео относительно FP32-модели:
+    python scripts/quantize_model.py --video test_video/video.mkv
+
+Полученная модель подключается через detection.model_path
+(например, config/yolo11m_int8.onnx, бэкенд onnx или openvino).
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.core.detector_backend import OnnxBackend, resolve_backend
+from src.core.quantization import (
+    CALIBRATION_METHODS,
+    evaluate_drift,
+    quantize_model,
+    sample_frames,
+)
+from src.utils.config import config
+
+
+def parse_args():
+    """Парсинг аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        description="INT8-квантование детектора с калибровкой по своему видео"
+    )
+
+    parser.add_argument(
+        "--model",
+        "-m",
+        type=str,
+        default=None,
+        help="FP32-модель .onnx (по умолчанию экспорт detection.model_path)",
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        default=None,
+        help="Путь к INT8-модели (по умолчанию <имя>_int8.onnx рядом с моделью)",
+    )
+
+    parser.add_argument(
+        "--video",
+        "-v",
+        type=str,
+        default="test_video/video.mkv",
+        help="Видео для калибровки",
+    )
+
+    parser.add_argument(
+        "--calibration-frames",
+        type=int,
+        default=200,
+        help="Количество калибровочных кадров",
+    )
+
+    parser.add_argument(
+        "--holdout-frames",
+        type=int,
+        default=50,
+        help="Количество отложенных кадров для проверки",
+    )
+
+    parser.add_argument(
+        "--method",
+        type=str,
+        default="minmax",
+        choices=CALIBRATION_METHODS,
+        help="Метод калибровки диапазонов активаций",
+    )
+
+    parser.add_argument(
+        "--per-tensor",
+        action="store_true",
+        help="Квантовать веса целиком по тензору (по умолчанию поканально)",
+    )
+
+    parser.add_argument(
+        "--quantize-head",
+        action="store_true",
+        help="Квантовать и голову Detect (по умолчанию она остается в FP32)",
+    )
+
+    parser.add_argument(
+        "--min-recall",
+        type=float,
+        default=0.95,
+        help="Минимальная полнота относительно FP32 для успешного завершения",
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    """Основная функция."""
+    args = parse_args()
+
+    try:
+        _, model_path = resolve_backend(
+            "onnx",
+            args.model or config.get("detection.model_path", "config/yolo11m.pt"),
+        )
+    except FileNotFoundError as e:
+        print(f"Ошибка: {e}")
+        return 1
+
+    output = args.output or str(
+        Path(model_path).with_name(f"{Path(model_path).stem}_int8.onnx")
+    )
+
+    calibration = sample_frames(args.video, args.calibration_frames)
+    # Отложенные кадры лежат между калибровочными и в калибровке не участвуют
+    holdout = sample_frames(args.video, args.holdout_frames, offset=0.5)
+    if not calibration or not holdout:
+        print("Ошибка: не удалось получить кадры из видео")
+        return 1
+
+    print(f"Квантование {model_path} по {len(calibration)} кадрам ({args.method})...")
+    if not quantize_model(
+        model_path,
+        output,
+        calibration,
+        method=args.method,
+        per_channel=not args.per_tensor,
+        keep_head_fp32=not args.quantize_head,
+    ):
+        print("Ошибка: квантование не выполнено")
+        return 1
+
+    input_size = config.get("detection.detection_size", 640)
+    report = evaluate_drift(
+        OnnxBackend(model_path, input_size),
+        OnnxBackend(output, input_size),
+        holdout,
+        conf=config.get("detection.confidence", 0.5),
+    )
+    report.update(
+        {
+            "model": model_path,
+            "quantized": output,
+            "video": args.video,
+            "calibration_frames": len(calibration),
+            "method": args.method,
+        }
+    )
+    report_path = Path(output).with_suffix(".report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+
+    print("\n" + "=" * 60)
+    print(f"INT8-модель: {output}")
+    print(f"Отложенных кадров: {report['frames']}")
+    print(
+        f"Детекций FP32: {report['reference_detections']}, "
+        f"INT8: {report['candidate_detections']}"
+    )
+    print(f"Полнота относительно FP32: {report['recall']:.3f}")
+    print(f"Точность относительно FP32: {report['precision']:.3f}")
+    print(f"Средний IoU: {report['mean_iou']:.3f}")
+    print(f"Максимальная разница уверенности: {report['max_conf_diff']:.3f}")
+    print(
+        f"Время на кадр: FP32 {report['reference_ms']:.1f} мс, "
+        f"INT8 {report['candidate_ms']:.1f} мс (ускорение x{report['speedup']:.2f})"
+    )
+    print(f"Отчет: {report_path}")
+    print(f"\nДля использования укажите detection.model_path: {output}")
+
+    if report["recall"] < args.min_recall:
+        print(f"ВНИМАНИЕ: полнота ниже {args.min_recall}, проверьте калибровку")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Скрипт для запуска процесса-декодера, публикующего кадры в разделяемую память.
+
+Читатели подключаются к буферу через источник вида "shm://<имя>", например:
+    python scripts/run_person_zone.py --video shm://cam1 --zones config/zones_rtsp.json
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.shared_frames import DecoderProcess
+from src.utils.config import config
+from src.utils.logger import logger
+
+
+def parse_args():
+    """Парсинг аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Процесс-декодер с кольцевым буфером кадров в разделяемой памяти"
+    )
+
+    parser.add_argument(
+        "--video", "-v", type=str, required=True, help="Путь к видеофайлу или RTSP-поток"
+    )
+
+    parser.add_argument(
+        "--name", "-n", type=str, default="cam1", help="Имя буфера кадров"
+    )
+
+    parser.add_argument(
+        "--slots",
+        "-s",
+        type=int,
+        default=None,
+        help="Количество слотов в кольце (по умолчанию video.shared_slots)",
+    )
+
+    parser.add_argument(
+        "--config",
+        "-c",
+        type=str,
+        default="config/config.yaml",
+        help="Путь к файлу конфигурации",
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    """Основная функция."""
+    args = parse_args()
+
+    config_path = Path(args.config)
+    if config_path.exists():
+        config.__init__(config_path)
+
+    slots = args.slots or config.get("video.shared_slots", 8)
+    decoder = DecoderProcess(args.video, args.name, slots=slots)
+    decoder.start()
+
+    try:
+        while decoder.is_alive():
+            time.sleep(1.0)
+        logger.warning("Процесс-декодер завершился")
+    except KeyboardInterrupt:
+        logger.info("Работа декодера прервана пользователем")
+    finally:
+        decoder.stop()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
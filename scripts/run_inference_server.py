@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Скрипт для запуска локального сервера инференса, общего для процессов камер.
+
+Процессы камер подключаются к серверу вместо загрузки собственной модели:
+    python scripts/run_inference_server.py
+    python scripts/run_person_zone.py --video "rtsp://..." --inference-server
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.inference_server import InferenceServerProcess
+from src.utils.config import config
+from src.utils.logger import logger
+from src.utils.threads import configure_threads
+
+
+def parse_args():
+    """Парсинг аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Локальный сервер инференса с пакетной обработкой запросов камер"
+    )
+
+    parser.add_argument(
+        "--address",
+        "-a",
+        type=str,
+        default=None,
+        help="Путь к сокету сервера (по умолчанию inference.server.address)",
+    )
+
+    parser.add_argument(
+        "--config",
+        "-c",
+        type=str,
+        default="config/config.yaml",
+        help="Путь к файлу конфигурации",
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    """Основная функция."""
+    args = parse_args()
+
+    config_path = Path(args.config)
+    if config_path.exists():
+        config.__init__(config_path)
+    configure_threads()
+
+    server = InferenceServerProcess(args.address)
+    server.start()
+
+    try:
+        while server.is_alive():
+            time.sleep(1.0)
+        logger.warning("Процесс сервера инференса завершился")
+    except KeyboardInterrupt:
+        logger.info("Работа сервера инференса прервана пользователем")
+    finally:
+        server.stop()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
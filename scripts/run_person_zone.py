@@ -11,9 +11,13 @@ from pathlib import Path
 # Добавляем корневую директорию проекта в PYTHONPATH
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+from src.core.autotune import autotune_on_startup
+from src.core.camera_manager import CameraManager
+from src.core.inference_server import InferenceClient
 from src.core.person_zone_system import PersonZoneSystem
 from src.utils.logger import logger
 from src.utils.config import config
+from src.utils.threads import configure_threads
 
 
 def parse_args():
@@ -28,6 +32,28 @@ def parse_args():
 
     parser.add_argument("--zones", "-z", type=str, help="Путь к файлу с зонами")
 
+    parser.add_argument(
+        "--presentation-video",
+        type=str,
+        help="Поток для отображения (основной поток камеры), если детекция идет по подпотоку",
+    )
+
+    parser.add_argument(
+        "--cameras",
+        action="store_true",
+        help="Запустить все камеры из секции cameras конфигурации в одном процессе",
+    )
+
+    parser.add_argument(
+        "--inference-server",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="ADDRESS",
+        help="Детекция через сервер инференса (scripts/run_inference_server.py) "
+        "вместо собственной модели; адрес по умолчанию inference.server.address",
+    )
+
     parser.add_argument(
         "--debug",
         "-d",
@@ -67,6 +93,11 @@ def main():
             logger.error(f"Файл конфигурации не найден: {config_path}")
             return 1
 
+    # Подобранные для хоста detection_size, frame_skip и потоки инференса
+    if config.get("autotune.enabled", False):
+        autotune_on_startup(args.video)
+    configure_threads()
+
     # Устанавливаем режим работы
     if args.debug and args.production:
         logger.error("Нельзя одновременно включить debug и production режимы")
@@ -83,8 +114,20 @@ def main():
         mode_text = "отладки" if debug_mode else "продакшн"
         logger.info(f"Используется режим из конфига: {mode_text}")
 
+    if args.cameras:
+        return run_cameras()
+
+    detector = None
+    if args.inference_server is not None:
+        detector = InferenceClient(args.inference_server or None)
+
     # Создаем и запускаем систему
-    system = PersonZoneSystem(video_source=args.video, zones_file=args.zones)
+    system = PersonZoneSystem(
+        video_source=args.video,
+        zones_file=args.zones,
+        presentation_source=args.presentation_video,
+        detector=detector,
+    )
 
     try:
         system.start()
@@ -95,6 +138,26 @@ def main():
         return 1
     finally:
         system.stop()
+        if detector is not None:
+            detector.close()
+
+    return 0
+
+
+def run_cameras():
+    """Запуск всех камер из конфигурации с общей моделью."""
+    try:
+        manager = CameraManager()
+    except Exception as e:
+        logger.error(f"Ошибка при создании менеджера камер: {str(e)}")
+        return 1
+
+    try:
+        manager.start()
+    except KeyboardInterrupt:
+        logger.info("Работа системы прервана пользователем")
+    finally:
+        manager.stop()
 
     return 0
 
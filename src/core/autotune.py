@@ -0,0 +1,382 @@
+"""
+Модуль автоподбора параметров детекции под целевую частоту кадров.
+
+На реальных кадрах источника измеряются чтение кадра и детекция для каждого
+размера входа из autotune.sizes и нескольких значений числа потоков
+инференса. Для каждого frame_skip из autotune.frame_skips по замерам
+оценивается, успевает ли система за источником:
+
+    частота = frame_skip / (frame_skip * чтение + детекция)
+
+Для живого источника частота ограничена частотой источника, а чтение
+учитывается, только если декодер не успевает за источником.
+
+Выбирается самая точная конфигурация (больший размер входа, затем меньший
+пропуск кадров), которая дает autotune.target_fps (0 - частота источника) и
+укладывается в autotune.target_latency_ms (0 - без ограничения). Результат
+сохраняется для хоста в autotune.file и применяется при запуске, если включен
+autotune.enabled.
+"""
+
+import json
+import platform
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.core.detector_backend import backend_options, compare_detections
+from src.core.inference import get_shared_model
+from src.core.video import VideoReader
+from src.utils.config import Config, ScopedConfig, config
+from src.utils.logger import logger
+from src.utils.threads import configure_torch, get_thread_budget
+
+def capture_frames(
+    source: str, count: int, settings: Optional[Union[Config, ScopedConfig]] = None
+) -> Tuple[List[np.ndarray], float, float, bool]:
+    """
+    Чтение подряд идущих кадров источника с оценкой затрат на декодирование.
+
+    Чтение синхронное, без фонового захвата. Для файла время чтения - это
+    время декодирования. Живой источник отдает кадры в своем темпе, и чтение
+    включает ожидание следующего кадра; если среднее время не превышает
+    интервала кадров больше чем на 10%, декодер успевает за источником, и
+    его затраты считаются нулевыми: при работе системы декодирование идет в
+    потоке захвата параллельно детекции.
+
+    Args:
+        source: Источник видео
+        count: Количество кадров
+        settings: Конфигурация (по умолчанию глобальная)
+
+    Returns:
+        Кортеж (кадры, время декодирования кадра в секундах, FPS источника,
+        признак живого источника)
+    """
+    settings = ScopedConfig(
+        settings or config,
+        {"video": {"capture_mode": "sync", "pacing": "asap", "target_fps": 0}},
+    )
+    reader = VideoReader(source, settings=settings)
+    if not reader.open():
+        return [], 0.0, 0.0, False
+
+    frames = []
+    start_time = time.perf_counter()
+    try:
+        while len(frames) < count:
+            ret, frame = reader.read_frame()
+            if not ret:
+                break
+            frames.append(frame.copy())
+    finally:
+        elapsed = time.perf_counter() - start_time
+        source_fps = reader.fps
+        live = reader.is_live
+        reader.close()
+
+    read_time = elapsed / len(frames) if frames else 0.0
+    if live and source_fps > 0 and read_time <= 1.1 / source_fps:
+        logger.info(
+            f"Чтение живого источника ограничено его частотой "
+            f"({read_time * 1000:.1f} мс на кадр), декодирование успевает"
+        )
+        read_time = 0.0
+    return frames, read_time, source_fps, live
+
+
+def _candidate_overrides(size: int, threads: int) -> Dict[str, Any]:
+    """Настройки кандидата поверх конфигурации."""
+    return {
+        "detection": {
+            "detection_size": size,
+            "onnx": {"intra_threads": threads},
+            "openvino": {"threads": threads},
+        },
+        "threads": {"inference": threads},
+    }
+
+
+def measure_candidate(
+    frames: List[np.ndarray],
+    size: int,
+    threads: int,
+    settings: Union[Config, ScopedConfig],
+) -> Optional[Dict[str, Any]]:
+    """
+    Замер детекции для размера входа и числа потоков.
+
+    Модель берется из реестра процесса: веса .pt загружаются один раз для
+    всех размеров и чисел потоков, а выбранный вариант используется системой
+    без повторной загрузки.
+
+    Args:
+        frames: Кадры источника
+        size: Размер входа (detection_size)
+        threads: Число потоков инференса
+        settings: Конфигурация
+
+    Returns:
+        Словарь с задержкой и детекциями или None, если модель не поддерживает
+        этот размер входа (экспорт с фиксированным входом другого размера)
+    """
+    overrides = _candidate_overrides(size, threads)
+    model = get_shared_model(ScopedConfig(settings, overrides))
+    input_size = model.backend.get_info().get("input_size", size)
+    if max(input_size if isinstance(input_size, tuple) else (input_size,)) != size:
+        logger.info(
+            f"Размер входа {size} пропущен: модель с фиксированным входом "
+            f"{input_size}"
+        )
+        return None
+
+    configure_torch(threads)
+    conf = settings.get("detection.confidence", 0.5)
+    latencies = []
+    detections = []
+    for frame in frames:
+        start_time = time.perf_counter()
+        detections.append(model.detect(frame, conf))
+        latencies.append(time.perf_counter() - start_time)
+
+    latencies.sort()
+    return {
+        "detection_size": size,
+        "threads": threads,
+        "latency_ms": float(np.mean(latencies)) * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "detections": detections,
+        "model": (model.backend.name, getattr(model.backend, "model_path", "")),
+        "fixed_input": getattr(model.backend, "fixed_input", False),
+    }
+
+
+def _recall(reference: List[np.ndarray], candidate: List[np.ndarray]) -> float:
+    """Доля детекций эталона, найденных кандидатом, по всем кадрам."""
+    matched = total = 0
+    for expected, actual in zip(reference, candidate):
+        stats = compare_detections(expected, actual)
+        matched += stats["matched"]
+        total += stats["reference"]
+    return matched / total if total else 1.0
+
+
+def calibrate(
+    source: str,
+    settings: Optional[Union[Config, ScopedConfig]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Подбор detection_size, frame_skip и числа потоков инференса.
+
+    Args:
+        source: Источник видео для замеров
+        settings: Конфигурация (по умолчанию глобальная)
+
+    Returns:
+        Результат: выбранные настройки, цели и замеры кандидатов, или None,
+        если не удалось прочитать кадры
+    """
+    settings = settings or config
+    frames, read_time, source_fps, live = capture_frames(
+        source, settings.get("autotune.frames", 30), settings
+    )
+    if not frames:
+        logger.error(f"Автоподбор: не удалось прочитать кадры из {source}")
+        return None
+
+    target_fps = settings.get("autotune.target_fps", 0) or source_fps or 25.0
+    target_latency_ms = settings.get("autotune.target_latency_ms", 0)
+    sizes = sorted(settings.get("autotune.sizes", [640, 512, 416, 320]), reverse=True)
+    frame_skips = sorted(settings.get("autotune.frame_skips", [1, 2, 3]))
+    budget = get_thread_budget()["inference"]
+    thread_options = sorted({budget, max(1, budget // 2)}, reverse=True)
+
+    logger.info(
+        f"Автоподбор на {len(frames)} кадрах {source}: цель {target_fps:.1f} FPS"
+        + (f", задержка до {target_latency_ms} мс" if target_latency_ms else "")
+        + f", чтение кадра {read_time * 1000:.1f} мс"
+    )
+
+    # Для каждого размера входа - самое быстрое число потоков
+    measured: Dict[int, Dict[str, Any]] = {}
+    # Модели с фиксированным входом, уже измеренные: (бэкенд, путь) -> размер
+    fixed_models: Dict[Tuple[str, str], int] = {}
+    for size in sizes:
+        for threads in thread_options:
+            overrides = _candidate_overrides(size, threads)
+            model = backend_options(ScopedConfig(settings, overrides))[:2]
+            if fixed_models.get(model, size) != size:
+                logger.info(
+                    f"Размер входа {size} пропущен: для него нет своего варианта "
+                    f"модели с фиксированным входом"
+                )
+                break
+            try:
+                result = measure_candidate(frames, size, threads, settings)
+            except Exception as e:
+                logger.warning(f"Автоподбор: ошибка замера размера {size}: {str(e)}")
+                continue
+            if result is None:
+                break
+            if result["fixed_input"]:
+                fixed_models[result["model"]] = size
+            best = measured.get(size)
+            if best is None or result["latency_ms"] < best["latency_ms"]:
+                measured[size] = result
+    if not measured:
+        logger.error("Автоподбор: ни один размер входа не удалось измерить")
+        return None
+
+    # Точность оценивается относительно самого большого размера входа
+    reference = measured[max(measured)]["detections"]
+    candidates = []
+    for size in sorted(measured, reverse=True):
+        result = measured[size]
+        recall = _recall(reference, result["detections"])
+        meets_latency = not target_latency_ms or result["p95_ms"] <= target_latency_ms
+        for frame_skip in frame_skips:
+            fps = frame_skip / (frame_skip * read_time + result["latency_ms"] / 1000)
+            if live and source_fps > 0:
+                # Живой источник не отдает кадры быстрее своей частоты
+                fps = min(fps, source_fps)
+            candidates.append(
+                {
+                    "detection_size": size,
+                    "frame_skip": frame_skip,
+                    "threads": result["threads"],
+                    "latency_ms": result["latency_ms"],
+                    "p95_ms": result["p95_ms"],
+                    "fps": fps,
+                    "recall": recall,
+                    "meets_target": fps >= target_fps and meets_latency,
+                }
+            )
+
+    # Кандидаты упорядочены по точности: первый подходящий - самый точный
+    chosen = next((item for item in candidates if item["meets_target"]), None)
+    if chosen is None:
+        chosen = max(candidates, key=lambda item: item["fps"])
+        logger.warning(
+            f"Автоподбор: цель {target_fps:.1f} FPS недостижима, выбрана самая "
+            f"быстрая конфигурация ({chosen['fps']:.1f} FPS)"
+        )
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "source": source,
+        "model_path": settings.get("detection.model_path", "config/yolo11m.pt"),
+        "backend": settings.get("detection.backend", "auto"),
+        "target_fps": target_fps,
+        "target_latency_ms": target_latency_ms,
+        "read_ms": read_time * 1000,
+        "settings": {
+            "detection.detection_size": chosen["detection_size"],
+            "detection.frame_skip": chosen["frame_skip"],
+            "threads.inference": chosen["threads"],
+        },
+        "candidates": candidates,
+    }
+
+
+def _result_path(settings: Union[Config, ScopedConfig]) -> Path:
+    return Path(settings.get("autotune.file", "config/autotune.json"))
+
+
+def save_result(
+    result: Dict[str, Any], settings: Optional[Union[Config, ScopedConfig]] = None
+) -> None:
+    """
+    Сохранение результата автоподбора для текущего хоста.
+
+    Args:
+        result: Результат calibrate()
+        settings: Конфигурация (по умолчанию глобальная)
+    """
+    path = _result_path(settings or config)
+    results = {}
+    if path.exists():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                results = json.load(f)
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать {path}, файл будет перезаписан: {e}")
+
+    results[platform.node()] = result
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4, ensure_ascii=False)
+    logger.info(f"Результат автоподбора сохранен в {path} для хоста {platform.node()}")
+
+
+def load_result(
+    settings: Optional[Union[Config, ScopedConfig]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Загрузка результата автоподбора для текущего хоста.
+
+    Результат, полученный для другой модели или бэкенда, не используется.
+
+    Args:
+        settings: Конфигурация (по умолчанию глобальная)
+
+    Returns:
+        Результат calibrate() или None
+    """
+    settings = settings or config
+    path = _result_path(settings)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            result = json.load(f).get(platform.node())
+    except Exception as e:
+        logger.error(f"Ошибка чтения результата автоподбора {path}: {str(e)}")
+        return None
+
+    if result is None:
+        return None
+    if result.get("model_path") != settings.get(
+        "detection.model_path", "config/yolo11m.pt"
+    ) or result.get("backend") != settings.get("detection.backend", "auto"):
+        logger.info(
+            "Результат автоподбора получен для другой модели, нужен новый подбор"
+        )
+        return None
+    return result
+
+
+def apply_result(result: Dict[str, Any]) -> None:
+    """
+    Применение подобранных настроек к глобальной конфигурации (без сохранения).
+
+    Args:
+        result: Результат calibrate()
+    """
+    for key, value in result["settings"].items():
+        config.set(key, value, save=False)
+    logger.info(
+        "Применены настройки автоподбора: "
+        + ", ".join(f"{key}={value}" for key, value in result["settings"].items())
+    )
+
+
+def autotune_on_startup(source: Optional[str]) -> None:
+    """
+    Применение сохраненного для хоста результата или подбор при его отсутствии.
+
+    Args:
+        source: Источник видео для замеров
+    """
+    result = load_result()
+    if result is None:
+        if not source:
+            logger.warning("Автоподбор пропущен: не указан источник видео")
+            return
+        result = calibrate(source)
+        if result is None:
+            return
+        save_result(result)
+    apply_result(result)
@@ -0,0 +1,490 @@
+"""
+Модуль трекера ByteTrack на numpy.
+
+Реализация алгоритма ByteTrack (Zhang et al., 2021) с теми же параметрами и
+поведением, что у трекера ultralytics, но без зависимости от ultralytics и
+torch: трекинг камеры не загружает torch при бэкендах ONNX и OpenVINO.
+
+Детекции сопоставляются с треками в два этапа: сначала детекции с высокой
+уверенностью (IoU, взвешенный уверенностью), затем оставшиеся треки с
+детекциями низкой уверенности. Движение треков предсказывается фильтром
+Калмана в пространстве (x, y, a, h) - центр, соотношение сторон, высота.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import lap
+except ImportError:  # Без lap используется жадное сопоставление
+    lap = None
+
+# Параметры по умолчанию (как в bytetrack.yaml ultralytics)
+DEFAULT_PARAMS: Dict[str, Any] = {
+    "track_high_thresh": 0.25,  # Порог первого этапа сопоставления
+    "track_low_thresh": 0.1,  # Порог второго этапа сопоставления
+    "new_track_thresh": 0.25,  # Порог создания трека из несопоставленной детекции
+    "track_buffer": 30,  # Время жизни потерянного трека в кадрах (при 30 FPS)
+    "match_thresh": 0.8,  # Порог стоимости сопоставления первого этапа
+    "fuse_score": True,  # Взвешивать IoU уверенностью детекции
+}
+
+
+class KalmanFilterXYAH:
+    """Фильтр Калмана с постоянной скоростью в пространстве (x, y, a, h)."""
+
+    def __init__(self):
+        ndim = 4
+        self._motion_mat = np.eye(2 * ndim)
+        for i in range(ndim):
+            self._motion_mat[i, ndim + i] = 1.0
+        self._update_mat = np.eye(ndim, 2 * ndim)
+        # Неопределенность положения и скорости относительно высоты рамки
+        self._std_weight_position = 1.0 / 20
+        self._std_weight_velocity = 1.0 / 160
+
+    def initiate(self, measurement: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Состояние нового трека по измерению (x, y, a, h)."""
+        mean = np.r_[measurement, np.zeros_like(measurement)]
+        height = measurement[3]
+        std = [
+            2 * self._std_weight_position * height,
+            2 * self._std_weight_position * height,
+            1e-2,
+            2 * self._std_weight_position * height,
+            10 * self._std_weight_velocity * height,
+            10 * self._std_weight_velocity * height,
+            1e-5,
+            10 * self._std_weight_velocity * height,
+        ]
+        return mean, np.diag(np.square(std))
+
+    def multi_predict(
+        self, mean: np.ndarray, covariance: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Предсказание состояний N треков на следующий кадр."""
+        height = mean[:, 3]
+        std_pos = [
+            self._std_weight_position * height,
+            self._std_weight_position * height,
+            1e-2 * np.ones_like(height),
+            self._std_weight_position * height,
+        ]
+        std_vel = [
+            self._std_weight_velocity * height,
+            self._std_weight_velocity * height,
+            1e-5 * np.ones_like(height),
+            self._std_weight_velocity * height,
+        ]
+        sqr = np.square(np.r_[std_pos, std_vel]).T
+        motion_cov = np.array([np.diag(item) for item in sqr])
+
+        mean = mean @ self._motion_mat.T
+        covariance = self._motion_mat @ covariance @ self._motion_mat.T + motion_cov
+        return mean, covariance
+
+    def update(
+        self, mean: np.ndarray, covariance: np.ndarray, measurement: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Коррекция состояния трека по измерению (x, y, a, h)."""
+        height = mean[3]
+        std = [
+            self._std_weight_position * height,
+            self._std_weight_position * height,
+            1e-1,
+            self._std_weight_position * height,
+        ]
+        projected_mean = self._update_mat @ mean
+        projected_cov = (
+            self._update_mat @ covariance @ self._update_mat.T
+            + np.diag(np.square(std))
+        )
+
+        kalman_gain = np.linalg.solve(
+            projected_cov, (covariance @ self._update_mat.T).T
+        ).T
+        innovation = measurement - projected_mean
+        mean = mean + innovation @ kalman_gain.T
+        covariance = covariance - kalman_gain @ projected_cov @ kalman_gain.T
+        return mean, covariance
+
+
+class TrackState:
+    """Состояния трека."""
+
+    NEW = 0
+    TRACKED = 1
+    LOST = 2
+    REMOVED = 3
+
+
+class STrack:
+    """Трек одного объекта."""
+
+    def __init__(self, xyxy: np.ndarray, score: float, cls: float, idx: int):
+        """
+        Инициализация трека по детекции.
+
+        Args:
+            xyxy: Рамка x1, y1, x2, y2
+            score: Уверенность детекции
+            cls: Класс
+            idx: Индекс детекции в кадре
+        """
+        self._tlwh = np.asarray(
+            [xyxy[0], xyxy[1], xyxy[2] - xyxy[0], xyxy[3] - xyxy[1]],
+            dtype=np.float64,
+        )
+        self.score = score
+        self.cls = cls
+        self.idx = idx
+        self.kalman_filter: Optional[KalmanFilterXYAH] = None
+        self.mean: Optional[np.ndarray] = None
+        self.covariance: Optional[np.ndarray] = None
+        self.state = TrackState.NEW
+        self.is_activated = False
+        self.track_id = 0
+        self.frame_id = 0
+        self.start_frame = 0
+        self.tracklet_len = 0
+
+    @property
+    def tlwh(self) -> np.ndarray:
+        """Рамка (x, y, w, h) по текущему состоянию."""
+        if self.mean is None:
+            return self._tlwh.copy()
+        ret = self.mean[:4].copy()
+        ret[2] *= ret[3]
+        ret[:2] -= ret[2:] / 2
+        return ret
+
+    @property
+    def xyxy(self) -> np.ndarray:
+        """Рамка (x1, y1, x2, y2) по текущему состоянию."""
+        ret = self.tlwh
+        ret[2:] += ret[:2]
+        return ret
+
+    @staticmethod
+    def tlwh_to_xyah(tlwh: np.ndarray) -> np.ndarray:
+        """Преобразование (x, y, w, h) в (центр x, центр y, w / h, h)."""
+        ret = np.asarray(tlwh, dtype=np.float64).copy()
+        ret[:2] += ret[2:] / 2
+        ret[2] /= ret[3]
+        return ret
+
+    @staticmethod
+    def multi_predict(
+        stracks: Sequence["STrack"], kalman_filter: KalmanFilterXYAH
+    ) -> None:
+        """Предсказание положения треков на текущем кадре."""
+        if not stracks:
+            return
+        mean = np.asarray([track.mean.copy() for track in stracks])
+        covariance = np.asarray([track.covariance for track in stracks])
+        for i, track in enumerate(stracks):
+            if track.state != TrackState.TRACKED:
+                mean[i][7] = 0  # Потерянный трек не меняет высоту
+        mean, covariance = kalman_filter.multi_predict(mean, covariance)
+        for i, track in enumerate(stracks):
+            track.mean = mean[i]
+            track.covariance = covariance[i]
+
+    def activate(
+        self, kalman_filter: KalmanFilterXYAH, frame_id: int, track_id: int
+    ) -> None:
+        """Создание трека из несопоставленной детекции."""
+        self.kalman_filter = kalman_filter
+        self.track_id = track_id
+        self.mean, self.covariance = kalman_filter.initiate(
+            self.tlwh_to_xyah(self._tlwh)
+        )
+        self.tracklet_len = 0
+        self.state = TrackState.TRACKED
+        # На первом кадре треки подтверждаются сразу, дальше - со второго
+        # сопоставления
+        self.is_activated = frame_id == 1
+        self.frame_id = frame_id
+        self.start_frame = frame_id
+
+    def update(self, detection: "STrack", frame_id: int) -> None:
+        """Обновление трека сопоставленной детекцией."""
+        self.frame_id = frame_id
+        self.tracklet_len += 1
+        self.mean, self.covariance = self.kalman_filter.update(
+            self.mean, self.covariance, self.tlwh_to_xyah(detection.tlwh)
+        )
+        self.state = TrackState.TRACKED
+        self.is_activated = True
+        self.score = detection.score
+        self.cls = detection.cls
+        self.idx = detection.idx
+
+    def re_activate(self, detection: "STrack", frame_id: int) -> None:
+        """Возобновление потерянного трека сопоставленной детекцией."""
+        self.update(detection, frame_id)
+        self.tracklet_len = 0
+
+    @property
+    def result(self) -> List[float]:
+        """Строка результата: x1, y1, x2, y2, track_id, score, cls, idx."""
+        return [*self.xyxy, self.track_id, self.score, self.cls, self.idx]
+
+
+def iou_distance(
+    atracks: Sequence[STrack], btracks: Sequence[STrack]
+) -> np.ndarray:
+    """Матрица стоимости 1 - IoU между рамками треков."""
+    cost = np.zeros((len(atracks), len(btracks)), dtype=np.float32)
+    if cost.size == 0:
+        return cost
+    a = np.asarray([track.xyxy for track in atracks], dtype=np.float32)
+    b = np.asarray([track.xyxy for track in btracks], dtype=np.float32)
+
+    inter_w = np.clip(
+        np.minimum(a[:, None, 2], b[None, :, 2])
+        - np.maximum(a[:, None, 0], b[None, :, 0]),
+        0,
+        None,
+    )
+    inter_h = np.clip(
+        np.minimum(a[:, None, 3], b[None, :, 3])
+        - np.maximum(a[:, None, 1], b[None, :, 1]),
+        0,
+        None,
+    )
+    inter = inter_w * inter_h
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return 1 - inter / np.maximum(union, 1e-7)
+
+
+def fuse_score(cost: np.ndarray, detections: Sequence[STrack]) -> np.ndarray:
+    """Взвешивание IoU уверенностью детекций."""
+    if cost.size == 0:
+        return cost
+    scores = np.asarray([det.score for det in detections], dtype=np.float32)
+    return 1 - (1 - cost) * scores[None, :]
+
+
+def linear_assignment(
+    cost: np.ndarray, thresh: float
+) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
+    """
+    Сопоставление строк и столбцов матрицы стоимости.
+
+    Используется lap.lapjv (как в ultralytics), а без него - жадное
+    сопоставление по возрастанию стоимости.
+
+    Args:
+        cost: Матрица стоимости (треки x детекции)
+        thresh: Максимальная стоимость сопоставленной пары
+
+    Returns:
+        Кортеж (пары, несопоставленные строки, несопоставленные столбцы)
+    """
+    rows, cols = cost.shape
+    if cost.size == 0:
+        return [], list(range(rows)), list(range(cols))
+
+    if lap is not None:
+        _, x, y = lap.lapjv(cost, extend_cost=True, cost_limit=thresh)
+        matches = [(i, int(j)) for i, j in enumerate(x) if j >= 0]
+        return (
+            matches,
+            [int(i) for i in np.where(x < 0)[0]],
+            [int(j) for j in np.where(y < 0)[0]],
+        )
+
+    matches = []
+    used_rows, used_cols = set(), set()
+    for index in np.argsort(cost, axis=None):
+        i, j = divmod(int(index), cols)
+        if cost[i, j] > thresh:
+            break
+        if i in used_rows or j in used_cols:
+            continue
+        matches.append((i, j))
+        used_rows.add(i)
+        used_cols.add(j)
+    return (
+        matches,
+        [i for i in range(rows) if i not in used_rows],
+        [j for j in range(cols) if j not in used_cols],
+    )
+
+
+def _joint(a: List[STrack], b: List[STrack]) -> List[STrack]:
+    """Объединение списков треков без повторов."""
+    ids = {track.track_id for track in a}
+    return a + [track for track in b if track.track_id not in ids]
+
+
+def _subtract(a: List[STrack], b: List[STrack]) -> List[STrack]:
+    """Треки из a, которых нет в b."""
+    ids = {track.track_id for track in b}
+    return [track for track in a if track.track_id not in ids]
+
+
+def _remove_duplicates(
+    tracked: List[STrack], lost: List[STrack]
+) -> Tuple[List[STrack], List[STrack]]:
+    """Удаление совпадающих треков: остается трек с большей историей."""
+    distances = iou_distance(tracked, lost)
+    duplicates_a, duplicates_b = set(), set()
+    for p, q in zip(*np.where(distances < 0.15)):
+        age_p = tracked[p].frame_id - tracked[p].start_frame
+        age_q = lost[q].frame_id - lost[q].start_frame
+        if age_p > age_q:
+            duplicates_b.add(q)
+        else:
+            duplicates_a.add(p)
+    return (
+        [track for i, track in enumerate(tracked) if i not in duplicates_a],
+        [track for i, track in enumerate(lost) if i not in duplicates_b],
+    )
+
+
+class BYTETracker:
+    """Трекер ByteTrack."""
+
+    def __init__(self, params: Optional[Dict[str, Any]] = None, frame_rate: int = 30):
+        """
+        Инициализация трекера.
+
+        Args:
+            params: Параметры поверх DEFAULT_PARAMS
+            frame_rate: Частота обрабатываемых кадров
+        """
+        self.params = {**DEFAULT_PARAMS, **(params or {})}
+        self.max_time_lost = int(frame_rate / 30.0 * self.params["track_buffer"])
+        self.kalman_filter = KalmanFilterXYAH()
+        self._next_id = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Сброс треков (нумерация треков продолжается)."""
+        self.tracked_stracks: List[STrack] = []
+        self.lost_stracks: List[STrack] = []
+        self.frame_id = 0
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def _distances(self, tracks: List[STrack], detections: List[STrack]) -> np.ndarray:
+        cost = iou_distance(tracks, detections)
+        if self.params["fuse_score"]:
+            cost = fuse_score(cost, detections)
+        return cost
+
+    def update(self, detections: np.ndarray) -> np.ndarray:
+        """
+        Обновление треков по детекциям кадра.
+
+        Args:
+            detections: Массив (N, 6): x1, y1, x2, y2, confidence, class
+
+        Returns:
+            Массив (M, 8): x1, y1, x2, y2, track_id, confidence, class, индекс
+            детекции для подтвержденных треков
+        """
+        params = self.params
+        self.frame_id += 1
+        activated: List[STrack] = []
+        refound: List[STrack] = []
+        lost: List[STrack] = []
+        removed: List[STrack] = []
+
+        detections = np.asarray(detections, dtype=np.float32).reshape(-1, 6)
+        scores = detections[:, 4]
+        high = scores >= params["track_high_thresh"]
+        low = (scores > params["track_low_thresh"]) & ~high
+
+        def make(mask: np.ndarray) -> List[STrack]:
+            return [
+                STrack(detections[i, :4], float(detections[i, 4]), detections[i, 5], i)
+                for i in np.where(mask)[0]
+            ]
+
+        first = make(high)
+        unconfirmed = [t for t in self.tracked_stracks if not t.is_activated]
+        tracked = [t for t in self.tracked_stracks if t.is_activated]
+
+        # Первый этап: детекции высокой уверенности со всеми треками
+        pool = _joint(tracked, self.lost_stracks)
+        STrack.multi_predict(pool, self.kalman_filter)
+        matches, unmatched_tracks, unmatched_first = linear_assignment(
+            self._distances(pool, first), params["match_thresh"]
+        )
+        for i, j in matches:
+            track = pool[i]
+            if track.state == TrackState.TRACKED:
+                track.update(first[j], self.frame_id)
+                activated.append(track)
+            else:
+                track.re_activate(first[j], self.frame_id)
+                refound.append(track)
+
+        # Второй этап: оставшиеся треки с детекциями низкой уверенности
+        second = make(low)
+        remaining = [
+            pool[i] for i in unmatched_tracks if pool[i].state == TrackState.TRACKED
+        ]
+        matches, unmatched_tracks, _ = linear_assignment(
+            iou_distance(remaining, second), 0.5
+        )
+        for i, j in matches:
+            track = remaining[i]
+            if track.state == TrackState.TRACKED:
+                track.update(second[j], self.frame_id)
+                activated.append(track)
+            else:
+                track.re_activate(second[j], self.frame_id)
+                refound.append(track)
+        for i in unmatched_tracks:
+            track = remaining[i]
+            if track.state != TrackState.LOST:
+                track.state = TrackState.LOST
+                lost.append(track)
+
+        # Неподтвержденные треки (появились на прошлом кадре)
+        first = [first[j] for j in unmatched_first]
+        matches, unmatched_unconfirmed, unmatched_first = linear_assignment(
+            self._distances(unconfirmed, first), 0.7
+        )
+        for i, j in matches:
+            unconfirmed[i].update(first[j], self.frame_id)
+            activated.append(unconfirmed[i])
+        for i in unmatched_unconfirmed:
+            unconfirmed[i].state = TrackState.REMOVED
+            removed.append(unconfirmed[i])
+
+        # Новые треки
+        for j in unmatched_first:
+            track = first[j]
+            if track.score >= params["new_track_thresh"]:
+                track.activate(self.kalman_filter, self.frame_id, self._new_id())
+                activated.append(track)
+
+        for track in self.lost_stracks:
+            if self.frame_id - track.frame_id > self.max_time_lost:
+                track.state = TrackState.REMOVED
+                removed.append(track)
+
+        self.tracked_stracks = [
+            t for t in self.tracked_stracks if t.state == TrackState.TRACKED
+        ]
+        self.tracked_stracks = _joint(self.tracked_stracks, activated)
+        self.tracked_stracks = _joint(self.tracked_stracks, refound)
+        self.lost_stracks = _subtract(self.lost_stracks, self.tracked_stracks)
+        self.lost_stracks.extend(lost)
+        self.lost_stracks = _subtract(self.lost_stracks, removed)
+        self.tracked_stracks, self.lost_stracks = _remove_duplicates(
+            self.tracked_stracks, self.lost_stracks
+        )
+
+        results = [t.result for t in self.tracked_stracks if t.is_activated]
+        return np.asarray(results, dtype=np.float32).reshape(-1, 8)
@@ -0,0 +1,206 @@
+"""
+Модуль запуска нескольких камер в одном процессе.
+
+Камеры описываются в секции cameras конфигурации:
+
+    cameras:
+      - name: entrance
+        source: rtsp://.../subtype=1
+        zones: config/zones_entrance.json
+        presentation_source: null
+        overrides:
+          detection:
+            frame_skip: 2
+
+Все камеры используют одну загруженную модель и один клиент API,
+каждая камера обрабатывается в собственном потоке. Параметры модели
+(MODEL_KEYS) общие и задаются только в основной конфигурации: их
+переопределения для камеры игнорируются с предупреждением. При включенном
+inference.batching кадры камер объединяются в пачки планировщиком
+InferenceScheduler.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.api.client import ApiClient
+from src.core.inference import InferenceScheduler, get_shared_model
+from src.core.person_zone_system import PersonZoneSystem
+from src.utils.config import ScopedConfig, config
+from src.utils.logger import logger
+
+# Параметры общей модели (см. backend_options): переопределения камер не применяются
+MODEL_KEYS = (
+    "detection.backend",
+    "detection.model_path",
+    "detection.detection_size",
+    "detection.iou",
+    "detection.onnx",
+    "detection.openvino",
+    "inference.torchscript_cache",
+    "inference.cache_dir",
+)
+
+
+class CameraManager:
+    """Менеджер камер с общей моделью и общим клиентом API."""
+
+    def __init__(self, cameras: Optional[List[Dict[str, Any]]] = None):
+        """
+        Инициализация менеджера.
+
+        Args:
+            cameras: Описания камер (по умолчанию из секции cameras конфигурации)
+        """
+        cameras = config.get("cameras", []) if cameras is None else cameras
+        if not cameras:
+            raise ValueError("В конфигурации не описано ни одной камеры (cameras)")
+
+        self.stats_interval = config.get("debug.camera_stats_interval", 30.0)
+        self.model = get_shared_model()
+        self.scheduler: Optional[InferenceScheduler] = None
+        if config.get("inference.batching", True) and len(cameras) > 1:
+            self.scheduler = InferenceScheduler(
+                self.model,
+                max_batch=config.get("inference.max_batch", 8),
+                max_wait=config.get("inference.max_wait", 0.01),
+            )
+        self.detector = self.scheduler or self.model
+        self.api_client = ApiClient()
+
+        self.systems: List[PersonZoneSystem] = []
+        for index, camera in enumerate(cameras):
+            name = camera.get("name") or f"camera_{index}"
+            if not camera.get("source"):
+                raise ValueError(f"Для камеры {name} не указан source")
+            if any(system.name == name for system in self.systems):
+                raise ValueError(f"Повторяющееся имя камеры: {name}")
+
+            settings = ScopedConfig(config, camera.get("overrides") or {})
+            _drop_model_overrides(settings, name)
+            # Окна OpenCV и опрос клавиатуры работают только в главном потоке
+            settings.set("debug.enable_keys", False)
+
+            self.systems.append(
+                PersonZoneSystem(
+                    video_source=camera["source"],
+                    zones_file=camera.get("zones"),
+                    presentation_source=camera.get("presentation_source"),
+                    name=name,
+                    settings=settings,
+                    detector=self.detector,
+                    api_client=self.api_client,
+                )
+            )
+
+        self._threads: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+        logger.info(
+            f"CameraManager: {len(self.systems)} камер, общая модель и клиент API"
+        )
+
+    def start(self) -> None:
+        """Запуск всех камер и ожидание их завершения."""
+        for system in self.systems:
+            thread = threading.Thread(
+                target=self._run_camera,
+                args=(system,),
+                name=f"camera-{system.name}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        last_stats_time = time.time()
+        try:
+            while not self._stop_event.wait(1.0):
+                if not any(thread.is_alive() for thread in self._threads):
+                    logger.info("Все камеры завершили работу")
+                    break
+                if time.time() - last_stats_time >= self.stats_interval:
+                    self._log_stats()
+                    last_stats_time = time.time()
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Остановка всех камер и клиента API."""
+        if self._stop_event.is_set():
+            return
+        self._stop_event.set()
+
+        for system in self.systems:
+            system.is_running = False
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+
+        if self.scheduler is not None:
+            self.scheduler.close()
+        self._log_stats()
+        self.api_client.reset()
+        logger.info("CameraManager остановлен")
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        Получение статистики всех камер.
+
+        Returns:
+            Список словарей статистики PersonZoneSystem.get_stats()
+        """
+        return [system.get_stats() for system in self.systems]
+
+    def _run_camera(self, system: PersonZoneSystem) -> None:
+        """Обработка одной камеры в отдельном потоке."""
+        if self.scheduler is not None:
+            self.scheduler.register_client()
+        try:
+            system.start()
+        except Exception as e:
+            logger.error(f"Ошибка при работе камеры {system.name}: {str(e)}")
+        finally:
+            if self.scheduler is not None:
+                self.scheduler.unregister_client()
+
+    def _log_stats(self) -> None:
+        """Логирование FPS и задержки каждой камеры и статистики пакетов."""
+        if self.scheduler is not None:
+            stats = self.scheduler.get_stats()
+            logger.info(
+                f"Пакетный инференс: пачек={stats['batches']}, "
+                f"средний размер={stats['avg_batch_size']:.2f}, "
+                f"размеры={stats['batch_sizes']}, ожидание, мс={stats['wait_ms']}"
+            )
+        for stats in self.get_stats():
+            logger.info(
+                f"Камера {stats['name']}: {stats['frames']} кадров, "
+                f"FPS={stats['fps']:.1f}, задержка: средняя={stats['latency_ms']:.0f} мс, "
+                f"95%={stats['latency_p95_ms']:.0f} мс, "
+                f"вход={stats['detection_size']}"
+                + ("" if stats["running"] else " (остановлена)")
+            )
+
+
+def _drop_model_overrides(settings: ScopedConfig, name: str) -> None:
+    """
+    Удаление переопределений параметров общей модели из настроек камеры.
+
+    Args:
+        settings: Настройки камеры
+        name: Имя камеры
+    """
+    for key in MODEL_KEYS:
+        *parents, last = key.split(".")
+        section = settings.overrides
+        for part in parents:
+            section = section.get(part)
+            if not isinstance(section, dict):
+                break
+        else:
+            if last in section:
+                del section[last]
+                logger.warning(
+                    f"Камера {name}: переопределение {key} не применяется - "
+                    f"модель общая для всех камер, задайте {key} в основной "
+                    f"конфигурации"
+                )
@@ -0,0 +1,235 @@
+"""
+Модуль супервизора подключения к видеопотоку.
+
+Переподключается к источнику с экспоненциальной задержкой и случайным
+разбросом, не затрагивая модель, трекер и API-клиент. Может держать
+заранее открытое резервное подключение для быстрого переключения и
+собирает метрики обрывов связи.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from src.utils.logger import logger
+
+
+class ConnectionSupervisor:
+    """Супервизор подключения с переподключением и резервным захватом."""
+
+    def __init__(
+        self,
+        open_fn: Callable[[], Optional[Any]],
+        initial_delay: float = 0.5,
+        max_delay: float = 30.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.3,
+        max_attempts: int = 0,
+        standby: bool = False,
+        history_size: int = 100,
+    ):
+        """
+        Инициализация супервизора.
+
+        Args:
+            open_fn: Функция открытия нового захвата, возвращает открытый захват или None
+            initial_delay: Задержка перед первой повторной попыткой в секундах
+            max_delay: Максимальная задержка между попытками в секундах
+            multiplier: Множитель экспоненциального роста задержки
+            jitter: Относительный случайный разброс задержки (0.3 - ±30%)
+            max_attempts: Максимальное количество попыток (0 - без ограничения)
+            standby: Держать заранее открытое резервное подключение
+            history_size: Количество хранимых значений метрик
+        """
+        self._open_fn = open_fn
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.max_attempts = max_attempts
+        self.standby_enabled = standby
+
+        self._standby: Optional[Any] = None
+        self._standby_lock = threading.Lock()
+        self._standby_thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        # Метрики
+        self.outage_count = 0
+        self.reconnect_attempts = 0
+        self.standby_switches = 0
+        self.outage_durations: Deque[float] = deque(maxlen=history_size)
+        self.reconnect_latencies: Deque[float] = deque(maxlen=history_size)
+        self._outage_start: Optional[float] = None
+
+    @property
+    def in_outage(self) -> bool:
+        """True, если связь потеряна и первый кадр после восстановления еще не получен."""
+        return self._outage_start is not None
+
+    def next_delay(self, attempt: int) -> float:
+        """
+        Расчет задержки перед попыткой подключения.
+
+        Args:
+            attempt: Номер попытки, начиная с 0
+
+        Returns:
+            Задержка в секундах
+        """
+        delay = min(self.max_delay, self.initial_delay * self.multiplier**attempt)
+        if self.jitter > 0:
+            delay *= random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+        return max(0.0, delay)
+
+    def reconnect(self, release_fn: Callable[[], None]) -> Optional[Any]:
+        """
+        Восстановление подключения после обрыва.
+
+        Сначала пробует резервное подключение, затем открывает новые
+        с экспоненциальной задержкой.
+
+        Args:
+            release_fn: Функция освобождения текущего (сломанного) захвата
+
+        Returns:
+            Новый открытый захват или None, если попытки исчерпаны
+        """
+        if self._outage_start is None:
+            self._outage_start = time.time()
+            self.outage_count += 1
+            logger.warning(f"Потеряна связь с видеопотоком (обрыв №{self.outage_count})")
+
+        release_fn()
+
+        cap = self._take_standby()
+        if cap is not None:
+            self.standby_switches += 1
+            self._record_reconnect(cap, "резервное подключение")
+            return cap
+
+        attempt = 0
+        while not self._closed:
+            if self.max_attempts > 0 and attempt >= self.max_attempts:
+                logger.error(
+                    f"Не удалось восстановить подключение за {attempt} попыток"
+                )
+                return None
+
+            delay = self.next_delay(attempt)
+            logger.info(
+                f"Переподключение к видеопотоку через {delay:.1f} с "
+                f"(попытка {attempt + 1})"
+            )
+            time.sleep(delay)
+            if self._closed:
+                break
+
+            attempt += 1
+            self.reconnect_attempts += 1
+            try:
+                cap = self._open_fn()
+            except Exception as e:
+                logger.error(f"Ошибка при переподключении: {str(e)}")
+                cap = None
+
+            if cap is not None:
+                self._record_reconnect(cap, f"попытка {attempt}")
+                return cap
+
+        return None
+
+    def on_frame(self) -> None:
+        """Отметка об успешно полученном кадре (завершает период обрыва)."""
+        if self._outage_start is None:
+            return
+
+        duration = time.time() - self._outage_start
+        self.outage_durations.append(duration)
+        self._outage_start = None
+        logger.info(f"Видеопоток восстановлен, длительность обрыва: {duration:.2f} с")
+
+    def _record_reconnect(self, cap: Any, how: str) -> None:
+        latency = time.time() - (self._outage_start or time.time())
+        self.reconnect_latencies.append(latency)
+        logger.info(f"Подключение восстановлено ({how}) за {latency:.2f} с")
+        self.start_standby()
+
+    def start_standby(self) -> None:
+        """Фоновое открытие резервного подключения, если оно включено."""
+        if not self.standby_enabled or self._closed:
+            return
+        if self._standby_thread is not None and self._standby_thread.is_alive():
+            return
+
+        self._standby_thread = threading.Thread(
+            target=self._open_standby, name="StandbyCapture", daemon=True
+        )
+        self._standby_thread.start()
+
+    def _open_standby(self) -> None:
+        try:
+            cap = self._open_fn()
+        except Exception as e:
+            logger.debug(f"Не удалось открыть резервное подключение: {str(e)}")
+            return
+
+        if cap is None:
+            return
+
+        with self._standby_lock:
+            if self._closed or self._standby is not None:
+                cap.release()
+                return
+            self._standby = cap
+        logger.info("Резервное подключение к видеопотоку открыто")
+
+    def _take_standby(self) -> Optional[Any]:
+        with self._standby_lock:
+            cap, self._standby = self._standby, None
+
+        if cap is None:
+            return None
+
+        # Резервное подключение могло устареть - проверяем, что кадры идут
+        try:
+            if cap.grab():
+                return cap
+        except Exception as e:
+            logger.debug(f"Резервное подключение неработоспособно: {str(e)}")
+        cap.release()
+        return None
+
+    def close(self) -> None:
+        """Прерывание переподключения и освобождение резервного подключения."""
+        self._closed = True
+        with self._standby_lock:
+            cap, self._standby = self._standby, None
+        if cap is not None:
+            cap.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получение метрик подключения.
+
+        Returns:
+            Словарь с количеством обрывов, их длительностью и задержками переподключения
+        """
+        durations = list(self.outage_durations)
+        latencies = list(self.reconnect_latencies)
+        return {
+            "outages": self.outage_count,
+            "in_outage": self.in_outage,
+            "reconnect_attempts": self.reconnect_attempts,
+            "standby_switches": self.standby_switches,
+            "standby_ready": self._standby is not None,
+            "outage_total": sum(durations),
+            "outage_last": durations[-1] if durations else 0.0,
+            "outage_max": max(durations) if durations else 0.0,
+            "reconnect_latency_avg": (
+                sum(latencies) / len(latencies) if latencies else 0.0
+            ),
+            "reconnect_latency_max": max(latencies) if latencies else 0.0,
+        }
@@ -2,6 +2,8 @@ import cv2
 import numpy as np
 from typing import List, Dict, Any, Tuple, Optional
 
+from src.core.detector_backend import DetectorBackend
+from src.core.inference import SharedModel, get_shared_model
 from src.utils.logger import logger
 from src.utils.config import config
 
@@ -96,30 +98,34 @@ class Detection:
 class PersonDetector:
     """Класс для детекции людей на видео."""
 
-    def __init__(self):
-        """Инициализация детектора."""
+    def __init__(self, backend: Optional[DetectorBackend] = None):
+        """
+        Инициализация детектора.
+
+        Args:
+            backend: Бэкенд детектора (по умолчанию - общая модель из реестра
+                по detection.backend)
+        """
         self.confidence_threshold = config.get("detection.confidence", 0.5)
         self.classes = config.get("detection.classes", [0])  # 0 - человек в COCO
-        self.model_path = config.get(
-            "detection.model_path",
-            "/home/abelyaev/Documents/CODE/Person_Zone/config/yolo11.pt",
-        )
 
-        try:
-            # Импортируем библиотеку ultralytics
-            from ultralytics import YOLO
-
-            # Загружаем модель YOLO
-            self.model = YOLO(self.model_path)
-            self.model.conf = (
-                self.confidence_threshold
-            )  # Устанавливаем порог уверенности
-            self.model.classes = self.classes  # Фильтруем только людей
-            logger.info(f"Модель YOLO успешно загружена из {self.model_path}")
-        except Exception as e:
-            logger.error(f"Ошибка загрузки модели YOLO: {str(e)}")
-            logger.info("Используем заглушку для детекции")
-            self.model = None
+        # Вызовы идут через SharedModel: модель из реестра может одновременно
+        # использоваться системой или камерами того же процесса
+        self.model: Optional[SharedModel] = None
+        if backend is not None:
+            self.model = SharedModel(backend=backend)
+        else:
+            try:
+                self.model = get_shared_model()
+                logger.info(f"Детектор использует бэкенд {self.model.backend.name}")
+            except Exception as e:
+                logger.error(f"Ошибка загрузки модели детектора: {str(e)}")
+                logger.info("Используем заглушку для детекции")
+
+    @property
+    def backend(self) -> Optional[DetectorBackend]:
+        """Бэкенд модели детектора."""
+        return self.model.backend if self.model is not None else None
 
     def detect(self, frame: np.ndarray) -> List[Detection]:
         """
@@ -135,50 +141,63 @@ class PersonDetector:
             return self._detect_stub(frame)
 
         try:
-            # Выполняем инференс с помощью ultralytics
-            results = self.model(frame, verbose=False)
-
-            # Извлекаем результаты
-            detections = []
-
-            # Обрабатываем результаты для каждого кадра
-            for result in results:
-                # Получаем боксы
-                boxes = result.boxes
-
-                # Если есть обнаружения
-                if len(boxes) > 0:
-                    # Для каждого бокса создаем объект Detection
-                    for box in boxes:
-                        # Получаем координаты бокса в формате xyxy
-                        xyxy = box.xyxy.cpu().numpy()[0]
-
-                        # Получаем уверенность
-                        conf = float(box.conf.cpu().numpy()[0])
-
-                        # Получаем класс
-                        cls = int(box.cls.cpu().numpy()[0])
-
-                        # Проверяем класс и уверенность
-                        if cls in self.classes and conf >= self.confidence_threshold:
-                            # Создаем объект Detection
-                            detection = Detection(
-                                (
-                                    int(xyxy[0]),
-                                    int(xyxy[1]),
-                                    int(xyxy[2]),
-                                    int(xyxy[3]),
-                                ),
-                                conf,
-                                cls,
-                            )
-                            detections.append(detection)
-
-            return detections
+            detections = self.model.detect(
+                frame, self.confidence_threshold, self.classes
+            )
+            return self._to_detections(detections)
         except Exception as e:
             logger.error(f"Ошибка при детекции: {str(e)}")
             return self._detect_stub(frame)
 
+    def detect_batch(self, frames: np.ndarray) -> List[List[Detection]]:
+        """
+        Пакетная детекция людей на нескольких кадрах за один вызов модели.
+
+        Args:
+            frames: Кадры одного размера в виде массива (N, H, W, 3) или списка
+
+        Returns:
+            Список детекций для каждого кадра
+        """
+        if len(frames) == 0:
+            return []
+
+        if self.model is None:
+            return [self._detect_stub(frame) for frame in frames]
+
+        try:
+            # Кадры передаются представлениями общего массива, без копирования
+            results = self.model.detect_batch(
+                list(frames), self.confidence_threshold, self.classes
+            )
+            return [
+                self._to_detections(detections, frame_id)
+                for frame_id, detections in enumerate(results)
+            ]
+        except Exception as e:
+            logger.error(f"Ошибка при пакетной детекции: {str(e)}")
+            return [self._detect_stub(frame) for frame in frames]
+
+    def _to_detections(
+        self, detections: np.ndarray, frame_id: int = 0
+    ) -> List[Detection]:
+        """
+        Преобразование массива детекций бэкенда в объекты Detection.
+
+        Args:
+            detections: Массив (N, 6): x1, y1, x2, y2, confidence, class
+            frame_id: Индекс кадра в пачке
+
+        Returns:
+            Список объектов Detection
+        """
+        return [
+            Detection(
+                (int(x1), int(y1), int(x2), int(y2)), float(conf), int(cls), frame_id
+            )
+            for x1, y1, x2, y2, conf, cls in detections
+        ]
+
     def _detect_stub(self, frame: np.ndarray) -> List[Detection]:
         """
         Заглушка для детекции (используется при ошибках или отсутствии модели).
@@ -0,0 +1,1019 @@
+"""
+Модуль бэкендов детектора.
+
+Бэкенд выполняет детекцию на кадрах BGR и возвращает для каждого кадра массив
+(N, 6) в координатах кадра: x1, y1, x2, y2, confidence, class. Бэкенд
+выбирается параметром detection.backend:
+    ultralytics - модель ultralytics (torch), как раньше
+    onnx        - ONNX Runtime на CPU
+    openvino    - OpenVINO на CPU (режимы latency и throughput)
+    auto        - самый быстрый вариант из манифеста подготовленных моделей
+                  (scripts/download_model.py --build), иначе по расширению
+                  detection.model_path
+
+ultralytics и torch загружаются только бэкендом ultralytics: модули ONNX и
+OpenVINO, как и трекер камеры (src/core/byte_tracker.py), их не импортируют.
+"""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from src.utils.config import Config, ScopedConfig, config
+from src.utils.logger import logger
+from src.utils.threads import configure_torch, get_thread_budget
+
+BACKENDS = ("auto", "ultralytics", "onnx", "openvino")
+
+# Смещение рамок разных классов перед общим NMS (как в ultralytics)
+_CLASS_OFFSET = 7680
+
+_PIXEL_SCALE = np.float32(1 / 255.0)
+
+
+def empty_detections() -> np.ndarray:
+    """Пустой массив детекций (0, 6)."""
+    return np.zeros((0, 6), dtype=np.float32)
+
+
+def weights_hash(model_path: str) -> str:
+    """
+    Хеш файлов модели для ключа кэша (для OpenVINO IR - .xml вместе с .bin).
+
+    Args:
+        model_path: Путь к модели
+
+    Returns:
+        Первые 16 символов SHA-256
+    """
+    path = Path(model_path)
+    digest = hashlib.sha256()
+    for part in (path, path.with_suffix(".bin") if path.suffix == ".xml" else None):
+        if part is None or not part.exists():
+            continue
+        with open(part, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def cache_entry(
+    cache_dir: str, model_path: str, input_size: int, runtime: str
+) -> Path:
+    """
+    Путь к скомпилированной модели в кэше.
+
+    Ключ включает хеш весов, размер входа и версию среды выполнения, поэтому
+    измененные веса или другой размер входа не подхватят старый результат.
+
+    Args:
+        cache_dir: Каталог кэша
+        model_path: Путь к исходной модели
+        input_size: Размер входа модели
+        runtime: Среда выполнения и ее версия (например, ort1.20.0)
+
+    Returns:
+        Путь без расширения внутри cache_dir
+    """
+    # Точки версии заменяются, чтобы with_suffix не отрезал ее часть
+    runtime = runtime.replace(".", "_")
+    name = f"{Path(model_path).stem}_{weights_hash(model_path)}_{input_size}_{runtime}"
+    return Path(cache_dir) / name
+
+
+class DetectorBackend:
+    """Базовый класс бэкенда детектора."""
+
+    name = "base"
+    # Бэкенд сам приводит кадр любого размера ко входу модели (letterbox),
+    # поэтому уменьшать кадр перед детекцией не нужно
+    resizes_input = True
+    # Размер входа можно сменить без повторной загрузки модели
+    dynamic_input = False
+
+    def detect(
+        self, frame: np.ndarray, conf: float = 0.5, classes: Sequence[int] = (0,)
+    ) -> np.ndarray:
+        """
+        Детекция на одном кадре.
+
+        Args:
+            frame: Кадр BGR
+            conf: Порог уверенности
+            classes: Классы для детекции
+
+        Returns:
+            Массив (N, 6): x1, y1, x2, y2, confidence, class
+        """
+        return self.detect_batch([frame], conf, classes)[0]
+
+    def detect_batch(
+        self,
+        frames: Sequence[np.ndarray],
+        conf: float = 0.5,
+        classes: Sequence[int] = (0,),
+    ) -> List[np.ndarray]:
+        """
+        Детекция на нескольких кадрах.
+
+        Args:
+            frames: Кадры BGR (размеры могут различаться)
+            conf: Порог уверенности
+            classes: Классы для детекции
+
+        Returns:
+            Массивы детекций (N, 6) для каждого кадра
+        """
+        raise NotImplementedError
+
+    def get_info(self) -> Dict[str, Any]:
+        """Параметры бэкенда для логов и бенчмарков."""
+        return {"backend": self.name}
+
+    def warmup(self, runs: int = 1) -> None:
+        """
+        Прогрев модели на пустых кадрах размера входа.
+
+        Первые вызовы включают выделение памяти и подготовку ядер, поэтому
+        без прогрева задержка первого кадра камеры в разы выше обычной.
+
+        Args:
+            runs: Количество прогонов
+        """
+        size = self.get_info().get("input_size", 640)
+        height, width = size if isinstance(size, tuple) else (size, size)
+        frame = np.full((height, width, 3), 114, dtype=np.uint8)
+        for _ in range(runs):
+            self.detect(frame)
+
+    def with_input_size(self, input_size: int) -> "DetectorBackend":
+        """
+        Бэкенд на той же загруженной модели с другим размером входа.
+
+        Поддерживается только бэкендами с dynamic_input.
+
+        Args:
+            input_size: Размер входа модели
+
+        Returns:
+            Бэкенд, разделяющий модель с исходным
+        """
+        raise NotImplementedError(
+            f"Бэкенд {self.name} не поддерживает смену размера входа"
+        )
+
+    def close(self) -> None:
+        """Освобождение ресурсов бэкенда."""
+
+
+def load_yolo_model(model_path: str):
+    """
+    Загрузка модели YOLO с откатом на совместимую модель.
+
+    Args:
+        model_path: Путь к весам модели
+
+    Returns:
+        Загруженная модель ultralytics
+    """
+    # Импорт torch занимает секунды, поэтому только для этого бэкенда
+    from ultralytics import YOLO
+
+    get_thread_budget()
+    configure_torch()
+
+    try:
+        model = YOLO(model_path)
+        logger.info(f"Модель YOLO загружена из {model_path}")
+        return model
+    except Exception as e:
+        logger.warning(f"Не удалось загрузить модель {model_path}: {e}")
+        logger.info("Попытка загрузки совместимой модели yolov8m.pt...")
+        try:
+            model = YOLO("yolov8m.pt")  # Автоматически скачается
+            logger.info("Загружена совместимая модель yolov8m.pt")
+            return model
+        except Exception as e2:
+            logger.error(f"Не удалось загрузить ни одну модель: {e2}")
+            raise
+
+
+def results_to_array(result) -> np.ndarray:
+    """
+    Преобразование результата ultralytics для одного кадра в массив детекций.
+
+    Args:
+        result: Результат модели для кадра
+
+    Returns:
+        Массив (N, 6): x1, y1, x2, y2, confidence, class
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return empty_detections()
+    return boxes.data[:, [0, 1, 2, 3, -2, -1]].cpu().numpy().astype(np.float32)
+
+
+class UltralyticsBackend(DetectorBackend):
+    """Бэкенд на модели ultralytics."""
+
+    name = "ultralytics"
+
+    def __init__(
+        self,
+        model_path: str,
+        iou: float = 0.7,
+        model: Any = None,
+        input_size: int = 640,
+        cache_dir: Optional[str] = None,
+    ):
+        """
+        Инициализация бэкенда.
+
+        Args:
+            model_path: Путь к весам модели
+            iou: Порог IoU для NMS
+            model: Уже загруженная модель (тогда model_path не используется)
+            input_size: Размер входа модели (большая сторона после letterbox)
+            cache_dir: Каталог кэша трассированной модели TorchScript для
+                весов .pt (None - веса загружаются напрямую)
+        """
+        self.model_path = model_path
+        self.iou = iou
+        self.input_size = input_size
+        self.traced = False  # Модель загружена из кэша TorchScript
+        if model is None and cache_dir and Path(model_path).suffix == ".pt":
+            model = self._load_traced(cache_dir)
+        self.model = model or load_yolo_model(model_path)
+
+    def _load_traced(self, cache_dir: str) -> Any:
+        """
+        Загрузка трассированной модели TorchScript из кэша.
+
+        При первом запуске веса экспортируются в TorchScript для размера входа
+        и сохраняются в кэш. Трассированная модель не требует слияния слоев
+        при загрузке, но имеет фиксированный размер входа.
+
+        Args:
+            cache_dir: Каталог кэша
+
+        Returns:
+            Модель ultralytics или None, если экспорт или загрузка не удались
+        """
+        try:
+            import torch
+            from ultralytics import YOLO
+
+            entry = cache_entry(
+                cache_dir,
+                self.model_path,
+                self.input_size,
+                f"torch{torch.__version__.split('+')[0]}",
+            )
+            cached = entry.with_suffix(".torchscript")
+            if not cached.exists():
+                exported = load_yolo_model(self.model_path).export(
+                    format="torchscript", imgsz=self.input_size, verbose=False
+                )
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(exported, cached)
+                logger.info(f"Модель TorchScript сохранена в кэш {cached}")
+            else:
+                logger.info(f"Модель TorchScript загружена из кэша {cached}")
+            model = YOLO(str(cached), task="detect")
+        except Exception as e:
+            logger.warning(
+                f"Кэш TorchScript недоступен, используются веса {self.model_path}: "
+                f"{str(e)}"
+            )
+            return None
+        self.traced = True
+        return model
+
+    def detect_batch(
+        self,
+        frames: Sequence[np.ndarray],
+        conf: float = 0.5,
+        classes: Sequence[int] = (0,),
+    ) -> List[np.ndarray]:
+        if len(frames) == 0:
+            return []
+        results = self.model.predict(
+            list(frames),
+            conf=conf,
+            iou=self.iou,
+            classes=list(classes),
+            imgsz=self.input_size,
+            batch=len(frames),
+            verbose=False,
+        )
+        return [results_to_array(result) for result in results]
+
+    @property
+    def dynamic_input(self) -> bool:
+        # Экспортированные и трассированные модели имеют фиксированный вход
+        return not self.traced and Path(self.model_path).suffix == ".pt"
+
+    def with_input_size(self, input_size: int) -> "UltralyticsBackend":
+        return UltralyticsBackend(
+            self.model_path, self.iou, model=self.model, input_size=input_size
+        )
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "model_path": self.model_path,
+            "input_size": self.input_size,
+        }
+
+
+def letterbox_geometry(
+    frame_shape: Tuple[int, ...], size: Tuple[int, int]
+) -> Tuple[float, Tuple[int, int], Tuple[int, int]]:
+    """
+    Геометрия масштабирования кадра с сохранением пропорций и дополнением до
+    размера входа модели (та же, что у LetterBox в ultralytics).
+
+    Args:
+        frame_shape: Размер кадра
+        size: Размер входа (высота, ширина)
+
+    Returns:
+        Кортеж (масштаб, смещение (left, top), размер кадра после
+        масштабирования (ширина, высота))
+    """
+    height, width = frame_shape[:2]
+    target_h, target_w = size
+    scale = min(target_h / height, target_w / width)
+    new_w, new_h = round(width * scale), round(height * scale)
+    left = round((target_w - new_w) / 2 - 0.1)
+    top = round((target_h - new_h) / 2 - 0.1)
+    return scale, (left, top), (new_w, new_h)
+
+
+class LetterboxBuffer:
+    """
+    Предобработка кадров в переиспользуемый входной тензор модели.
+
+    Кадр масштабируется одним cv2.resize прямо в область холста с
+    дополнением, затем холст переводится в RGB float32 NCHW в заранее
+    выделенный тензор. Новые массивы на кадр не создаются, тензор растет
+    только при увеличении размера пачки.
+    """
+
+    def __init__(self, size: Tuple[int, int], pad_value: int = 114):
+        """
+        Инициализация буфера.
+
+        Args:
+            size: Размер входа (высота, ширина)
+            pad_value: Значение пикселей дополнения
+        """
+        self.size = size
+        self.pad_value = pad_value
+        self.canvas = np.full((*size, 3), pad_value, dtype=np.uint8)
+        self.blob = np.empty((1, 3, *size), dtype=np.float32)
+        # Положение кадра на холсте: при его смене дополнение перезаполняется
+        self._region: Optional[Tuple[int, int, int, int]] = None
+
+    def fill(
+        self, frames: Sequence[np.ndarray]
+    ) -> Tuple[np.ndarray, List[Tuple[float, Tuple[int, int]]]]:
+        """
+        Заполнение тензора кадрами.
+
+        Тензор переиспользуется следующим вызовом: его нужно передать модели
+        до повторного заполнения.
+
+        Args:
+            frames: Кадры BGR (размеры могут различаться)
+
+        Returns:
+            Кортеж (тензор (N, 3, высота, ширина), масштаб и смещение
+            (left, top) для каждого кадра)
+        """
+        if len(frames) > len(self.blob):
+            self.blob = np.empty((len(frames), 3, *self.size), dtype=np.float32)
+        geometry = [self._write(frame, self.blob[i]) for i, frame in enumerate(frames)]
+        return self.blob[: len(frames)], geometry
+
+    def _write(
+        self, frame: np.ndarray, out: np.ndarray
+    ) -> Tuple[float, Tuple[int, int]]:
+        """Letterbox одного кадра в плоскости тензора out (3, высота, ширина)."""
+        scale, (left, top), (new_w, new_h) = letterbox_geometry(frame.shape, self.size)
+        region = (left, top, new_w, new_h)
+        if region != self._region:
+            self.canvas[:] = self.pad_value
+            self._region = region
+
+        target = self.canvas[top : top + new_h, left : left + new_w]
+        if (new_h, new_w) == frame.shape[:2]:
+            np.copyto(target, frame)
+        else:
+            cv2.resize(
+                frame, (new_w, new_h), dst=target, interpolation=cv2.INTER_LINEAR
+            )
+
+        for channel in range(3):  # BGR -> RGB вместе с нормализацией
+            np.multiply(
+                self.canvas[:, :, 2 - channel],
+                _PIXEL_SCALE,
+                out=out[channel],
+                dtype=np.float32,
+            )
+        return scale, (left, top)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    Жадное подавление немаксимумов.
+
+    Args:
+        boxes: Рамки (N, 4) x1, y1, x2, y2
+        scores: Уверенности (N,)
+        iou_threshold: Рамки с IoU выше порога подавляются
+
+    Returns:
+        Индексы оставленных рамок по убыванию уверенности
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while order.size > 0:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        inter_w = np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest])
+        inter_h = np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest])
+        inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+        iou = inter / (areas[best] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def decode_predictions(
+    prediction: np.ndarray,
+    conf: float,
+    classes: Sequence[int],
+    iou: float = 0.7,
+    max_det: int = 300,
+) -> np.ndarray:
+    """
+    Декодирование выхода YOLOv8/YOLO11 (4 + число классов, число якорей).
+
+    Оценки читаются только для запрошенных классов, поэтому при детекции
+    одних людей остальные 79 столбцов не обрабатываются.
+
+    Args:
+        prediction: Выход модели для одного кадра
+        conf: Порог уверенности
+        classes: Классы для детекции
+        iou: Порог IoU для NMS
+        max_det: Максимальное количество детекций
+
+    Returns:
+        Массив (N, 6) в координатах входа модели
+    """
+    if prediction.shape[0] < prediction.shape[1]:
+        prediction = prediction.T  # (якоря, 4 + классы)
+
+    class_ids = np.asarray(classes, dtype=np.int64)
+    class_scores = prediction[:, 4 + class_ids]
+    if len(class_ids) == 1:
+        scores = class_scores[:, 0]
+        best = np.zeros(len(scores), dtype=np.int64)
+    else:
+        best = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(best)), best]
+
+    mask = scores > conf
+    if not mask.any():
+        return empty_detections()
+
+    xywh = prediction[mask, :4]
+    scores = scores[mask]
+    labels = class_ids[best[mask]].astype(np.float32)
+
+    boxes = np.empty_like(xywh)
+    boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+    boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+
+    keep = nms(boxes + labels[:, None] * _CLASS_OFFSET, scores, iou)[:max_det]
+    return np.concatenate(
+        [boxes[keep], scores[keep, None], labels[keep, None]], axis=1
+    ).astype(np.float32)
+
+
+def unmap_boxes(
+    detections: np.ndarray,
+    scale: float,
+    pad: Tuple[int, int],
+    frame_shape: Tuple[int, ...],
+) -> np.ndarray:
+    """
+    Перевод рамок из координат входа модели в координаты исходного кадра.
+
+    Args:
+        detections: Массив (N, 6) в координатах входа модели
+        scale: Масштаб letterbox
+        pad: Смещение letterbox (left, top)
+        frame_shape: Размер исходного кадра
+
+    Returns:
+        Тот же массив с пересчитанными рамками
+    """
+    detections[:, [0, 2]] = (detections[:, [0, 2]] - pad[0]) / scale
+    detections[:, [1, 3]] = (detections[:, [1, 3]] - pad[1]) / scale
+    detections[:, [0, 2]] = detections[:, [0, 2]].clip(0, frame_shape[1])
+    detections[:, [1, 3]] = detections[:, [1, 3]].clip(0, frame_shape[0])
+    return detections
+
+
+class ExportedModelBackend(DetectorBackend):
+    """
+    Базовый класс бэкендов для экспортированных моделей YOLO (ONNX, OpenVINO).
+
+    Предобработка, декодирование выхода и NMS выполняются в NumPy/OpenCV,
+    подклассы реализуют только запуск модели (_infer).
+    """
+
+    def __init__(self, model_path: str, iou: float = 0.7):
+        """
+        Инициализация бэкенда.
+
+        Args:
+            model_path: Путь к модели
+            iou: Порог IoU для NMS
+        """
+        self.model_path = model_path
+        self.iou = iou
+        self.input_size = (640, 640)  # Высота и ширина входа модели
+        self.fixed_input = False  # Размер входа зафиксирован в модели
+        self.dynamic_batch = False
+        self._buffer: Optional[LetterboxBuffer] = None
+
+    @staticmethod
+    def _input_size(height: Any, width: Any, default: int) -> Tuple[int, int]:
+        """Размер входа: фиксированный из модели или detection_size, кратный 32."""
+        size = int(np.ceil(default / 32) * 32)
+        return (
+            height if isinstance(height, int) and height > 0 else size,
+            width if isinstance(width, int) and width > 0 else size,
+        )
+
+    def _preprocess(
+        self, frames: Sequence[np.ndarray]
+    ) -> Tuple[np.ndarray, List[Tuple[float, Tuple[int, int]]]]:
+        """Letterbox, BGR->RGB и нормализация во входной тензор NCHW float32."""
+        if self._buffer is None or self._buffer.size != self.input_size:
+            self._buffer = LetterboxBuffer(self.input_size)
+        return self._buffer.fill(frames)
+
+    def _postprocess(
+        self,
+        prediction: np.ndarray,
+        frame_shape: Tuple[int, ...],
+        geometry: Tuple[float, Tuple[int, int]],
+        conf: float,
+        classes: Sequence[int],
+    ) -> np.ndarray:
+        """Декодирование выхода для одного кадра в координатах кадра."""
+        detections = decode_predictions(prediction, conf, classes, self.iou)
+        scale, pad = geometry
+        return unmap_boxes(detections, scale, pad, frame_shape)
+
+    def _infer(self, blob: np.ndarray) -> np.ndarray:
+        """
+        Запуск модели.
+
+        Args:
+            blob: Вход NCHW float32
+
+        Returns:
+            Выход модели (N, 4 + классы, якоря)
+        """
+        raise NotImplementedError
+
+    def detect_batch(
+        self,
+        frames: Sequence[np.ndarray],
+        conf: float = 0.5,
+        classes: Sequence[int] = (0,),
+    ) -> List[np.ndarray]:
+        if len(frames) == 0:
+            return []
+        if not self.dynamic_batch and len(frames) > 1:
+            return [self.detect(frame, conf, classes) for frame in frames]
+
+        blob, geometry = self._preprocess(frames)
+        predictions = self._infer(blob)
+        return [
+            self._postprocess(prediction, frame.shape, frame_geometry, conf, classes)
+            for frame, prediction, frame_geometry in zip(frames, predictions, geometry)
+        ]
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "model_path": self.model_path,
+            "input_size": self.input_size,
+        }
+
+
+class OnnxBackend(ExportedModelBackend):
+    """Бэкенд ONNX Runtime (CPU) для моделей YOLO, экспортированных в ONNX."""
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_path: str,
+        input_size: int = 640,
+        iou: float = 0.7,
+        intra_threads: int = 0,
+        inter_threads: int = 0,
+        cache_dir: Optional[str] = None,
+    ):
+        """
+        Инициализация бэкенда.
+
+        Args:
+            model_path: Путь к модели .onnx
+            input_size: Размер входа, если он не зафиксирован в модели
+            iou: Порог IoU для NMS
+            intra_threads: Потоки внутри оператора (0 - по числу ядер)
+            inter_threads: Потоки между операторами (0 - по умолчанию)
+            cache_dir: Каталог кэша оптимизированного графа (None - без кэша)
+        """
+        import onnxruntime as ort
+
+        super().__init__(model_path, iou)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_threads
+        options.inter_op_num_threads = inter_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        # Оптимизированный граф сохраняется при первом запуске и загружается
+        # при следующих без повторной оптимизации. В кэш пишется граф без
+        # аппаратно-зависимой раскладки NCHWc: она применяется при загрузке
+        session_path = model_path
+        if cache_dir:
+            entry = cache_entry(
+                cache_dir, model_path, input_size, f"ort{ort.__version__}"
+            )
+            cached = entry.with_suffix(".onnx")
+            if not cached.exists():
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                temporary = entry.with_suffix(".tmp.onnx")
+                cache_options = ort.SessionOptions()
+                cache_options.graph_optimization_level = (
+                    ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+                )
+                cache_options.optimized_model_filepath = str(temporary)
+                ort.InferenceSession(
+                    model_path, cache_options, providers=["CPUExecutionProvider"]
+                )
+                os.replace(temporary, cached)
+                logger.info(f"Оптимизированная модель ONNX сохранена в кэш {cached}")
+            else:
+                logger.info(f"Оптимизированная модель ONNX загружена из кэша {cached}")
+            session_path = str(cached)
+
+        self.session = ort.InferenceSession(
+            session_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+
+        # Фиксированные размеры входа берутся из модели, динамические - из настроек
+        batch, _, height, width = model_input.shape
+        self.dynamic_batch = not isinstance(batch, int)
+        self.fixed_input = isinstance(height, int) and isinstance(width, int)
+        self.input_size = self._input_size(height, width, input_size)
+        logger.info(
+            f"Модель ONNX загружена из {model_path}: вход "
+            f"{self.input_size[1]}x{self.input_size[0]}, "
+            f"потоки intra={intra_threads}, inter={inter_threads}"
+        )
+
+    def _infer(self, blob: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+OPENVINO_MODES = ("latency", "throughput")
+
+
+class OpenVinoBackend(ExportedModelBackend):
+    """
+    Бэкенд OpenVINO (CPU) для моделей YOLO в формате OpenVINO IR или ONNX.
+
+    В режиме "latency" кадры обрабатываются по одному запросом с минимальной
+    задержкой. В режиме "throughput" кадры пачки (несколько камер, пакетная
+    офлайн-обработка) выполняются параллельно несколькими запросами.
+    """
+
+    name = "openvino"
+
+    def __init__(
+        self,
+        model_path: str,
+        input_size: int = 640,
+        iou: float = 0.7,
+        mode: str = "latency",
+        requests: int = 0,
+        threads: int = 0,
+        device: str = "CPU",
+        cache_dir: Optional[str] = None,
+    ):
+        """
+        Инициализация бэкенда.
+
+        Args:
+            model_path: Путь к модели (.xml или .onnx)
+            input_size: Размер входа, если он не зафиксирован в модели
+            iou: Порог IoU для NMS
+            mode: Режим "latency" или "throughput"
+            requests: Число одновременных запросов в режиме throughput
+                (0 - оптимальное для устройства)
+            threads: Число потоков инференса (0 - по умолчанию OpenVINO)
+            device: Устройство OpenVINO
+            cache_dir: Каталог кэша скомпилированной модели (None - без кэша)
+        """
+        import openvino as ov
+
+        super().__init__(model_path, iou)
+        if mode not in OPENVINO_MODES:
+            logger.warning(f"Неизвестный режим OpenVINO '{mode}', используется latency")
+            mode = "latency"
+        self.mode = mode
+
+        core = ov.Core()
+        if cache_dir:
+            # Скомпилированная под устройство модель сохраняется в каталоге
+            # кэша, повторный запуск загружает ее без компиляции
+            entry = cache_entry(
+                cache_dir, model_path, input_size, f"ov{ov.__version__.split('-')[0]}"
+            )
+            core.set_property({"CACHE_DIR": str(entry)})
+            logger.info(f"Кэш скомпилированной модели OpenVINO: {entry}")
+        model = core.read_model(model_path)
+
+        # Запрос обрабатывает один кадр: пачки распределяются по запросам
+        shape = model.inputs[0].get_partial_shape()
+        height = shape[2].get_length() if shape[2].is_static else None
+        width = shape[3].get_length() if shape[3].is_static else None
+        self.fixed_input = height is not None and width is not None
+        self.input_size = self._input_size(height, width, input_size)
+        model.reshape([1, 3, *self.input_size])
+
+        properties = {"PERFORMANCE_HINT": mode.upper()}
+        if threads > 0:
+            properties["INFERENCE_NUM_THREADS"] = threads
+        if mode == "throughput" and requests > 0:
+            properties["PERFORMANCE_HINT_NUM_REQUESTS"] = requests
+        self.compiled = core.compile_model(model, device, properties)
+
+        self.requests = 1
+        self._queue = None
+        if mode == "throughput":
+            self.requests = requests or self.compiled.get_property(
+                "OPTIMAL_NUMBER_OF_INFER_REQUESTS"
+            )
+            self._queue = ov.AsyncInferQueue(self.compiled, self.requests)
+        self._request = self.compiled.create_infer_request()
+
+        logger.info(
+            f"Модель OpenVINO загружена из {model_path}: вход "
+            f"{self.input_size[1]}x{self.input_size[0]}, режим {mode}, "
+            f"запросов {self.requests}, устройство {device}"
+        )
+
+    def _infer(self, blob: np.ndarray) -> np.ndarray:
+        # Выход - представление памяти запроса, действительное до следующего вызова
+        self._request.infer({0: blob})
+        return self._request.get_output_tensor(0).data
+
+    def detect_batch(
+        self,
+        frames: Sequence[np.ndarray],
+        conf: float = 0.5,
+        classes: Sequence[int] = (0,),
+    ) -> List[np.ndarray]:
+        if self._queue is None or len(frames) < 2:
+            return super().detect_batch(frames, conf, classes)
+
+        blob, geometry = self._preprocess(frames)
+        results: List[Optional[np.ndarray]] = [None] * len(frames)
+
+        # Декодирование выполняется в потоках OpenVINO по готовности запроса
+        def on_done(request: Any, index: int) -> None:
+            results[index] = self._postprocess(
+                request.get_output_tensor(0).data[0],
+                frames[index].shape,
+                geometry[index],
+                conf,
+                classes,
+            )
+
+        self._queue.set_callback(on_done)
+        for index in range(len(frames)):
+            self._queue.start_async({0: blob[index : index + 1]}, index)
+        self._queue.wait_all()
+        return results
+
+    def get_info(self) -> Dict[str, Any]:
+        info = super().get_info()
+        info.update({"mode": self.mode, "requests": self.requests})
+        return info
+
+
+def resolve_backend(backend: str, model_path: str) -> Tuple[str, str]:
+    """
+    Выбор бэкенда и файла модели для него.
+
+    Для бэкенда, отличного от формата model_path, ищется экспорт с тем же
+    именем рядом (config/yolo11m.pt -> config/yolo11m.onnx,
+    config/yolo11m_openvino_model/yolo11m.xml).
+
+    Args:
+        backend: Значение detection.backend
+        model_path: Значение detection.model_path
+
+    Returns:
+        Кортеж (бэкенд, путь к модели)
+    """
+    path = Path(model_path)
+    if backend == "auto":
+        if path.suffix == ".onnx":
+            backend = "onnx"
+        elif path.suffix == ".xml" or path.name.endswith("_openvino_model"):
+            backend = "openvino"
+        else:
+            backend = "ultralytics"
+
+    if backend == "onnx" and path.suffix != ".onnx":
+        candidates = [path.with_suffix(".onnx")]
+    elif backend == "openvino" and path.is_dir():
+        candidates = sorted(path.glob("*.xml"))
+    elif backend == "openvino" and path.suffix not in (".xml", ".onnx"):
+        # OpenVINO читает и IR (экспорт ultralytics format=openvino), и ONNX
+        candidates = [
+            path.parent / f"{path.stem}_openvino_model" / f"{path.stem}.xml",
+            path.with_suffix(".xml"),
+            path.with_suffix(".onnx"),
+        ]
+    else:
+        return backend, str(path)
+
+    for candidate in candidates:
+        if candidate.exists():
+            return backend, str(candidate)
+    raise FileNotFoundError(
+        f"Нет модели для бэкенда {backend} рядом с {model_path}: "
+        f"экспортируйте модель в нужный формат"
+    )
+
+
+def backend_options(
+    settings: Optional[Union[Config, ScopedConfig]] = None,
+    model_path: Optional[str] = None,
+) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    Параметры создания бэкенда по настройкам detection.*.
+
+    Одинаковые параметры означают одну и ту же модель, поэтому они же служат
+    ключом реестра загруженных моделей.
+
+    Args:
+        settings: Конфигурация (по умолчанию глобальная)
+        model_path: Путь к модели (по умолчанию detection.model_path)
+
+    Returns:
+        Кортеж (бэкенд, путь к модели, аргументы конструктора бэкенда)
+    """
+    settings = settings or config
+    backend = settings.get("detection.backend", "auto")
+    if backend not in BACKENDS:
+        logger.warning(f"Неизвестный бэкенд детектора '{backend}', используется auto")
+        backend = "auto"
+
+    model_path = model_path or settings.get(
+        "detection.model_path", "config/yolo11m.pt"
+    )
+    input_size = settings.get("detection.detection_size", 640)
+
+    # Манифест scripts/download_model.py --build: самый быстрый на этой
+    # машине проверенный вариант модели для размера входа
+    artifact = None
+    if backend == "auto":
+        from src.core.model_manifest import select_artifact
+
+        artifact = select_artifact(model_path, input_size)
+    if artifact is not None:
+        backend, model_path = artifact
+    else:
+        backend, model_path = resolve_backend(backend, model_path)
+
+    options = {"iou": settings.get("detection.iou", 0.7), "input_size": input_size}
+
+    if backend == "ultralytics" and settings.get("inference.torchscript_cache", False):
+        options["cache_dir"] = settings.get("inference.cache_dir")
+
+    if backend == "openvino":
+        options.update(
+            mode=settings.get("detection.openvino.mode", "latency"),
+            requests=settings.get("detection.openvino.requests", 0),
+            threads=settings.get("detection.openvino.threads", 0)
+            or get_thread_budget()["inference"],
+            device=settings.get("detection.openvino.device", "CPU"),
+            cache_dir=settings.get("inference.cache_dir"),
+        )
+    elif backend == "onnx":
+        options.update(
+            intra_threads=settings.get("detection.onnx.intra_threads", 0)
+            or get_thread_budget()["inference"],
+            inter_threads=settings.get("detection.onnx.inter_threads", 0),
+            cache_dir=settings.get("inference.cache_dir"),
+        )
+    return backend, model_path, options
+
+
+def create_backend(
+    settings: Optional[Union[Config, ScopedConfig]] = None,
+    model_path: Optional[str] = None,
+) -> DetectorBackend:
+    """
+    Создание бэкенда детектора по настройкам detection.*.
+
+    Args:
+        settings: Конфигурация (по умолчанию глобальная)
+        model_path: Путь к модели (по умолчанию detection.model_path)
+
+    Returns:
+        Бэкенд детектора
+    """
+    backend, model_path, options = backend_options(settings, model_path)
+    if backend == "openvino":
+        return OpenVinoBackend(model_path, **options)
+    if backend == "onnx":
+        return OnnxBackend(model_path, **options)
+    return UltralyticsBackend(model_path, **options)
+
+
+def compare_detections(
+    reference: np.ndarray, candidate: np.ndarray, iou_threshold: float = 0.5
+) -> Dict[str, float]:
+    """
+    Сравнение детекций двух бэкендов на одном кадре.
+
+    Детекции сопоставляются жадно по убыванию уверенности эталона.
+
+    Args:
+        reference: Эталонные детекции (N, 6)
+        candidate: Проверяемые детекции (M, 6)
+        iou_threshold: Минимальный IoU совпадения
+
+    Returns:
+        Словарь: matched, reference, candidate, mean_iou, max_conf_diff
+    """
+    matched = 0
+    ious = []
+    conf_diffs = []
+    used = np.zeros(len(candidate), dtype=bool)
+    for ref in reference[np.argsort(-reference[:, 4])]:
+        if len(candidate) == 0:
+            break
+        x1 = np.maximum(ref[0], candidate[:, 0])
+        y1 = np.maximum(ref[1], candidate[:, 1])
+        x2 = np.minimum(ref[2], candidate[:, 2])
+        y2 = np.minimum(ref[3], candidate[:, 3])
+        inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        ref_area = (ref[2] - ref[0]) * (ref[3] - ref[1])
+        areas = (candidate[:, 2] - candidate[:, 0]) * (
+            candidate[:, 3] - candidate[:, 1]
+        )
+        iou = inter / (ref_area + areas - inter + 1e-9)
+        iou[used | (candidate[:, 5] != ref[5])] = 0
+        best = int(iou.argmax())
+        if iou[best] >= iou_threshold:
+            used[best] = True
+            matched += 1
+            ious.append(float(iou[best]))
+            conf_diffs.append(abs(float(candidate[best, 4] - ref[4])))
+
+    return {
+        "matched": matched,
+        "reference": len(reference),
+        "candidate": len(candidate),
+        "mean_iou": float(np.mean(ious)) if ious else 0.0,
+        "max_conf_diff": max(conf_diffs) if conf_diffs else 0.0,
+    }
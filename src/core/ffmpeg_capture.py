@@ -0,0 +1,483 @@
+"""
+Модуль источника видео на основе процесса ffmpeg.
+
+Декодирование, обрезка, масштабирование и преобразование в BGR выполняются
+в графе фильтров ffmpeg, а в Python по каналу приходят только готовые
+кадры нужного для детектора размера.
+"""
+
+import json
+import re
+import shutil
+import subprocess
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from src.utils.logger import logger
+
+# Строка фильтра showinfo: "n:   3 pts:   100 pts_time:0.1 ..."
+_SHOWINFO_RE = re.compile(r"\bn:\s*\d+\s+pts:\s*\S+\s+pts_time:\s*(\S+)")
+# Время ожидания строки showinfo для уже прочитанного кадра, с
+_PTS_WAIT = 1.0
+
+
+def probe_video(source: str, ffprobe_path: str = "ffprobe") -> Dict[str, Any]:
+    """
+    Получение параметров видеопотока.
+
+    Использует ffprobe, если он доступен, иначе cv2.VideoCapture.
+
+    Args:
+        source: Путь к видеофайлу или RTSP-поток
+        ffprobe_path: Путь к исполняемому файлу ffprobe
+
+    Returns:
+        Словарь с шириной, высотой, fps и количеством кадров (пустой при ошибке)
+    """
+    if shutil.which(ffprobe_path):
+        cmd = [ffprobe_path, "-v", "error"]
+        if source.lower().startswith("rtsp://"):
+            cmd += ["-rtsp_transport", "tcp"]
+        cmd += [
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "stream=width,height,avg_frame_rate,r_frame_rate,nb_frames",
+            "-of",
+            "json",
+            source,
+        ]
+        try:
+            output = subprocess.run(
+                cmd, capture_output=True, check=True, timeout=30
+            ).stdout
+            stream = json.loads(output)["streams"][0]
+            rate = stream.get("avg_frame_rate") or stream.get("r_frame_rate", "0/1")
+            num, den = (int(part) for part in rate.split("/"))
+            nb_frames = stream.get("nb_frames", "0")
+            return {
+                "width": int(stream["width"]),
+                "height": int(stream["height"]),
+                "fps": num / den if den else 0.0,
+                "frame_count": int(nb_frames) if str(nb_frames).isdigit() else 0,
+            }
+        except Exception as e:
+            logger.warning(f"ffprobe не смог прочитать {source}: {str(e)}")
+
+    from src.core.video import get_video_info
+
+    return get_video_info(source)
+
+
+@lru_cache(maxsize=None)
+def ffmpeg_version(ffmpeg_path: str = "ffmpeg") -> Tuple[int, int]:
+    """
+    Получение версии ffmpeg.
+
+    Args:
+        ffmpeg_path: Путь к исполняемому файлу ffmpeg
+
+    Returns:
+        Кортеж (major, minor); для сборок из git без номера версии - (99, 0)
+    """
+    try:
+        output = subprocess.run(
+            [ffmpeg_path, "-hide_banner", "-version"],
+            capture_output=True,
+            timeout=10,
+        ).stdout.decode(errors="replace")
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"Не удалось получить версию ffmpeg: {str(e)}")
+        return (99, 0)
+    match = re.search(r"version\s+n?(\d+)\.(\d+)", output)
+    return (int(match.group(1)), int(match.group(2))) if match else (99, 0)
+
+
+class FFmpegCapture:
+    """
+    Источник кадров из процесса ffmpeg с интерфейсом cv2.VideoCapture.
+
+    Кадры читаются из канала stdout в формате rawvideo bgr24, а время
+    каждого кадра - из строк фильтра showinfo в stderr.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        max_side: int = 0,
+        size: Optional[Tuple[int, int]] = None,
+        crop: Optional[Sequence[int]] = None,
+        ffmpeg_path: str = "ffmpeg",
+        threads: int = 0,
+        input_options: Optional[List[str]] = None,
+        output_filters: Optional[List[str]] = None,
+        frame_skip: int = 1,
+        discard_nonref: bool = False,
+    ):
+        """
+        Инициализация источника и запуск ffmpeg.
+
+        Args:
+            source: Путь к видеофайлу или RTSP-поток
+            max_side: Масштабировать так, чтобы большая сторона была равна max_side (0 - не масштабировать)
+            size: Точный размер выходного кадра (width, height), имеет приоритет над max_side
+            crop: Область обрезки (x, y, width, height) в пикселях исходного кадра
+            ffmpeg_path: Путь к исполняемому файлу ffmpeg
+            threads: Количество потоков декодера (0 - автоматически)
+            input_options: Дополнительные параметры декодера (перед -i)
+            output_filters: Дополнительные фильтры до масштабирования
+            frame_skip: Выдавать каждый N-й кадр (остальные отбрасываются до
+                масштабирования и преобразования цвета)
+            discard_nonref: Не декодировать неопорные кадры (при frame_skip > 1)
+        """
+        self.source = source
+        self.is_rtsp = source.lower().startswith("rtsp://")
+        self.ffmpeg_path = ffmpeg_path
+        self.threads = threads
+        self.input_options = list(input_options or [])
+        self.output_filters = list(output_filters or [])
+        self.crop = tuple(int(v) for v in crop) if crop else None
+        self.frame_skip = max(1, int(frame_skip))
+        self.discard_nonref = discard_nonref and self.frame_skip > 1
+        self._scratch: Optional[np.ndarray] = None  # Буфер для grab()
+
+        self._process: Optional[subprocess.Popen] = None
+        self._frames_read = 0
+        self._start_frame = 0
+        # Время кадров из showinfo (относительно точки запуска ffmpeg), с
+        self._pts_queue: Deque[float] = deque()
+        self._pts_ready = threading.Condition()
+        self._last_pts: Optional[float] = None  # Время последнего кадра, с
+
+        info = probe_video(source)
+        self.source_width = int(info.get("width", 0))
+        self.source_height = int(info.get("height", 0))
+        self.fps = float(info.get("fps", 0.0))
+        self.frame_count = int(info.get("frame_count", 0))
+
+        if not self.source_width or not self.source_height:
+            logger.error(f"Не удалось определить размер кадра источника: {source}")
+            self.width = self.height = 0
+            return
+
+        region_width, region_height = (
+            (self.crop[2], self.crop[3])
+            if self.crop
+            else (self.source_width, self.source_height)
+        )
+        if size:
+            self.width, self.height = int(size[0]), int(size[1])
+        elif max_side > 0 and max(region_width, region_height) > max_side:
+            scale = max_side / max(region_width, region_height)
+            # Четные размеры для совместимости с фильтрами yuv420p
+            self.width = max(2, int(region_width * scale) // 2 * 2)
+            self.height = max(2, int(region_height * scale) // 2 * 2)
+        else:
+            self.width, self.height = region_width, region_height
+
+        self.frame_bytes = self.width * self.height * 3
+        self._start()
+
+    def _build_filter_graph(self) -> str:
+        """Построение графа фильтров ffmpeg."""
+        filters = []
+        if self.frame_skip > 1:
+            if self.discard_nonref:
+                # После отбрасывания неопорных кадров номера кадров идут
+                # неравномерно, поэтому прореживаем по времени кадра
+                interval = self.frame_skip / self.fps * 0.999 if self.fps > 0 else 0
+                filters.append(
+                    f"select='isnan(prev_selected_t)+gte(t-prev_selected_t\\,{interval:.6f})'"
+                )
+            else:
+                filters.append(f"select='not(mod(n\\,{self.frame_skip}))'")
+        if self.crop:
+            x, y, w, h = self.crop
+            filters.append(f"crop={w}:{h}:{x}:{y}")
+        filters.extend(self.output_filters)
+
+        region = (
+            (self.crop[2], self.crop[3])
+            if self.crop
+            else (self.source_width, self.source_height)
+        )
+        if (self.width, self.height) != region:
+            filters.append(f"scale={self.width}:{self.height}:flags=area")
+        filters.append("format=bgr24")
+        # Время кадров, прошедших select, для POS_MSEC/POS_FRAMES
+        if ffmpeg_version(self.ffmpeg_path) >= (6, 0):
+            filters.append("showinfo=checksum=0")
+        else:
+            filters.append("showinfo")
+        return ",".join(filters)
+
+    def _build_command(self, start_frame: int = 0) -> List[str]:
+        """
+        Построение командной строки ffmpeg.
+
+        Args:
+            start_frame: Номер кадра, с которого начинать чтение
+
+        Returns:
+            Список аргументов командной строки
+        """
+        # Уровень info нужен для строк showinfo
+        cmd = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-loglevel",
+            "info",
+            "-nostats",
+            "-nostdin",
+        ]
+        if self.is_rtsp:
+            cmd += ["-rtsp_transport", "tcp", "-fflags", "nobuffer"]
+        if self.threads > 0:
+            cmd += ["-threads", str(self.threads)]
+        if self.discard_nonref:
+            cmd += ["-skip_frame", "noref"]
+        cmd += self.input_options
+        if start_frame > 0 and self.fps > 0 and not self.is_rtsp:
+            cmd += ["-ss", f"{start_frame / self.fps:.6f}"]
+        cmd += [
+            "-i",
+            self.source,
+            "-map",
+            "0:v:0",
+            "-an",
+            "-sn",
+            "-vf",
+            self._build_filter_graph(),
+        ]
+        # Без passthrough выход rawvideo считается потоком с постоянной
+        # частотой, и ffmpeg заполняет отброшенные select кадры дубликатами
+        if ffmpeg_version(self.ffmpeg_path) >= (5, 1):
+            cmd += ["-fps_mode", "passthrough"]
+        else:
+            cmd += ["-vsync", "passthrough"]
+        cmd += [
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "bgr24",
+            "pipe:1",
+        ]
+        return cmd
+
+    def _start(self, start_frame: int = 0) -> None:
+        """
+        Запуск процесса ffmpeg.
+
+        Args:
+            start_frame: Номер кадра, с которого начинать чтение
+        """
+        self._stop_process()
+        cmd = self._build_command(start_frame)
+        logger.debug(f"Запуск ffmpeg: {' '.join(cmd)}")
+        try:
+            self._process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=self.frame_bytes,
+            )
+            self._start_frame = start_frame
+            self._frames_read = 0
+            self._last_pts = None
+            # Очередь своя у каждого запуска: строки остановленного процесса
+            # не попадут к кадрам нового
+            self._pts_queue = deque()
+            threading.Thread(
+                target=self._read_stderr,
+                args=(self._process.stderr, self._pts_queue),
+                name="ffmpeg-stderr",
+                daemon=True,
+            ).start()
+        except OSError as e:
+            logger.error(f"Не удалось запустить ffmpeg ({self.ffmpeg_path}): {str(e)}")
+            self._process = None
+
+    def _read_stderr(self, stderr: Any, queue: Deque[float]) -> None:
+        """
+        Чтение stderr ffmpeg: время кадров из showinfo и сообщения об ошибках.
+
+        Args:
+            stderr: Канал stderr процесса
+            queue: Очередь времени кадров этого запуска
+        """
+        try:
+            for raw_line in iter(stderr.readline, b""):
+                line = raw_line.decode(errors="replace").rstrip()
+                match = _SHOWINFO_RE.search(line)
+                if match:
+                    try:
+                        pts = float(match.group(1))
+                    except ValueError:
+                        pts = float("nan")  # NOPTS
+                    with self._pts_ready:
+                        queue.append(pts)
+                        self._pts_ready.notify_all()
+                elif "error" in line.lower():
+                    logger.warning(f"ffmpeg: {line}")
+        except (OSError, ValueError):
+            pass  # Канал закрыт при остановке процесса
+        finally:
+            stderr.close()
+
+    def _next_pts(self) -> float:
+        """
+        Время только что прочитанного кадра на шкале источника.
+
+        Returns:
+            Время кадра в секундах (по FPS, если showinfo не прислал время)
+        """
+        queue = self._pts_queue
+        with self._pts_ready:
+            self._pts_ready.wait_for(lambda: len(queue) > 0, timeout=_PTS_WAIT)
+            pts = queue.popleft() if queue else float("nan")
+
+        start = self._start_frame / self.fps if self.fps > 0 else 0.0
+        if pts == pts:  # не NaN
+            return start + pts
+        logger.debug("ffmpeg не передал время кадра, оно оценивается по FPS")
+        if self._last_pts is None:
+            return start
+        return self._last_pts + (self.frame_skip / self.fps if self.fps > 0 else 0.0)
+
+    def _stop_process(self) -> None:
+        """Остановка процесса ffmpeg."""
+        if self._process is None:
+            return
+        try:
+            self._process.kill()
+            self._process.stdout.close()
+            self._process.wait(timeout=2.0)
+        except Exception as e:
+            logger.debug(f"Ошибка при остановке ffmpeg: {str(e)}")
+        self._process = None
+
+    def isOpened(self) -> bool:
+        return self._process is not None and self.frame_bytes > 0
+
+    def read(
+        self, image: Optional[np.ndarray] = None
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Чтение следующего кадра из канала.
+
+        Args:
+            image: Массив (height, width, 3) uint8 для записи кадра без копирования
+
+        Returns:
+            Кортеж (успех, кадр)
+        """
+        if self._process is None:
+            return False, None
+
+        if (
+            image is None
+            or image.shape != (self.height, self.width, 3)
+            or not image.flags.c_contiguous
+        ):
+            image = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+        view = memoryview(image).cast("B")
+        received = 0
+        stdout = self._process.stdout
+        while received < self.frame_bytes:
+            chunk = stdout.readinto(view[received:])
+            if not chunk:
+                return False, None
+            received += chunk
+
+        self._frames_read += 1
+        self._last_pts = self._next_pts()
+        return True, image
+
+    def grab(self) -> bool:
+        """Пропуск кадра (кадр все равно должен быть вычитан из канала)."""
+        ret, frame = self.read(self._scratch)
+        if ret:
+            self._scratch = frame
+        return ret
+
+    def retrieve(
+        self, image: Optional[np.ndarray] = None
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Получение кадра, вычитанного последним вызовом grab().
+
+        Args:
+            image: Массив для записи кадра
+
+        Returns:
+            Кортеж (успех, кадр)
+        """
+        if self._scratch is None:
+            return False, None
+        if image is not None and image.shape == self._scratch.shape:
+            np.copyto(image, self._scratch)
+            return True, image
+        return True, self._scratch.copy()
+
+    def get(self, prop_id: int) -> float:
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count)
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(self._source_position())
+        if prop_id == cv2.CAP_PROP_POS_MSEC:
+            # Как в cv2.VideoCapture - время последнего прочитанного кадра
+            if self._last_pts is not None:
+                return self._last_pts * 1000.0
+            return self._start_frame * 1000.0 / self.fps if self.fps > 0 else 0.0
+        return 0.0
+
+    def _source_position(self) -> int:
+        """
+        Номер кадра источника, следующего за последним прочитанным.
+
+        Считается по времени кадра, а не по числу прочитанных кадров: при
+        отбрасывании неопорных кадров select выдает кадры неравномерно.
+        """
+        if self._last_pts is None or self.fps <= 0:
+            return self._start_frame
+        return int(round(self._last_pts * self.fps)) + 1
+
+    def set(self, prop_id: int, value: float) -> bool:
+        # Перемотка выполняется перезапуском ffmpeg с параметром -ss
+        if self.is_rtsp:
+            return False
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            self._start(max(0, int(value)))
+            return self._process is not None
+        if prop_id == cv2.CAP_PROP_POS_MSEC and self.fps > 0:
+            self._start(max(0, int(value * self.fps / 1000.0)))
+            return self._process is not None
+        return False
+
+    def release(self) -> None:
+        self._stop_process()
+
+    def get_geometry(self) -> Dict[str, Any]:
+        """
+        Получение геометрии выходного кадра относительно исходного.
+
+        Returns:
+            Словарь с исходным размером, областью обрезки и выходным размером
+        """
+        return {
+            "source_resolution": (self.source_width, self.source_height),
+            "crop": self.crop,
+            "output_resolution": (self.width, self.height),
+        }
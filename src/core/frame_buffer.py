@@ -0,0 +1,126 @@
+"""
+Модуль кольцевого буфера истории кадров.
+
+Буфер выделяется один раз и переиспользуется: кадры декодируются прямо
+в его слоты, поэтому чтение не создает новых массивов и лишних копий.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.utils.logger import logger
+
+
+class FrameHistory:
+    """Предвыделенный кольцевой буфер последних кадров."""
+
+    def __init__(self, depth: int):
+        """
+        Инициализация буфера.
+
+        Память выделяется при первом кадре, когда становится известен его размер.
+
+        Args:
+            depth: Количество хранимых кадров (0 - буфер отключен)
+        """
+        self.depth = max(0, int(depth))
+        self._frames: Optional[np.ndarray] = None
+        self._write_index = 0  # Слот для следующей записи
+        self._count = 0
+
+    @property
+    def enabled(self) -> bool:
+        """True, если буфер включен."""
+        return self.depth > 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def next_slot(self, shape: Tuple[int, ...]) -> Optional[np.ndarray]:
+        """
+        Получение слота для записи следующего кадра.
+
+        Кадр, записанный в слот, становится частью истории только после commit().
+
+        Args:
+            shape: Размер кадра (height, width, channels)
+
+        Returns:
+            Представление слота или None, если буфер отключен
+        """
+        if not self.enabled:
+            return None
+
+        if self._frames is None or self._frames.shape[1:] != tuple(shape):
+            if self._frames is not None:
+                logger.info(
+                    f"Размер кадра изменился на {shape}, буфер истории пересоздан"
+                )
+            self._frames = np.empty((self.depth,) + tuple(shape), dtype=np.uint8)
+            self._write_index = 0
+            self._count = 0
+            logger.debug(
+                f"Выделен буфер истории: {self.depth} кадров "
+                f"({self._frames.nbytes / (1024 * 1024):.1f} MB)"
+            )
+
+        return self._frames[self._write_index]
+
+    @property
+    def frame_shape(self) -> Optional[Tuple[int, ...]]:
+        """Размер кадров в буфере (None, если буфер еще не выделен)."""
+        return None if self._frames is None else self._frames.shape[1:]
+
+    def commit(self) -> None:
+        """Фиксация кадра, записанного в текущий слот."""
+        self._write_index = (self._write_index + 1) % self.depth
+        self._count = min(self._count + 1, self.depth)
+
+    def append(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Копирование кадра в следующий слот.
+
+        Используется, когда кадр не удалось декодировать прямо в буфер.
+
+        Args:
+            frame: Кадр для сохранения
+
+        Returns:
+            Представление слота с сохраненным кадром или None, если буфер отключен
+        """
+        slot = self.next_slot(frame.shape)
+        if slot is None:
+            return None
+        np.copyto(slot, frame)
+        self.commit()
+        return slot
+
+    def get(self, index: int, copy: bool = False) -> Optional[np.ndarray]:
+        """
+        Получение кадра из истории.
+
+        Представление действительно, пока слот не будет перезаписан
+        (через `depth` новых кадров).
+
+        Args:
+            index: Индекс от самого старого кадра (0, 1, ...) или
+                от самого нового (-1 - последний, -2 - предпоследний, ...)
+            copy: Вернуть копию кадра вместо представления
+
+        Returns:
+            Кадр или None, если индекс вне границ
+        """
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count or self._frames is None:
+            return None
+
+        oldest = (self._write_index - self._count) % self.depth
+        frame = self._frames[(oldest + index) % self.depth]
+        return frame.copy() if copy else frame
+
+    def clear(self) -> None:
+        """Очистка истории (память буфера сохраняется для повторного использования)."""
+        self._write_index = 0
+        self._count = 0
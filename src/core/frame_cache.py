@@ -0,0 +1,222 @@
+"""
+Модуль кэша декодированных кадров на диске.
+
+Клип декодируется один раз в файл .npy нужного разрешения, а затем кадры
+читаются из отображенного в память файла (страничный кэш ОС) без
+декодирования. Это позволяет измерять детектор, трекер и логику зон
+отдельно от стоимости и разброса декодирования.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.utils.logger import logger
+
+CACHE_SUFFIX = ".npy"
+META_SUFFIX = ".json"
+
+
+def is_frame_cache(source: Optional[str]) -> bool:
+    """True, если источник - файл кэша кадров."""
+    return bool(source) and source.lower().endswith(CACHE_SUFFIX)
+
+
+def _meta_path(path: str) -> Path:
+    return Path(path + META_SUFFIX)
+
+
+def build_frame_cache(
+    source: str,
+    output: str,
+    max_side: int = 0,
+    start_frame: int = 0,
+    max_frames: int = 0,
+) -> int:
+    """
+    Декодирование клипа в кэш кадров .npy.
+
+    Args:
+        source: Путь к видеофайлу
+        output: Путь к файлу кэша (.npy)
+        max_side: Размер большей стороны кадра (0 - исходный размер)
+        start_frame: Номер первого кадра
+        max_frames: Максимальное количество кадров (0 - до конца видео)
+
+    Returns:
+        Количество записанных кадров (0 при ошибке)
+    """
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        logger.error(f"Не удалось открыть видео для кэширования: {source}")
+        return 0
+
+    try:
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) - start_frame
+        if max_frames > 0:
+            frame_count = min(frame_count, max_frames)
+        if frame_count <= 0:
+            logger.error(f"Нет кадров для кэширования в {source}")
+            return 0
+
+        if max_side > 0 and max(width, height) > max_side:
+            scale = max_side / max(width, height)
+            size = (int(width * scale), int(height * scale))
+        else:
+            size = (width, height)
+
+        if start_frame > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        frames = np.lib.format.open_memmap(
+            output, mode="w+", dtype=np.uint8, shape=(frame_count, size[1], size[0], 3)
+        )
+
+        start_time = time.time()
+        pts = []
+        decoded = None
+        for index in range(frame_count):
+            ret, decoded = cap.read(decoded)
+            if not ret:
+                logger.warning(f"Видео закончилось раньше: записано {index} кадров")
+                break
+            if size == (width, height):
+                frames[index] = decoded
+            else:
+                cv2.resize(decoded, size, dst=frames[index], interpolation=cv2.INTER_AREA)
+            pts.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+
+        frames.flush()
+        del frames
+    finally:
+        cap.release()
+
+    meta = {
+        "source": source,
+        "fps": fps,
+        "frame_count": len(pts),
+        "start_frame": start_frame,
+        "source_resolution": [width, height],
+        "resolution": list(size),
+        "frame_pts": pts,
+    }
+    with open(_meta_path(output), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    logger.info(
+        f"Кэш кадров создан: {output}, {len(pts)} кадров {size[0]}x{size[1]} "
+        f"за {time.time() - start_time:.1f} с"
+    )
+    return len(pts)
+
+
+class FrameCacheCapture:
+    """Источник кадров из кэша .npy с интерфейсом cv2.VideoCapture."""
+
+    def __init__(self, path: str):
+        """
+        Инициализация источника.
+
+        Args:
+            path: Путь к файлу кэша (.npy)
+        """
+        self.path = path
+        self.frames: Optional[np.ndarray] = None
+        self.meta: Dict[str, Any] = {}
+        self.position = 0  # Номер следующего кадра
+        self._last = -1  # Номер последнего захваченного кадра
+
+        try:
+            self.frames = np.load(path, mmap_mode="r")
+            meta_path = _meta_path(path)
+            if meta_path.exists():
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    self.meta = json.load(f)
+        except Exception as e:
+            logger.error(f"Не удалось открыть кэш кадров {path}: {str(e)}")
+            self.frames = None
+            return
+
+        self.frame_count = int(self.meta.get("frame_count", len(self.frames)))
+        self.fps = float(self.meta.get("fps", 0.0))
+        self.frame_pts = self.meta.get("frame_pts", [])
+
+    def isOpened(self) -> bool:
+        return self.frames is not None and self.frame_count > 0
+
+    def grab(self) -> bool:
+        if self.frames is None or self.position >= self.frame_count:
+            return False
+        self._last = self.position
+        self.position += 1
+        return True
+
+    def retrieve(
+        self, image: Optional[np.ndarray] = None
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Копирование последнего захваченного кадра из кэша.
+
+        Args:
+            image: Массив для записи кадра
+
+        Returns:
+            Кортеж (успех, кадр)
+        """
+        if self._last < 0:
+            return False, None
+        frame = self.frames[self._last]
+        if image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)
+            return True, image
+        return True, np.array(frame)
+
+    def read(
+        self, image: Optional[np.ndarray] = None
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def get(self, prop_id: int) -> float:
+        if self.frames is None:
+            return 0.0
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.frames.shape[2])
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.frames.shape[1])
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count)
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        if prop_id == cv2.CAP_PROP_POS_MSEC:
+            # Как в cv2.VideoCapture - время последнего захваченного кадра
+            last = max(0, self._last)
+            if last < len(self.frame_pts):
+                return float(self.frame_pts[last])
+            return last * 1000.0 / self.fps if self.fps > 0 else 0.0
+        return 0.0
+
+    def set(self, prop_id: int, value: float) -> bool:
+        if self.frames is None:
+            return False
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            self.position = min(max(0, int(value)), self.frame_count)
+            self._last = self.position - 1
+            return True
+        if prop_id == cv2.CAP_PROP_POS_MSEC and self.fps > 0:
+            return self.set(cv2.CAP_PROP_POS_FRAMES, value * self.fps / 1000.0)
+        return False
+
+    def release(self) -> None:
+        self.frames = None
@@ -0,0 +1,262 @@
+"""
+Модуль фонового захвата кадров.
+
+Поток захвата непрерывно декодирует видеопоток и хранит только самый
+свежий кадр, поэтому медленная обработка не приводит к накоплению
+устаревших кадров в буфере FFmpeg.
+
+В ленивом режиме поток только захватывает кадры (grab), а полностью
+получает кадр (retrieve) лишь по запросу потребителя.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from src.utils.logger import logger
+
+
+class FrameGrabber:
+    """Фоновый поток, хранящий последний захваченный кадр."""
+
+    def __init__(
+        self,
+        read_fn: Callable[[], Tuple[bool, Optional[np.ndarray]]],
+        max_frame_age: float = 0.0,
+        name: str = "FrameGrabber",
+        grab_fn: Optional[Callable[[], bool]] = None,
+        retrieve_fn: Optional[Callable[[], Tuple[bool, Optional[np.ndarray]]]] = None,
+        pts_fn: Optional[Callable[[], float]] = None,
+    ):
+        """
+        Инициализация FrameGrabber.
+
+        Args:
+            read_fn: Функция чтения одного кадра из источника, возвращает (успех, кадр)
+            max_frame_age: Максимальный возраст кадра в секундах (0 - без ограничения)
+            name: Имя фонового потока
+            grab_fn: Функция захвата кадра без получения (включает ленивый режим)
+            retrieve_fn: Функция получения последнего захваченного кадра
+            pts_fn: Функция получения времени кадра на шкале источника,
+                вызывается сразу после захвата (None - время захвата)
+        """
+        self._read_fn = read_fn
+        self._grab_fn = grab_fn
+        self._retrieve_fn = retrieve_fn
+        self._pts_fn = pts_fn
+        self.lazy = grab_fn is not None and retrieve_fn is not None
+        self._retrieve_requested = False
+        self.max_frame_age = max_frame_age
+        self.name = name
+
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._finished = False
+
+        self._latest_frame: Optional[np.ndarray] = None
+        self._latest_timestamp = 0.0
+        self._latest_pts = 0.0
+        self._latest_seq = 0
+        self._consumed_seq = 0
+        self._last_capture_time = 0.0  # Время последнего успешного захвата
+        self.last_pts = 0.0  # Время на шкале источника последнего выданного кадра
+
+        # Счетчики
+        self.frames_captured = 0
+        self.frames_retrieved = 0
+        self.dropped_frames = 0
+        self.stale_frames = 0
+
+    def start(self) -> None:
+        """Запуск потока захвата."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._running = True
+        self._finished = False
+        self._last_capture_time = time.time()
+        self._thread = threading.Thread(
+            target=self._capture_loop, name=self.name, daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Запущен фоновый захват кадров (макс. возраст кадра: "
+            f"{self.max_frame_age if self.max_frame_age > 0 else 'не ограничен'})"
+        )
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """
+        Остановка потока захвата.
+
+        Args:
+            timeout: Время ожидания завершения потока в секундах
+        """
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning("Поток захвата не завершился за отведенное время")
+            self._thread = None
+
+        logger.info(
+            f"Фоновый захват остановлен. Захвачено: {self.frames_captured}, "
+            f"отброшено: {self.dropped_frames}, устаревших: {self.stale_frames}"
+        )
+
+    def abandon(self) -> None:
+        """
+        Остановка без ожидания потока.
+
+        Используется, когда поток заблокирован в чтении зависшего захвата:
+        он завершится сам, когда чтение вернется.
+        """
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+        self._thread = None
+        logger.info(
+            f"Поток захвата брошен. Захвачено: {self.frames_captured}, "
+            f"отброшено: {self.dropped_frames}, устаревших: {self.stale_frames}"
+        )
+
+    def seconds_since_frame(self) -> float:
+        """Время в секундах с момента последнего успешного захвата."""
+        return time.time() - self._last_capture_time
+
+    @property
+    def finished(self) -> bool:
+        """True, если источник завершился и новых кадров не будет."""
+        return self._finished
+
+    def request(self) -> None:
+        """
+        Запрос получения кадра в ленивом режиме.
+
+        Поток получит (retrieve) первый кадр, захваченный после запроса.
+        """
+        with self._condition:
+            self._retrieve_requested = True
+
+    def get_latest(
+        self, timeout: float = 5.0
+    ) -> Tuple[bool, Optional[np.ndarray], float]:
+        """
+        Получение самого свежего кадра, который еще не был выдан.
+
+        Ждет появления нового кадра. Кадры старше max_frame_age отбрасываются
+        и учитываются в счетчике устаревших. В ленивом режиме при отсутствии
+        готового кадра автоматически выполняется запрос.
+
+        Args:
+            timeout: Максимальное время ожидания нового кадра в секундах
+
+        Returns:
+            Кортеж (успех, кадр, время захвата)
+        """
+        deadline = time.time() + timeout
+
+        with self._condition:
+            while True:
+                if self._latest_seq > self._consumed_seq:
+                    frame = self._latest_frame
+                    timestamp = self._latest_timestamp
+                    self._consumed_seq = self._latest_seq
+                    self.last_pts = self._latest_pts
+
+                    age = time.time() - timestamp
+                    if self.max_frame_age > 0 and age > self.max_frame_age:
+                        self.stale_frames += 1
+                        logger.debug(f"Отброшен устаревший кадр (возраст {age:.3f} с)")
+                        continue
+
+                    return True, frame, timestamp
+
+                if self._finished or not self._running:
+                    return False, None, 0.0
+
+                if self.lazy:
+                    self._retrieve_requested = True
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    logger.debug(f"Новый кадр не получен за {timeout:.1f} с ожидания")
+                    return False, None, 0.0
+
+                self._condition.wait(remaining)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получение статистики захвата.
+
+        Returns:
+            Словарь со счетчиками захваченных, отброшенных и устаревших кадров
+        """
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_retrieved": self.frames_retrieved,
+            "dropped_frames": self.dropped_frames,
+            "stale_frames": self.stale_frames,
+            "max_frame_age": self.max_frame_age,
+        }
+
+    def _capture_loop(self) -> None:
+        """Основной цикл потока захвата."""
+        while self._running:
+            frame = None
+            timestamp = time.time()
+            pts = timestamp
+            try:
+                if self.lazy:
+                    ret = self._grab_fn()
+                    # Время кадра - момент захвата, а не последующего декодирования
+                    timestamp = pts = time.time()
+                    if ret and self._pts_fn is not None:
+                        pts = self._pts_fn()
+                    with self._condition:
+                        retrieve = ret and self._retrieve_requested
+                    if retrieve:
+                        ret, frame = self._retrieve_fn()
+                else:
+                    ret, frame = self._read_fn()
+                    timestamp = pts = time.time()
+                    if ret and self._pts_fn is not None:
+                        pts = self._pts_fn()
+            except Exception as e:
+                logger.error(f"Ошибка в потоке захвата: {str(e)}")
+                ret = False
+
+            with self._condition:
+                if not self._running:
+                    # Поток остановлен или брошен, пока шло чтение
+                    break
+
+                if not ret:
+                    self._finished = True
+                    self._condition.notify_all()
+                    break
+
+                self.frames_captured += 1
+                self._last_capture_time = timestamp
+                if frame is None:
+                    # Ленивый режим: кадр захвачен, но не запрошен
+                    continue
+
+                # Предыдущий кадр не был выдан потребителю - он отброшен
+                if self._latest_seq > self._consumed_seq:
+                    self.dropped_frames += 1
+
+                self._retrieve_requested = False
+                self._latest_frame = frame
+                self._latest_timestamp = timestamp
+                self._latest_pts = pts
+                self._latest_seq += 1
+                self.frames_retrieved += 1
+                self._condition.notify_all()
+
+        self._running = False
@@ -0,0 +1,193 @@
+"""
+Модуль планировщика выдачи кадров.
+
+Кадры выдаются по расписанию на монотонных часах: моменты выдачи
+отсчитываются от начала воспроизведения, а не от предыдущего вызова,
+поэтому время обработки и скачки системных часов не накапливают дрейф.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from src.utils.logger import logger
+
+PACING_MODES = ("asap", "fixed", "source")
+
+
+class FramePacer:
+    """Планировщик выдачи кадров с отслеживанием сроков."""
+
+    def __init__(
+        self,
+        mode: str = "asap",
+        target_fps: float = 0.0,
+        speed: float = 1.0,
+        max_lag: float = 0.5,
+        max_wait: float = 1.0,
+    ):
+        """
+        Инициализация планировщика.
+
+        Args:
+            mode: Режим: "asap" - без ожидания, "fixed" - с частотой target_fps,
+                "source" - по времени кадров источника (воспроизведение в реальном времени)
+            target_fps: Целевая частота кадров для режима "fixed"
+            speed: Множитель скорости воспроизведения для режима "source"
+            max_lag: Отставание от расписания в секундах, после которого
+                расписание сдвигается (кадры не выдаются пачкой, чтобы догнать)
+            max_wait: Максимальное ожидание одного кадра в секундах: больший
+                разрыв во времени кадров считается перемоткой и сбрасывает расписание
+        """
+        if mode not in PACING_MODES:
+            logger.warning(f"Неизвестный режим выдачи кадров '{mode}', используется asap")
+            mode = "asap"
+        if mode == "fixed" and target_fps <= 0:
+            mode = "asap"
+
+        self.mode = mode
+        self.target_fps = target_fps
+        self.speed = speed if speed > 0 else 1.0
+        self.max_lag = max_lag
+        self.max_wait = max_wait
+
+        self._start_time: Optional[float] = None  # Монотонное время начала расписания
+        self._start_pts = 0.0
+        self._next_deadline = 0.0
+        self._last_pts: Optional[float] = None
+
+        # Статистика
+        self.frames = 0
+        self.skipped = 0  # Пропущенные кадры между выданными
+        self.late_frames = 0
+        self.resyncs = 0
+        self.total_wait = 0.0
+        self.total_lag = 0.0
+        self._first_frame_time: Optional[float] = None
+        self._last_frame_time = 0.0
+        self._first_pts: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        """True, если планировщик ограничивает выдачу кадров."""
+        return self.mode != "asap"
+
+    def reset(self) -> None:
+        """Сброс расписания (после перемотки, переподключения или паузы)."""
+        self._start_time = None
+
+    def skip(self, count: int) -> None:
+        """
+        Учет пропущенных без выдачи кадров.
+
+        В режиме "fixed" срок следующего кадра сдвигается на count интервалов
+        без ожидания на каждом пропущенном кадре.
+
+        Args:
+            count: Количество пропущенных кадров
+        """
+        if self._first_frame_time is not None:
+            self.skipped += count
+        if self.mode == "fixed" and self._start_time is not None:
+            self._next_deadline += count / self.target_fps
+
+    def wait(self, pts: float = 0.0) -> float:
+        """
+        Ожидание срока выдачи кадра.
+
+        Вызывается после получения кадра, поэтому декодирование идет в
+        счет интервала, а не перед ним.
+
+        Args:
+            pts: Время кадра на шкале источника в секундах (для режима "source")
+
+        Returns:
+            Время ожидания в секундах
+        """
+        now = time.monotonic()
+        if not self.enabled:
+            self._record_frame(now, pts)
+            return 0.0
+
+        # Шкала времени источника сбросилась (перемотка, новый поток)
+        if self.mode == "source" and self._last_pts is not None and pts < self._last_pts:
+            self.reset()
+
+        if self._start_time is None:
+            self._start_time = now
+            self._start_pts = pts
+            self._next_deadline = now
+        elif self.mode == "source":
+            self._next_deadline = self._start_time + (pts - self._start_pts) / self.speed
+
+        lag = now - self._next_deadline
+        if lag < -self.max_wait:
+            # Скачок времени кадров вперед (перемотка) - не ждем его целиком
+            self.resyncs += 1
+            self._start_time = now
+            self._start_pts = pts
+            self._next_deadline = now
+            lag = 0.0
+
+        waited = 0.0
+        if lag < 0:
+            waited = -lag
+            time.sleep(waited)
+            self.total_wait += waited
+        elif lag > 0:
+            self.late_frames += 1
+            self.total_lag += lag
+            if lag > self.max_lag:
+                # Сильное отставание - начинаем расписание заново от текущего кадра
+                self.resyncs += 1
+                logger.debug(f"Отставание от расписания {lag:.3f} с, сдвиг расписания")
+                self._start_time = now
+                self._start_pts = pts
+                self._next_deadline = now
+
+        if self.mode == "fixed":
+            self._next_deadline += 1.0 / self.target_fps
+        self._record_frame(time.monotonic(), pts)
+        return waited
+
+    def _record_frame(self, now: float, pts: float) -> None:
+        """Учет выданного кадра для статистики."""
+        if self._first_frame_time is None:
+            self._first_frame_time = now
+            self._first_pts = pts
+        self._last_frame_time = now
+        self._last_pts = pts
+        self.frames += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получение статистики выдачи кадров.
+
+        Returns:
+            Словарь с целевой и достигнутой частотой, числом опозданий и временем ожидания
+        """
+        elapsed = (
+            self._last_frame_time - self._first_frame_time
+            if self._first_frame_time is not None
+            else 0.0
+        )
+        # В режиме "fixed" целевая частота задана для всех кадров потока,
+        # включая пропущенные
+        paced = self.frames - 1 + (self.skipped if self.mode == "fixed" else 0)
+        achieved_fps = paced / elapsed if elapsed > 0 else 0.0
+
+        target_fps = self.target_fps if self.mode == "fixed" else 0.0
+        if self.mode == "source" and self._first_pts is not None and self._last_pts:
+            source_span = self._last_pts - self._first_pts
+            if source_span > 0:
+                target_fps = paced / source_span * self.speed
+
+        return {
+            "mode": self.mode,
+            "frames": self.frames,
+            "target_fps": target_fps,
+            "achieved_fps": achieved_fps,
+            "late_frames": self.late_frames,
+            "resyncs": self.resyncs,
+            "avg_wait": self.total_wait / self.frames if self.frames else 0.0,
+            "avg_lag": self.total_lag / self.late_frames if self.late_frames else 0.0,
+        }
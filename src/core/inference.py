@@ -0,0 +1,407 @@
+"""
+Модуль общего инференса детектора для нескольких камер.
+
+Модель загружается один раз и используется всеми камерами процесса: реестр
+get_shared_model() возвращает одну и ту же прогретую модель для одинаковых
+настроек детектора. Детекции возвращаются массивом (N, 6): x1, y1, x2, y2,
+confidence, class.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.core.detector_backend import (
+    DetectorBackend,
+    backend_options,
+    create_backend,
+)
+from src.utils.config import Config, ScopedConfig, config
+from src.utils.logger import logger
+
+
+class SharedModel:
+    """Бэкенд детектора, общий для нескольких камер одного процесса."""
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        backend: Optional[DetectorBackend] = None,
+        settings: Optional[Union[Config, ScopedConfig]] = None,
+        lock: Optional[threading.Lock] = None,
+    ):
+        """
+        Инициализация общей модели.
+
+        Args:
+            model_path: Путь к модели (по умолчанию detection.model_path)
+            backend: Уже созданный бэкенд (тогда model_path не используется)
+            settings: Конфигурация для выбора бэкенда (по умолчанию глобальная)
+            lock: Блокировка модели, общая с другим бэкендом на той же
+                загруженной модели
+        """
+        self.backend = backend or create_backend(settings, model_path)
+        # Предиктор ultralytics не потокобезопасен - вызовы сериализуются
+        self._lock = lock or threading.Lock()
+
+    @property
+    def resizes_input(self) -> bool:
+        """Бэкенд сам приводит кадр ко входу модели."""
+        return self.backend.resizes_input
+
+    def with_input_size(self, input_size: int) -> "SharedModel":
+        """
+        Общая модель с другим размером входа на той же загруженной модели.
+
+        Вызовы обеих моделей сериализуются общей блокировкой.
+
+        Args:
+            input_size: Размер входа модели
+
+        Returns:
+            Общая модель
+        """
+        return SharedModel(
+            backend=self.backend.with_input_size(input_size), lock=self._lock
+        )
+
+    def detect(
+        self, frame: np.ndarray, conf: float = 0.5, classes: Sequence[int] = (0,)
+    ) -> np.ndarray:
+        """
+        Детекция на одном кадре.
+
+        Args:
+            frame: Кадр BGR
+            conf: Порог уверенности
+            classes: Классы для детекции
+
+        Returns:
+            Массив (N, 6): x1, y1, x2, y2, confidence, class
+        """
+        with self._lock:
+            return self.backend.detect(frame, conf, classes)
+
+    def detect_batch(
+        self,
+        frames: Sequence[np.ndarray],
+        conf: float = 0.5,
+        classes: Sequence[int] = (0,),
+    ) -> List[np.ndarray]:
+        """
+        Детекция на нескольких кадрах за один вызов модели.
+
+        Args:
+            frames: Кадры BGR (размеры могут различаться)
+            conf: Порог уверенности
+            classes: Классы для детекции
+
+        Returns:
+            Массивы детекций (N, 6) для каждого кадра
+        """
+        if len(frames) == 0:
+            return []
+        with self._lock:
+            return self.backend.detect_batch(frames, conf, classes)
+
+
+_models: Dict[Tuple, SharedModel] = {}
+# Модели с изменяемым размером входа по ключу без размера входа
+_dynamic_models: Dict[Tuple, SharedModel] = {}
+_models_lock = threading.Lock()
+
+
+def get_shared_model(
+    settings: Optional[Union[Config, ScopedConfig]] = None,
+    model_path: Optional[str] = None,
+) -> SharedModel:
+    """
+    Получение общей модели из реестра процесса.
+
+    Модель с одинаковыми параметрами бэкенда загружается один раз и
+    прогревается inference.warmup_runs прогонами на пустых кадрах размера
+    входа, поэтому первый кадр камеры не дает всплеска задержки.
+    Для модели с изменяемым размером входа (веса .pt ultralytics) другой
+    detection_size не загружает новую копию: возвращается модель с другим
+    размером входа на уже загруженной.
+
+    Args:
+        settings: Конфигурация для выбора бэкенда (по умолчанию глобальная)
+        model_path: Путь к модели (по умолчанию detection.model_path)
+
+    Returns:
+        Общая модель
+    """
+    settings = settings or config
+    backend, path, options = backend_options(settings, model_path)
+    key = (backend, path, tuple(sorted(options.items())))
+    dynamic_key = (
+        backend,
+        path,
+        tuple(sorted(item for item in options.items() if item[0] != "input_size")),
+    )
+
+    with _models_lock:
+        model = _models.get(key)
+        if model is not None:
+            return model
+
+        start_time = time.time()
+        loaded = _dynamic_models.get(dynamic_key)
+        if loaded is not None:
+            model = loaded.with_input_size(options["input_size"])
+        else:
+            model = SharedModel(backend=create_backend(settings, model_path))
+            if model.backend.dynamic_input:
+                _dynamic_models[dynamic_key] = model
+        load_time = time.time() - start_time
+
+        warmup_runs = settings.get("inference.warmup_runs", 2)
+        start_time = time.time()
+        try:
+            # Модель может уже использоваться камерами с другим размером входа
+            with model._lock:
+                model.backend.warmup(warmup_runs)
+        except Exception as e:
+            logger.warning(f"Ошибка прогрева модели {path}: {str(e)}")
+        logger.info(
+            f"Модель {path} ({backend}, вход {options['input_size']}) "
+            f"{'подключена' if loaded is not None else 'загружена'} за {load_time:.2f} с, "
+            f"прогрев {warmup_runs} прогонов за {time.time() - start_time:.2f} с"
+        )
+
+        _models[key] = model
+        return model
+
+
+# Границы корзин гистограммы ожидания запросов, мс
+WAIT_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class _InferenceRequest:
+    """Запрос камеры на детекцию одного кадра."""
+
+    __slots__ = ("frame", "conf", "classes", "submit_time", "done", "result", "error")
+
+    def __init__(self, frame: np.ndarray, conf: float, classes: Sequence[int]):
+        self.frame = frame
+        self.conf = conf
+        self.classes = tuple(classes)
+        self.submit_time = time.monotonic()
+        self.done = threading.Event()
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[Exception] = None
+
+
+class InferenceScheduler:
+    """
+    Планировщик пакетного инференса для нескольких камер.
+
+    Кадры камер накапливаются в очереди и передаются модели одной пачкой.
+    Пачка отправляется, когда набрано max_batch кадров, когда кадр прислала
+    каждая активная камера (больше ждать некого) или когда истек срок
+    max_wait от поступления первого кадра пачки. Интерфейс detect() совпадает
+    с SharedModel, поэтому камеры не зависят от наличия пакетирования.
+    """
+
+    def __init__(
+        self,
+        model: SharedModel,
+        max_batch: int = 8,
+        max_wait: float = 0.01,
+    ):
+        """
+        Инициализация планировщика.
+
+        Args:
+            model: Общая модель
+            max_batch: Максимальный размер пачки
+            max_wait: Максимальное ожидание пачки от первого кадра, с
+        """
+        self.model = model
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait))
+
+        self._queue: Deque[_InferenceRequest] = deque()
+        self._condition = threading.Condition()
+        self._clients = 0  # Камеры, которые сейчас отправляют кадры
+        self._running = True
+
+        # Статистика
+        self.batches = 0
+        self.frames = 0
+        self.total_inference = 0.0
+        self.batch_sizes: Dict[int, int] = {}
+        self.wait_histogram: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.total_wait = 0.0
+
+        self._thread = threading.Thread(
+            target=self._worker, name="inference-scheduler", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Пакетный инференс: до {self.max_batch} кадров, "
+            f"ожидание до {self.max_wait * 1000:.0f} мс"
+        )
+
+    @property
+    def resizes_input(self) -> bool:
+        """Бэкенд сам приводит кадр ко входу модели."""
+        return self.model.resizes_input
+
+    def register_client(self) -> None:
+        """Учет камеры, начавшей отправлять кадры."""
+        with self._condition:
+            self._clients += 1
+
+    def unregister_client(self) -> None:
+        """Учет камеры, завершившей работу (пачки больше не ждут ее кадров)."""
+        with self._condition:
+            self._clients = max(0, self._clients - 1)
+            self._condition.notify()
+
+    def detect(
+        self, frame: np.ndarray, conf: float = 0.5, classes: Sequence[int] = (0,)
+    ) -> np.ndarray:
+        """
+        Детекция на кадре в составе ближайшей пачки.
+
+        Блокирует вызывающий поток до получения результата.
+
+        Args:
+            frame: Кадр BGR
+            conf: Порог уверенности
+            classes: Классы для детекции
+
+        Returns:
+            Массив (N, 6): x1, y1, x2, y2, confidence, class
+        """
+        request = _InferenceRequest(frame, conf, classes)
+        with self._condition:
+            if not self._running:
+                return self.model.detect(frame, conf, classes)
+            self._queue.append(request)
+            self._condition.notify()
+
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def close(self) -> None:
+        """Остановка планировщика (оставшиеся в очереди кадры обрабатываются)."""
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify()
+        self._thread.join(timeout=5.0)
+
+        stats = self.get_stats()
+        if stats["batches"]:
+            logger.info(
+                f"Пакетный инференс: {stats['frames']} кадров в {stats['batches']} пачках, "
+                f"средний размер пачки {stats['avg_batch_size']:.2f}, "
+                f"среднее ожидание {stats['avg_wait_ms']:.1f} мс, "
+                f"инференс пачки {stats['avg_inference_ms']:.1f} мс"
+            )
+
+    def _batch_target(self) -> int:
+        """Размер пачки, после которого ждать больше не нужно."""
+        if self._clients > 0:
+            return min(self.max_batch, self._clients)
+        return self.max_batch
+
+    def _collect_batch(self) -> List[_InferenceRequest]:
+        """Ожидание и формирование очередной пачки запросов."""
+        with self._condition:
+            while not self._queue and self._running:
+                self._condition.wait()
+            if not self._queue:
+                return []
+
+            deadline = self._queue[0].submit_time + self.max_wait
+            while self._running and len(self._queue) < self._batch_target():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            size = min(len(self._queue), self.max_batch)
+            return [self._queue.popleft() for _ in range(size)]
+
+    def _worker(self) -> None:
+        """Главный цикл потока инференса."""
+        while True:
+            batch = self._collect_batch()
+            if not batch:
+                break
+            self._run_batch(batch)
+        logger.debug("Поток пакетного инференса завершен")
+
+    def _run_batch(self, batch: List[_InferenceRequest]) -> None:
+        """Инференс пачки и раздача результатов камерам."""
+        start_time = time.monotonic()
+        for request in batch:
+            self._record_wait(start_time - request.submit_time)
+
+        # Один вызов модели с самым мягким порогом и объединением классов,
+        # затем фильтрация по параметрам каждого запроса
+        conf = min(request.conf for request in batch)
+        classes = sorted({cls for request in batch for cls in request.classes})
+        try:
+            results = self.model.detect_batch(
+                [request.frame for request in batch], conf, classes
+            )
+            for request, detections in zip(batch, results):
+                keep = (detections[:, 4] >= request.conf) & np.isin(
+                    detections[:, 5], request.classes
+                )
+                request.result = detections[keep]
+        except Exception as e:
+            logger.error(f"Ошибка пакетного инференса ({len(batch)} кадров): {str(e)}")
+            for request in batch:
+                request.error = e
+        finally:
+            for request in batch:
+                request.done.set()
+
+        self.batches += 1
+        self.frames += len(batch)
+        self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+        self.total_inference += time.monotonic() - start_time
+
+    def _record_wait(self, wait: float) -> None:
+        """Учет времени ожидания запроса в гистограмме."""
+        self.total_wait += wait
+        wait_ms = wait * 1000
+        for index, bound in enumerate(WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                self.wait_histogram[index] += 1
+                return
+        self.wait_histogram[-1] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получение статистики пакетного инференса.
+
+        Returns:
+            Словарь с числом пачек и кадров, средними временами и гистограммами
+            размеров пачек ({размер: число пачек}) и ожидания ({"<=N мс": число кадров})
+        """
+        labels = [f"<={bound}" for bound in WAIT_BUCKETS_MS]
+        labels.append(f">{WAIT_BUCKETS_MS[-1]}")
+        return {
+            "batches": self.batches,
+            "frames": self.frames,
+            "avg_batch_size": self.frames / self.batches if self.batches else 0.0,
+            "avg_wait_ms": self.total_wait / self.frames * 1000 if self.frames else 0.0,
+            "avg_inference_ms": (
+                self.total_inference / self.batches * 1000 if self.batches else 0.0
+            ),
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+            "wait_ms": dict(zip(labels, self.wait_histogram)),
+        }
@@ -0,0 +1,365 @@
+"""
+Модуль локального сервера инференса для нескольких процессов камер.
+
+Процесс-сервер загружает модель один раз и обслуживает процессы камер через
+локальный сокет (multiprocessing.connection, без сети). Кадр передается через
+сегмент разделяемой памяти клиента, по сокету идут только короткие сообщения
+с размером кадра и массив детекций в ответ. Запросы всех клиентов объединяются
+в пачки планировщиком InferenceScheduler.
+
+Протокол (объекты pickle по соединению):
+    ("attach", имя_сегмента)                           -> ("ok", None)
+    ("detect", высота, ширина, каналы, порог, классы)  -> ("ok", детекции (N, 6))
+При ошибке сервер отвечает ("error", текст).
+"""
+
+import multiprocessing as mp
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.shared_frames import _attach_untracked
+from src.utils.config import config
+from src.utils.logger import logger
+from src.utils.threads import configure_threads
+
+
+def _server_address(address: Optional[str]) -> str:
+    return address or config.get(
+        "inference.server.address", "/tmp/person_zone_inference.sock"
+    )
+
+
+def _server_authkey() -> bytes:
+    return str(config.get("inference.server.authkey", "person_zone")).encode()
+
+
+def _handle_client(conn: Connection, scheduler: Any) -> None:
+    """
+    Обслуживание одного клиента в отдельном потоке сервера.
+
+    Args:
+        conn: Соединение с клиентом
+        scheduler: Планировщик пакетного инференса
+    """
+    shm: Optional[shared_memory.SharedMemory] = None
+    scheduler.register_client()
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+
+            command = message[0]
+            try:
+                if command == "attach":
+                    if shm is not None:
+                        shm.close()
+                    shm = _attach_untracked(message[1])
+                    conn.send(("ok", None))
+                elif command == "detect":
+                    _, height, width, channels, conf, classes = message
+                    frame = np.ndarray(
+                        (height, width, channels), dtype=np.uint8, buffer=shm.buf
+                    )
+                    detections = scheduler.detect(frame, conf, classes)
+                    del frame
+                    conn.send(("ok", detections))
+                else:
+                    conn.send(("error", f"Неизвестная команда {command}"))
+            except Exception as e:
+                logger.error(f"Ошибка обработки запроса клиента: {str(e)}")
+                conn.send(("error", str(e)))
+    finally:
+        scheduler.unregister_client()
+        if shm is not None:
+            shm.close()
+        conn.close()
+
+
+def _server_main(
+    address: str,
+    authkey: bytes,
+    model_path: str,
+    max_batch: int,
+    max_wait: float,
+    stop_event: Any,
+    config_path: Optional[str] = None,
+) -> None:
+    """
+    Точка входа процесса-сервера инференса.
+
+    Args:
+        address: Путь к локальному сокету
+        authkey: Ключ аутентификации клиентов
+        model_path: Путь к весам модели
+        max_batch: Максимальный размер пачки
+        max_wait: Максимальное ожидание пачки, с
+        stop_event: Событие остановки
+        config_path: Путь к файлу конфигурации родительского процесса
+    """
+    from src.core.inference import InferenceScheduler, get_shared_model
+
+    # Процесс запущен через spawn: конфигурация по умолчанию загружается заново
+    if config_path and os.path.exists(config_path):
+        config.__init__(config_path)
+    configure_threads()  # Процесс запущен через spawn: бюджет применяется заново
+    scheduler = InferenceScheduler(
+        get_shared_model(model_path=model_path), max_batch, max_wait
+    )
+
+    if os.path.exists(address):
+        os.unlink(address)  # Сокет, оставшийся после аварийного завершения
+    listener = Listener(address, family="AF_UNIX", authkey=authkey)
+    logger.info(f"Сервер инференса слушает {address}")
+
+    def accept_loop() -> None:
+        while not stop_event.is_set():
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                if not stop_event.is_set():
+                    logger.warning(f"Ошибка подключения клиента: {str(e)}")
+                    continue
+                break
+            threading.Thread(
+                target=_handle_client, args=(conn, scheduler), daemon=True
+            ).start()
+
+    threading.Thread(target=accept_loop, name="inference-accept", daemon=True).start()
+
+    stats_interval = config.get("debug.camera_stats_interval", 30.0)
+    try:
+        while not stop_event.wait(stats_interval):
+            stats = scheduler.get_stats()
+            logger.info(
+                f"Сервер инференса: кадров={stats['frames']}, пачек={stats['batches']}, "
+                f"средний размер={stats['avg_batch_size']:.2f}, "
+                f"размеры={stats['batch_sizes']}, ожидание, мс={stats['wait_ms']}"
+            )
+    finally:
+        listener.close()
+        scheduler.close()
+        logger.info("Сервер инференса остановлен")
+
+
+class InferenceServerProcess:
+    """Процесс-сервер инференса, владеющий моделью."""
+
+    def __init__(self, address: Optional[str] = None):
+        """
+        Инициализация процесса-сервера.
+
+        Args:
+            address: Путь к локальному сокету (по умолчанию inference.server.address)
+        """
+        self.address = _server_address(address)
+        self.model_path = config.get("detection.model_path", "config/yolo11m.pt")
+        self.max_batch = config.get("inference.max_batch", 8)
+        self.max_wait = config.get("inference.max_wait", 0.01)
+        self._ctx = mp.get_context("spawn")
+        self._stop_event = self._ctx.Event()
+        self._process: Optional[mp.process.BaseProcess] = None
+
+    def start(self) -> None:
+        """Запуск процесса-сервера."""
+        self._process = self._ctx.Process(
+            target=_server_main,
+            args=(
+                self.address,
+                _server_authkey(),
+                self.model_path,
+                self.max_batch,
+                self.max_wait,
+                self._stop_event,
+                str(config.config_path),
+            ),
+            name="inference-server",
+            daemon=True,
+        )
+        self._process.start()
+        logger.info(
+            f"Запущен сервер инференса (pid {self._process.pid}) на {self.address}"
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Остановка процесса-сервера.
+
+        Args:
+            timeout: Время ожидания завершения процесса в секундах
+        """
+        if self._process is None:
+            return
+
+        self._stop_event.set()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            logger.warning("Сервер инференса не завершился, принудительная остановка")
+            self._process.terminate()
+            self._process.join(timeout)
+        self._process = None
+
+    def is_alive(self) -> bool:
+        """Проверка, работает ли процесс-сервер."""
+        return self._process is not None and self._process.is_alive()
+
+    def get_info(self) -> Dict[str, Any]:
+        """
+        Получение информации о сервере.
+
+        Returns:
+            Словарь с параметрами процесса-сервера
+        """
+        return {
+            "address": self.address,
+            "model_path": self.model_path,
+            "max_batch": self.max_batch,
+            "max_wait": self.max_wait,
+            "pid": self._process.pid if self._process is not None else None,
+            "alive": self.is_alive(),
+        }
+
+
+class InferenceClient:
+    """
+    Клиент сервера инференса с интерфейсом detect() как у SharedModel.
+
+    Процесс камеры не загружает модель: кадр копируется в собственный
+    сегмент разделяемой памяти клиента, сервер читает его без копирования.
+    """
+
+    # Уменьшенный до detection_size кадр дешевле копировать в сегмент
+    resizes_input = False
+
+    def __init__(
+        self,
+        address: Optional[str] = None,
+        connect_timeout: float = 10.0,
+        retry_interval: float = 5.0,
+    ):
+        """
+        Инициализация клиента.
+
+        Args:
+            address: Путь к сокету сервера (по умолчанию inference.server.address)
+            connect_timeout: Время ожидания запуска сервера при первом подключении, с
+            retry_interval: Интервал между попытками переподключения, с
+        """
+        self.address = _server_address(address)
+        self.retry_interval = retry_interval
+        self._authkey = _server_authkey()
+        self._conn: Optional[Connection] = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._lock = threading.Lock()
+        self._next_retry = 0.0
+
+        deadline = time.time() + connect_timeout
+        while not self._connect(log_errors=time.time() >= deadline):
+            if time.time() >= deadline:
+                break
+            time.sleep(0.2)
+
+    def _connect(self, log_errors: bool = True) -> bool:
+        """Подключение к серверу и передача ему сегмента кадров."""
+        try:
+            self._conn = Client(self.address, family="AF_UNIX", authkey=self._authkey)
+        except Exception as e:
+            if log_errors:
+                logger.error(f"Сервер инференса {self.address} недоступен: {str(e)}")
+            self._conn = None
+            return False
+
+        if self._shm is not None and not self._attach(self._shm):
+            return False
+        logger.info(f"Подключено к серверу инференса {self.address}")
+        return True
+
+    def _attach(self, shm: shared_memory.SharedMemory) -> bool:
+        """Сообщение серверу имени сегмента кадров."""
+        status, _ = self._request(("attach", shm.name))
+        return status == "ok"
+
+    def _ensure_segment(self, size: int) -> bool:
+        """Создание сегмента кадров нужного размера (при росте кадра - заново)."""
+        if self._shm is not None and self._shm.size >= size:
+            return True
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        return self._attach(self._shm)
+
+    def _request(self, message: Tuple) -> Tuple[str, Any]:
+        """Отправка сообщения серверу и получение ответа."""
+        try:
+            self._conn.send(message)
+            return self._conn.recv()
+        except (EOFError, OSError) as e:
+            logger.error(f"Соединение с сервером инференса потеряно: {str(e)}")
+            self._disconnect()
+            return "error", str(e)
+
+    def _disconnect(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._next_retry = time.time() + self.retry_interval
+
+    def detect(
+        self, frame: np.ndarray, conf: float = 0.5, classes: Sequence[int] = (0,)
+    ) -> np.ndarray:
+        """
+        Детекция на кадре через сервер инференса.
+
+        Если сервер недоступен, возвращается пустой массив, а переподключение
+        выполняется не чаще retry_interval.
+
+        Args:
+            frame: Кадр BGR
+            conf: Порог уверенности
+            classes: Классы для детекции
+
+        Returns:
+            Массив (N, 6): x1, y1, x2, y2, confidence, class
+        """
+        empty = np.zeros((0, 6), dtype=np.float32)
+        with self._lock:
+            if self._conn is None:
+                if time.time() < self._next_retry:
+                    return empty
+                if not self._connect():
+                    self._next_retry = time.time() + self.retry_interval
+                    return empty
+
+            if frame.ndim == 2:
+                frame = frame[:, :, None]
+            if not self._ensure_segment(frame.nbytes):
+                return empty
+            view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self._shm.buf)
+            np.copyto(view, frame)
+            del view
+
+            height, width, channels = frame.shape
+            status, payload = self._request(
+                ("detect", height, width, channels, conf, tuple(classes))
+            )
+            if status != "ok":
+                logger.error(f"Ошибка сервера инференса: {payload}")
+                return empty
+            return payload
+
+    def close(self) -> None:
+        """Отключение от сервера и удаление сегмента кадров."""
+        with self._lock:
+            self._disconnect()
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+                self._shm = None
@@ -0,0 +1,187 @@
+"""
+Модуль манифеста подготовленных моделей.
+
+Скрипт scripts/download_model.py --build экспортирует веса в форматы
+ONNX, OpenVINO, TorchScript и INT8 для фиксированных размеров входа, проверяет
+совпадение детекций с исходной моделью и измеряет задержку на этой машине.
+Результаты записываются в манифест рядом с весами (config/yolo11m.manifest.json):
+
+    {
+      "weights": "yolo11m.pt",
+      "weights_hash": "...",
+      "host": "...",
+      "created": "2026-01-01T12:00:00",
+      "artifacts": [
+        {"backend": "openvino", "path": "yolo11m_640_openvino_model/yolo11m.xml",
+         "format": "openvino", "precision": "fp32", "input_size": 640,
+         "latency_ms": 41.2, "valid": true, "parity": {...}},
+        ...
+      ]
+    }
+
+При detection.backend: auto детектор берет из манифеста самый быстрый
+проверенный вариант для detection.detection_size.
+"""
+
+import json
+import os
+import platform
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.detector_backend import DetectorBackend, weights_hash
+from src.utils.logger import logger
+
+# Загруженные манифесты: путь -> (время изменения, манифест)
+_manifests: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+
+
+def manifest_path(model_path: str) -> Path:
+    """Путь к манифесту для весов модели."""
+    path = Path(model_path)
+    return path.with_name(f"{path.stem}.manifest.json")
+
+
+def load_manifest(model_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Загрузка манифеста подготовленных моделей.
+
+    Манифест, записанный для других весов, не используется.
+
+    Args:
+        model_path: Путь к исходным весам модели
+
+    Returns:
+        Манифест или None, если его нет или он устарел
+    """
+    path = manifest_path(model_path)
+    if not path.exists():
+        return None
+
+    mtime = path.stat().st_mtime
+    cached = _manifests.get(str(path))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    manifest = None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("weights_hash") != weights_hash(model_path):
+            logger.warning(
+                f"Манифест {path} записан для других весов, "
+                f"запустите scripts/download_model.py --build"
+            )
+            manifest = None
+        elif manifest.get("host") != platform.node():
+            logger.warning(
+                f"Задержки в манифесте {path} измерены на {manifest.get('host')}, "
+                f"выбор варианта может быть неоптимальным для этой машины"
+            )
+    except Exception as e:
+        logger.error(f"Ошибка чтения манифеста {path}: {str(e)}")
+        manifest = None
+
+    _manifests[str(path)] = (mtime, manifest)
+    return manifest
+
+
+def save_manifest(
+    model_path: str, artifacts: List[Dict[str, Any]]
+) -> Optional[Path]:
+    """
+    Сохранение манифеста подготовленных моделей.
+
+    Args:
+        model_path: Путь к исходным весам модели
+        artifacts: Описания вариантов модели
+
+    Returns:
+        Путь к манифесту или None при ошибке
+    """
+    path = manifest_path(model_path)
+    # Пути хранятся относительно каталога манифеста
+    artifacts = [
+        {**artifact, "path": os.path.relpath(artifact["path"], path.parent)}
+        for artifact in artifacts
+    ]
+    manifest = {
+        "weights": Path(model_path).name,
+        "weights_hash": weights_hash(model_path),
+        "host": platform.node(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "artifacts": sorted(artifacts, key=lambda item: item["latency_ms"]),
+    }
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4, ensure_ascii=False)
+    except Exception as e:
+        logger.error(f"Ошибка сохранения манифеста {path}: {str(e)}")
+        return None
+    return path
+
+
+def select_artifact(model_path: str, input_size: int) -> Optional[Tuple[str, str]]:
+    """
+    Выбор самого быстрого проверенного варианта модели из манифеста.
+
+    Args:
+        model_path: Путь к исходным весам модели
+        input_size: Размер входа (detection.detection_size)
+
+    Returns:
+        Кортеж (бэкенд, путь к модели) или None, если подходящего варианта нет
+    """
+    manifest = load_manifest(model_path)
+    if manifest is None:
+        return None
+
+    directory = manifest_path(model_path).parent
+    candidates = [
+        artifact
+        for artifact in manifest.get("artifacts", [])
+        if artifact.get("valid")
+        and artifact.get("input_size") == input_size
+        and (directory / artifact["path"]).exists()
+    ]
+    if not candidates:
+        return None
+
+    best = min(candidates, key=lambda artifact: artifact["latency_ms"])
+    return best["backend"], str(directory / best["path"])
+
+
+def measure_latency(
+    backend: DetectorBackend,
+    frames: Sequence[np.ndarray],
+    runs: int = 20,
+    conf: float = 0.5,
+) -> Dict[str, float]:
+    """
+    Измерение задержки покадровой детекции.
+
+    Args:
+        backend: Бэкенд детектора
+        frames: Кадры (используются по кругу)
+        runs: Количество замеров
+        conf: Порог уверенности
+
+    Returns:
+        Словарь: медиана и 95-й перцентиль задержки, мс
+    """
+    backend.warmup(2)
+    latencies = []
+    for index in range(runs):
+        start_time = time.perf_counter()
+        backend.detect(frames[index % len(frames)], conf)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+
+    latencies.sort()
+    return {
+        "latency_ms": float(np.median(latencies)),
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
@@ -4,19 +4,28 @@ from __future__ import annotations
 Основной модуль для работы с системой детекции и трекинга людей в зонах.
 """
 
+import threading
 import time
 from collections import deque
 from dataclasses import dataclass
-from typing import Deque, List, Dict, Set, Tuple, Optional
+from typing import Any, Deque, List, Dict, Set, Tuple, Optional, Union
 
 import cv2
 import numpy as np
-from ultralytics import YOLO
 
 from src.api.client import ApiClient
+from src.core.detector_backend import backend_options
+from src.core.inference import (
+    InferenceScheduler,
+    SharedModel,
+    get_shared_model,
+)
+from src.core.inference_server import InferenceClient
+from src.core.qos import QosController
+from src.core.tracker import PersonTracker
 from src.core.video import VideoReader
-from src.core.zone import ZoneManager
-from src.utils.config import config
+from src.core.zone import ZoneHistory, ZoneManager
+from src.utils.config import Config, ScopedConfig, config
 from src.utils.logger import logger
 
 
@@ -40,6 +49,21 @@ class Track:
         )
         return frame
 
+    def scaled(self, scale_x: float, scale_y: float) -> "Track":
+        """Копия трека в координатах кадра другого разрешения."""
+        x1, y1, x2, y2 = self.box
+        return Track(
+            self.track_id,
+            (
+                int(x1 * scale_x),
+                int(y1 * scale_y),
+                int(x2 * scale_x),
+                int(y2 * scale_y),
+            ),
+            (int(self.bottom_point[0] * scale_x), int(self.bottom_point[1] * scale_y)),
+            self.color,
+        )
+
 
 class PersonZoneSystem:
     """Основной класс для работы с системой детекции и трекинга людей в зонах."""
@@ -48,36 +72,120 @@ class PersonZoneSystem:
         self,
         video_source: Optional[str] = None,
         zones_file: Optional[str] = None,
+        presentation_source: Optional[str] = None,
+        name: str = "main",
+        settings: Optional[Union[Config, ScopedConfig]] = None,
+        detector: Optional[
+            Union[SharedModel, InferenceScheduler, InferenceClient]
+        ] = None,
+        api_client: Optional[ApiClient] = None,
     ):
-        self.video_reader = VideoReader(source=video_source)
+        """
+        Инициализация системы.
+
+        Args:
+            video_source: Источник видео (по умолчанию из конфигурации)
+            zones_file: Файл зон (по умолчанию из конфигурации)
+            presentation_source: Поток для отображения
+            name: Имя камеры для логов и статистики
+            settings: Настройки камеры (по умолчанию глобальная конфигурация)
+            detector: Общая модель нескольких камер, планировщик пакетного
+                инференса или клиент сервера инференса; если не задан,
+                берется модель из реестра процесса (бэкенд detection.backend)
+            api_client: Общий клиент API; если не задан, создается собственный
+        """
+        self.name = name
+        self.config = settings or config
+        self.video_reader = VideoReader(source=video_source, settings=self.config)
         self.zone_manager = ZoneManager(zones_file=zones_file)
-        self.api_client = ApiClient()
 
-        model_path = config.get("detection.model_path", "config/yolo11m.pt")
-        try:
-            self.model = YOLO(model_path)
-            logger.info(f"Модель YOLO загружена из {model_path}")
-        except Exception as e:
-            logger.warning(f"Не удалось загрузить модель {model_path}: {e}")
-            logger.info("Попытка загрузки совместимой модели yolov8m.pt...")
-            try:
-                self.model = YOLO("yolov8m.pt")  # Автоматически скачается
-                logger.info("Загружена совместимая модель yolov8m.pt")
-            except Exception as e2:
-                logger.error(f"Не удалось загрузить ни одну модель: {e2}")
-                raise
+        self.debug_mode = self.config.get("debug.debug_mode", True)
 
-        self.bottom_point_offset = config.get("detection.bottom_point_offset", 0.05)
-        self.frame_window_size = config.get("detection.frame_window_size", 10)
-        self.min_frames_in_zone = config.get("detection.min_frames_in_zone", 5)
-
-        self.debug_mode = config.get("debug.debug_mode", True)
+        # Поток для отображения (например, основной поток камеры subtype=0),
+        # когда детекция идет по дешевому подпотоку (subtype=1). Кадры из него
+        # декодируются только по запросу визуализации, снимков или записи.
+        # Без визуализации поток открывается, только если его кадры забирают
+        # через get_presentation_frame (video.presentation_headless)
+        presentation_source = presentation_source or self.config.get(
+            "video.presentation_source"
+        )
+        self.presentation_reader: Optional[VideoReader] = None
+        self.presentation_zone_manager: Optional[ZoneManager] = None
+        if presentation_source and not (
+            self.debug_mode or self.config.get("video.presentation_headless", False)
+        ):
+            logger.info(
+                f"Поток отображения {presentation_source} не открывается: "
+                f"визуализация отключена"
+            )
+        elif presentation_source:
+            self.presentation_reader = VideoReader(
+                source=presentation_source, capture_mode="lazy", settings=self.config
+            )
+            self.presentation_zone_manager = ZoneManager(zones_file=zones_file)
+        self._presentation_resolution_set = False
+        self.presentation_offset = 0.0  # Рассинхронизация потоков, с
+        self._owns_api_client = api_client is None
+        self.api_client = api_client or ApiClient()
+
+        # Детекция выполняется бэкендом, а трекинг - собственным трекером
+        # камеры, поэтому общая модель не смешивает треки разных камер
+        self.detector = detector or get_shared_model(self.config)
+        self.tracker: Optional[PersonTracker] = None
+
+        self.bottom_point_offset = self.config.get(
+            "detection.bottom_point_offset", 0.05
+        )
+        self.frame_window_size = self.config.get("detection.frame_window_size", 10)
+        self.min_frames_in_zone = self.config.get("detection.min_frames_in_zone", 5)
+        # Правило подтверждения во времени: присутствие не менее
+        # zone_confirm_seconds за последние zone_window_seconds
+        self.zone_window_seconds = self.config.get(
+            "detection.zone_window_seconds", 2.0
+        )
+        self.zone_confirm_seconds = self.config.get(
+            "detection.zone_confirm_seconds", 1.0
+        )
+        # Максимальный интервал, покрываемый одним кадром (0 - по FPS обработки)
+        self.zone_max_sample_interval = self.config.get(
+            "detection.zone_max_sample_interval", 0.0
+        )
 
-        self.frame_skip = config.get("detection.frame_skip", 2)
-        self.resize_for_detection = config.get("detection.resize_for_detection", True)
-        self.detection_size = config.get("detection.detection_size", 640)
+        self.frame_skip = self.config.get("detection.frame_skip", 2)
+        # Способ пропуска кадров: "read" - полное чтение и отбрасывание,
+        # "grab" - grab() без декодирования в BGR, "decoder" - пропуск в декодере
+        self.skip_mode = self.config.get("detection.skip_mode", "read")
+        self.skip_nonref = self.config.get("detection.skip_nonref", False)
+        self._decoder_skip = False
+        self.resize_for_detection = self.config.get(
+            "detection.resize_for_detection", True
+        )
+        self.detection_size = self.config.get("detection.detection_size", 640)
+
+        # Управление размером входа по задержке инференса (только для модели
+        # из реестра: общий детектор нескольких камер не переключается)
+        self.qos: Optional[QosController] = None
+        self._qos_loader: Optional[threading.Thread] = None
+        self._qos_loaded: Optional[Tuple[int, Optional[SharedModel]]] = None
+        self._qos_reason = ""
+        if self.config.get("qos.enabled", False):
+            if detector is None:
+                self.qos = QosController.from_config(self.config, self.detection_size)
+                if self.config.get("qos.preload", False):
+                    self._preload_qos_models()
+            else:
+                logger.info(
+                    f"QoS камеры {self.name} отключен: детектор общий для "
+                    f"нескольких камер"
+                )
 
-        self.zone_history: Deque[bool] = deque(maxlen=self.frame_window_size)
+        self.zone_history = ZoneHistory(
+            window_seconds=self.zone_window_seconds,
+            confirm_seconds=self.zone_confirm_seconds,
+            max_sample_interval=self.zone_max_sample_interval,
+            window_frames=self.frame_window_size,
+            min_frames=self.min_frames_in_zone,
+        )
 
         self.is_running = False
         self._video_resolution_set = False
@@ -90,10 +198,13 @@ class PersonZoneSystem:
         }
         self.frame_counter = 0
 
-        self.fps_log_interval = config.get("debug.fps_log_interval", 100)
+        self.fps_log_interval = self.config.get("debug.fps_log_interval", 100)
         self.processed_frames_count = 0
         self.fps_samples: Deque[float] = deque(maxlen=self.fps_log_interval)
         self.fps_log_start_time = 0.0
+        self.start_time = 0.0
+        # Задержка от получения кадра до решения по зонам, с
+        self.latency_samples: Deque[float] = deque(maxlen=self.fps_log_interval)
 
         mode_text = (
             "ДЕБАГ (эмуляция API + видео)"
@@ -105,26 +216,56 @@ class PersonZoneSystem:
             f"Логирование FPS каждые {self.fps_log_interval} обработанных кадров"
         )
 
-    def start(self) -> None:
+    def open_video(self) -> bool:
+        """Открытие видеопотока с учетом выбранного способа пропуска кадров."""
+        if self.skip_mode == "decoder":
+            self._decoder_skip = self.video_reader.set_decoder_skip(
+                self.frame_skip, self.skip_nonref
+            )
         if not self.video_reader.open():
+            return False
+
+        if self.presentation_reader is not None and not self.presentation_reader.open():
+            logger.error(
+                "Не удалось открыть поток отображения, используется поток детекции"
+            )
+            self.presentation_reader = None
+        return True
+
+    def read_next_frame(self) -> Tuple[bool, np.ndarray]:
+        """
+        Чтение следующего кадра для обработки с пропуском лишних кадров.
+
+        Returns:
+            Кортеж (успех, кадр)
+        """
+        skip = 0 if self._decoder_skip else self.frame_skip - 1
+        if skip > 0:
+            if self.skip_mode == "read":
+                for _ in range(skip):
+                    ret, frame = self.video_reader.read_frame()
+                    if not ret:
+                        return ret, frame
+            elif not self.video_reader.skip_frames(skip):
+                return False, np.zeros((480, 640, 3), dtype=np.uint8)
+
+        return self.video_reader.read_frame()
+
+    def start(self) -> None:
+        if not self.open_video():
             return
         self.is_running = True
         self.fps_log_start_time = time.time()
-        logger.info("Система запущена")
-
-        skip_counter = 0
+        self.start_time = self.fps_log_start_time
+        logger.info(f"Система запущена: камера {self.name}")
 
         try:
             while self.is_running:
-                ret, frame = self.video_reader.read_frame()
+                ret, frame = self.read_next_frame()
                 if not ret:
                     break
 
-                skip_counter += 1
-                if skip_counter < self.frame_skip:
-                    continue
-
-                skip_counter = 0
+                self._handle_stream_gap()
                 self.frame_counter += 1
 
                 if not self._video_resolution_set:
@@ -132,7 +273,7 @@ class PersonZoneSystem:
 
                 processed_frame = self.process_frame(frame)
 
-                if self.debug_mode and config.get("debug.enable_keys", False):
+                if self.debug_mode and self.config.get("debug.enable_keys", False):
                     self._show_debug_frame(processed_frame)
                     if cv2.waitKey(1) & 0xFF == 27:
                         break
@@ -142,9 +283,12 @@ class PersonZoneSystem:
     def stop(self) -> None:
         self.is_running = False
         self.video_reader.close()
-        self.api_client.reset()
+        if self.presentation_reader is not None:
+            self.presentation_reader.close()
+        if self._owns_api_client:
+            self.api_client.reset()
 
-        if self.debug_mode:
+        if self.debug_mode and self.config.get("debug.enable_keys", False):
             cv2.destroyAllWindows()
 
         if self.processed_frames_count > 0:
@@ -158,9 +302,55 @@ class PersonZoneSystem:
         else:
             logger.info("Система остановлена")
 
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получение статистики обработки камеры.
+
+        Returns:
+            Словарь с именем камеры, числом кадров, средним FPS, задержкой
+            обработки (средняя и 95-й перцентиль, мс), текущим размером входа
+            детектора и числом его переключений QoS
+        """
+        elapsed = time.time() - self.start_time if self.start_time > 0 else 0.0
+        latencies = sorted(self.latency_samples)
+        return {
+            "name": self.name,
+            "running": self.is_running,
+            "frames": self.processed_frames_count,
+            "fps": self.processed_frames_count / elapsed if elapsed > 0 else 0.0,
+            "latency_ms": (
+                sum(latencies) / len(latencies) * 1000 if latencies else 0.0
+            ),
+            "latency_p95_ms": (
+                latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0
+            ),
+            "detection_size": self.detection_size,
+            "qos_changes": self.qos.changes if self.qos is not None else 0,
+        }
+
+    def _handle_stream_gap(self) -> None:
+        """Сброс истории зон после разрыва в потоке кадров."""
+        gap = self.video_reader.pop_stream_gap()
+        if gap <= 0:
+            return
+
+        logger.warning(
+            f"Разрыв в потоке {gap:.1f} с: история зон сброшена, "
+            f"чтобы не вызвать API по устаревшим данным"
+        )
+        self.zone_history.clear()
+        self.current_tracks.clear()
+        if self.tracker is not None:
+            self.tracker.reset()
+
     def _set_video_resolution(self, frame: np.ndarray) -> None:
         video_resolution = (frame.shape[1], frame.shape[0])
-        self.zone_manager.set_target_resolution(video_resolution)
+        geometry = self.video_reader.get_frame_geometry()
+        self.zone_manager.set_target_resolution(
+            video_resolution,
+            crop=geometry["crop"],
+            source_resolution=geometry["source_resolution"],
+        )
         self._video_resolution_set = True
         logger.info(f"Установлено разрешение видео для зон: {video_resolution}")
 
@@ -179,34 +369,82 @@ class PersonZoneSystem:
         if len(self.fps_samples) >= self.fps_log_interval:
             self._log_fps_statistics()
 
+        # Запрашиваем кадр основного потока заранее, чтобы он был выровнен
+        # по времени с кадром детекции, а не с моментом окончания инференса
+        if self.presentation_reader is not None and self.debug_mode:
+            self.presentation_reader.request_frame()
+
         original_height, original_width = frame.shape[:2]
 
         detection_frame, scale_factor = self._prepare_detection_frame(
             frame, original_width, original_height
         )
 
-        results = self.model.track(
-            source=detection_frame,
-            persist=True,
-            classes=[0],
-            conf=config.get("detection.confidence", 0.7),
-            verbose=False,
-            tracker="bytetrack.yaml",
-        )
-
-        self._process_detection_results(results, scale_factor)
+        self._detect_and_track(detection_frame, scale_factor)
 
         self._check_zones()
+        self.latency_samples.append(
+            time.time() - self.video_reader.last_frame_timestamp
+        )
 
         if self.debug_mode:
+            if self.presentation_reader is not None:
+                return self._visualize_presentation_frame(frame)
             return self._visualize_frame(frame)
         return frame
 
+    def get_presentation_frame(self) -> Tuple[bool, np.ndarray]:
+        """
+        Получение кадра потока отображения, выровненного по времени с последним
+        кадром детекции. Используется визуализацией, снимками и записью.
+
+        Returns:
+            Кортеж (успех, кадр)
+        """
+        if self.presentation_reader is None:
+            return False, np.zeros((480, 640, 3), dtype=np.uint8)
+
+        ret, frame = self.presentation_reader.read_frame()
+        if not ret:
+            return ret, frame
+
+        if not self._presentation_resolution_set:
+            resolution = (frame.shape[1], frame.shape[0])
+            self.presentation_zone_manager.set_target_resolution(resolution)
+            self._presentation_resolution_set = True
+            logger.info(f"Установлено разрешение потока отображения для зон: {resolution}")
+
+        self.presentation_offset = (
+            self.presentation_reader.last_frame_timestamp
+            - self.video_reader.last_frame_timestamp
+        )
+        return True, frame
+
+    def _visualize_presentation_frame(self, detection_frame: np.ndarray) -> np.ndarray:
+        """Визуализация результатов детекции на кадре потока отображения."""
+        ret, frame = self.get_presentation_frame()
+        if not ret:
+            return self._visualize_frame(detection_frame)
+
+        scale_x = frame.shape[1] / detection_frame.shape[1]
+        scale_y = frame.shape[0] / detection_frame.shape[0]
+        tracks = [track.scaled(scale_x, scale_y) for track in self.current_tracks]
+        return self._visualize_frame(frame, self.presentation_zone_manager, tracks)
+
     def _prepare_detection_frame(
         self, frame: np.ndarray, width: int, height: int
     ) -> tuple[np.ndarray, float]:
-        """Подготавливает кадр для детекции с оптимизацией размера."""
-        if not self.resize_for_detection or max(width, height) <= self.detection_size:
+        """
+        Подготавливает кадр для детекции с оптимизацией размера.
+
+        Если детектор сам приводит кадр ко входу модели (letterbox в бэкенде),
+        кадр передается без изменений: повторное масштабирование не нужно.
+        """
+        if (
+            not self.resize_for_detection
+            or getattr(self.detector, "resizes_input", False)
+            or max(width, height) <= self.detection_size
+        ):
             return frame, 1.0
 
         scale_factor = self.detection_size / max(width, height)
@@ -216,15 +454,146 @@ class PersonZoneSystem:
 
         return detection_frame, scale_factor
 
-    def _process_detection_results(self, results, scale_factor: float) -> None:
-        """Обрабатывает результаты детекции и создает треки."""
-        self.current_tracks.clear()
+    def _detect_and_track(
+        self, detection_frame: np.ndarray, scale_factor: float
+    ) -> None:
+        """Детекция людей и обновление треков камеры."""
+        if self.tracker is None:
+            fps = self.video_reader.fps or 30
+            self.tracker = PersonTracker(
+                frame_rate=round(fps / max(1, self.frame_skip))
+            )
+
+        start_time = time.perf_counter()
+        detections = self.detector.detect(
+            detection_frame, conf=self.config.get("detection.confidence", 0.7)
+        )
+        if self.qos is not None:
+            self._update_qos(time.perf_counter() - start_time)
+        tracks = self.tracker.update(detections, detection_frame)
+        self._set_tracks(
+            tracks[:, :4].astype(int), tracks[:, 4].astype(int), scale_factor
+        )
 
-        if results[0].boxes.id is None:
+    def _qos_model(self, size: int) -> Optional[SharedModel]:
+        """
+        Модель из реестра для размера входа size.
+
+        Для модели с изменяемым размером входа (веса .pt) новая копия не
+        загружается: используется та же модель с другим размером входа.
+
+        Returns:
+            Модель или None, если модель не поддерживает этот размер входа
+            (экспорт с фиксированным входом другого размера) или не загрузилась
+        """
+        settings = ScopedConfig(self.config, {"detection": {"detection_size": size}})
+        backend = self.detector.backend
+        name, path, _ = backend_options(settings)
+        if getattr(backend, "fixed_input", False) and (name, path) == (
+            backend.name,
+            backend.model_path,
+        ):
+            # Для размера нет своего варианта в манифесте - тот же файл модели
+            logger.warning(
+                f"QoS камеры {self.name}: размер входа {size} исключен, модель "
+                f"с фиксированным входом {backend.get_info().get('input_size')}"
+            )
+            return None
+
+        try:
+            model = get_shared_model(settings)
+        except Exception as e:
+            logger.error(
+                f"QoS камеры {self.name}: ошибка загрузки модели для размера "
+                f"{size}: {str(e)}"
+            )
+            return None
+
+        input_size = model.backend.get_info().get("input_size", size)
+        if max(input_size if isinstance(input_size, tuple) else (input_size,)) != size:
+            logger.warning(
+                f"QoS камеры {self.name}: размер входа {size} исключен, модель "
+                f"с фиксированным входом {input_size}"
+            )
+            return None
+        return model
+
+    def _preload_qos_models(self) -> None:
+        """Загрузка и прогрев моделей всех ступеней до начала обработки."""
+        for size in list(self.qos.ladder):
+            if size != self.detection_size and self._qos_model(size) is None:
+                self.qos.remove(size)
+
+    def _load_qos_model(self, size: int) -> None:
+        """Загрузка модели ступени в фоновом потоке."""
+        self._qos_loaded = (size, self._qos_model(size))
+
+    def _update_qos(self, latency: float) -> None:
+        """
+        Учет задержки инференса и смена размера входа по решению QoS.
+
+        Модель новой ступени загружается и прогревается в фоновом потоке, а
+        камера продолжает работу на текущей; переключение выполняется, когда
+        модель готова. Координаты треков не зависят от размера входа: бэкенд
+        возвращает рамки в координатах переданного кадра, а при
+        масштабировании кадра в системе используется текущий detection_size,
+        поэтому трекер продолжает работу без сброса.
+
+        Args:
+            latency: Задержка инференса кадра, с
+        """
+        if self._qos_loaded is not None:
+            size, model = self._qos_loaded
+            self._qos_loaded = None
+            self._qos_loader = None
+            self._switch_qos_model(size, model)
             return
 
-        boxes = results[0].boxes.xyxy.cpu().numpy().astype(int)
-        track_ids = results[0].boxes.id.cpu().numpy().astype(int)
+        fps = self.video_reader.fps or 25
+        size = self.qos.update(latency, max(1, self.frame_skip) / fps)
+        if size is None:
+            return
+
+        # До готовности модели контроллер остается на текущей ступени
+        self.qos.revert(self.detection_size)
+        if self._qos_loader is not None:
+            return
+        self._qos_reason = self.qos.last_reason
+        self._qos_loader = threading.Thread(
+            target=self._load_qos_model,
+            args=(size,),
+            name=f"QosLoader-{self.name}",
+            daemon=True,
+        )
+        self._qos_loader.start()
+
+    def _switch_qos_model(self, size: int, model: Optional[SharedModel]) -> None:
+        """
+        Переключение детектора на загруженную модель ступени.
+
+        Args:
+            size: Размер входа
+            model: Модель или None, если ступень недоступна
+        """
+        if model is None:
+            self.qos.remove(size)
+            return
+
+        previous = self.detection_size
+        self.detector = model
+        self.detection_size = size
+        self.qos.revert(size)
+        self.qos.confirm()
+        logger.info(
+            f"QoS камеры {self.name}: detection_size {previous} -> {size} "
+            f"({self._qos_reason})"
+        )
+
+    def _set_tracks(
+        self, boxes: np.ndarray, track_ids: np.ndarray, scale_factor: float
+    ) -> None:
+        """Создает треки по рамкам в координатах кадра детекции."""
+        self.current_tracks.clear()
 
         if scale_factor != 1.0:
             boxes = (boxes / scale_factor).astype(int)
@@ -282,7 +651,7 @@ class PersonZoneSystem:
             for track in self.current_tracks
         )
 
-        self.zone_history.append(person_in_any_zone)
+        self.zone_history.append(self.video_reader.last_frame_pts, person_in_any_zone)
 
         for zone in self.zone_status:
             self.zone_status[zone] = False
@@ -291,7 +660,7 @@ class PersonZoneSystem:
                 for zone in self.zone_manager.check_point(track.bottom_point):
                     self.zone_status[zone.name] = True
 
-        if sum(self.zone_history) >= self.min_frames_in_zone:
+        if self.zone_history.is_confirmed():
 
             active_zone_name = next(
                 (name for name, status in self.zone_status.items() if status),
@@ -300,7 +669,7 @@ class PersonZoneSystem:
 
             if self.debug_mode:
                 logger.info(
-                    f"[ЗАГЛУШКА] Условие выполнено ({sum(self.zone_history)}/{len(self.zone_history)} кадров), "
+                    f"[ЗАГЛУШКА] Условие выполнено ({self.zone_history.describe()}), "
                     f"API запрос к зоне '{active_zone_name}' ИМИТИРОВАН (реальная отправка отключена)"
                 )
 
@@ -312,7 +681,7 @@ class PersonZoneSystem:
                 )
                 if success:
                     logger.info(
-                        f"Условие выполнено ({sum(self.zone_history)}/{len(self.zone_history)} кадров), API вызван."
+                        f"Условие выполнено ({self.zone_history.describe()}), API вызван."
                     )
                     self.zone_history.clear()
                 else:
@@ -320,11 +689,19 @@ class PersonZoneSystem:
                         "Условие для вызова API выполнено, но вызов заблокирован таймером."
                     )
 
-    def _visualize_frame(self, frame: np.ndarray) -> np.ndarray:
+    def _visualize_frame(
+        self,
+        frame: np.ndarray,
+        zone_manager: Optional[ZoneManager] = None,
+        tracks: Optional[List[Track]] = None,
+    ) -> np.ndarray:
         """Визуализация результатов на кадре."""
+        zone_manager = zone_manager or self.zone_manager
+        tracks = self.current_tracks if tracks is None else tracks
+
         result = frame.copy()
-        result = self.zone_manager.draw_zones(result)
-        for track in self.current_tracks:
+        result = zone_manager.draw_zones(result)
+        for track in tracks:
             result = track.draw(result)
         cv2.putText(
             result,
@@ -350,10 +727,9 @@ class PersonZoneSystem:
         )
 
         # Визуализация счетчика кадров
-        history_count = sum(self.zone_history)
-        history_text = f"Frames in Zone: {history_count}/{self.frame_window_size}"
+        history_text = f"In Zone: {self.zone_history.describe()}"
         history_color = (
-            (0, 255, 0) if history_count >= self.min_frames_in_zone else (255, 255, 255)
+            (0, 255, 0) if self.zone_history.is_confirmed() else (255, 255, 255)
         )
         cv2.putText(
             result,
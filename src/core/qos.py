@@ -0,0 +1,166 @@
+"""
+Модуль управления качеством обслуживания (QoS) детекции.
+
+Контроллер следит за задержкой инференса и переключает размер входа
+детектора по лестнице qos.ladder (например, 640/512/416/320):
+    - вниз, если средняя задержка за окно превышает цель * down_ratio;
+    - вверх, если ожидаемая на следующей ступени задержка (пропорционально
+      площади входа) не превышает цель * up_ratio.
+Между переключениями выдерживается hold_seconds, а окно замеров после
+переключения начинается заново, поэтому контроллер не колеблется между
+соседними ступенями.
+"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Union
+
+from src.utils.config import Config, ScopedConfig
+
+
+class QosController:
+    """Контроллер размера входа детектора по задержке инференса."""
+
+    def __init__(
+        self,
+        ladder: List[int],
+        current: int,
+        target_ms: float = 0.0,
+        window: int = 25,
+        down_ratio: float = 0.8,
+        up_ratio: float = 0.6,
+        hold_seconds: float = 10.0,
+    ):
+        """
+        Инициализация контроллера.
+
+        Args:
+            ladder: Размеры входа (порядок не важен)
+            current: Текущий размер входа
+            target_ms: Целевая задержка инференса, мс (0 - период кадров
+                детекции, передается в update)
+            window: Количество замеров для решения
+            down_ratio: Доля цели, выше которой размер уменьшается
+            up_ratio: Доля цели, в которую должна уложиться ожидаемая задержка
+                следующей ступени для увеличения размера
+            hold_seconds: Минимальный интервал между переключениями, с
+        """
+        self.ladder = sorted(set(ladder) | {current}, reverse=True)
+        self.level = self.ladder.index(current)
+        self.target_ms = target_ms
+        self.down_ratio = down_ratio
+        self.up_ratio = up_ratio
+        self.hold_seconds = hold_seconds
+
+        self.samples: Deque[float] = deque(maxlen=max(1, window))
+        self.last_change = time.monotonic()
+        self.changes = 0
+        self.last_reason = ""
+
+    @classmethod
+    def from_config(
+        cls, settings: Union[Config, ScopedConfig], current: int
+    ) -> "QosController":
+        """
+        Создание контроллера по настройкам qos.*.
+
+        Args:
+            settings: Конфигурация
+            current: Текущий размер входа (detection.detection_size)
+
+        Returns:
+            Контроллер
+        """
+        return cls(
+            ladder=settings.get("qos.ladder", [640, 512, 416, 320]),
+            current=current,
+            target_ms=settings.get("qos.target_latency_ms", 0),
+            window=settings.get("qos.window", 25),
+            down_ratio=settings.get("qos.down_ratio", 0.8),
+            up_ratio=settings.get("qos.up_ratio", 0.6),
+            hold_seconds=settings.get("qos.hold_seconds", 10.0),
+        )
+
+    @property
+    def size(self) -> int:
+        """Текущий размер входа."""
+        return self.ladder[self.level]
+
+    def update(self, latency: float, frame_period: float = 0.0) -> Optional[int]:
+        """
+        Учет задержки инференса очередного кадра.
+
+        Args:
+            latency: Задержка инференса, с
+            frame_period: Период кадров детекции, с (цель, если target_ms = 0)
+
+        Returns:
+            Новый размер входа, если его нужно сменить, иначе None
+        """
+        self.samples.append(latency * 1000)
+        target = self.target_ms or frame_period * 1000
+        if (
+            target <= 0
+            or len(self.samples) < self.samples.maxlen
+            or time.monotonic() - self.last_change < self.hold_seconds
+        ):
+            return None
+
+        average = sum(self.samples) / len(self.samples)
+        level = self.level
+        if average > target * self.down_ratio and level < len(self.ladder) - 1:
+            level += 1
+            self.last_reason = (
+                f"задержка {average:.1f} мс > {target * self.down_ratio:.1f} мс"
+            )
+        elif level > 0:
+            # Задержка растет примерно пропорционально площади входа
+            expected = average * (self.ladder[level - 1] / self.size) ** 2
+            if expected <= target * self.up_ratio:
+                level -= 1
+                self.last_reason = (
+                    f"задержка {average:.1f} мс, ожидаемая {expected:.1f} мс "
+                    f"<= {target * self.up_ratio:.1f} мс"
+                )
+
+        if level == self.level:
+            return None
+        self.level = level
+        return self.size
+
+    def confirm(self) -> None:
+        """Учет выполненного переключения: окно замеров начинается заново."""
+        self.samples.clear()
+        self.last_change = time.monotonic()
+        self.changes += 1
+
+    def remove(self, size: int) -> None:
+        """
+        Исключение недоступной ступени (модель не поддерживает этот размер).
+
+        Args:
+            size: Размер входа
+        """
+        current = self.size
+        if size == current or size not in self.ladder:
+            return
+        self.ladder.remove(size)
+        self.level = self.ladder.index(current)
+
+    def revert(self, size: int) -> None:
+        """
+        Возврат на ступень size после неудачного переключения.
+
+        Args:
+            size: Размер входа, действовавший до переключения
+        """
+        self.level = self.ladder.index(size)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Получение состояния контроллера.
+
+        Returns:
+            Словарь: размер входа, ступени, число переключений
+        """
+        return {"size": self.size, "ladder": self.ladder, "changes": self.changes}
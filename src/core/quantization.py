@@ -0,0 +1,264 @@
+"""
+Модуль INT8-квантования детектора по кадрам с наших камер.
+
+Модель ONNX (FP32) квантуется статически средствами ONNX Runtime: диапазоны
+активаций калибруются на кадрах из записанного видео, результат сохраняется
+как ONNX в формате QDQ и загружается бэкендами onnx и openvino через
+detection.model_path. Точность оценивается на отложенных кадрах относительно
+FP32-модели (ее детекции служат эталоном, ручной разметки нет).
+"""
+
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.core.detector_backend import (
+    DetectorBackend,
+    OnnxBackend,
+    compare_detections,
+)
+from src.core.video import VideoReader
+from src.utils.logger import logger
+
+CALIBRATION_METHODS = ("minmax", "entropy", "percentile")
+
+
+def sample_frames(
+    source: str, count: int, offset: float = 0.0, start_frame: int = 0
+) -> List[np.ndarray]:
+    """
+    Выборка кадров, равномерно распределенных по видео.
+
+    Args:
+        source: Источник видео
+        count: Количество кадров
+        offset: Сдвиг выборки в долях шага (0.5 - кадры между кадрами выборки
+            с offset=0, используется для отложенной выборки)
+        start_frame: Номер первого кадра выборки
+
+    Returns:
+        Список кадров
+    """
+    reader = VideoReader(source)
+    if not reader.open():
+        logger.error(f"Не удалось открыть видео для выборки кадров: {source}")
+        return []
+
+    frames = []
+    try:
+        available = max(0, reader.frame_count - start_frame)
+        step = available / count if available > 0 else 1.0
+        for index in range(count):
+            position = start_frame + int((index + offset) * step)
+            ret, frame = reader.get_frame_by_index(position)
+            if not ret:
+                break
+            frames.append(frame.copy())
+    finally:
+        reader.close()
+
+    logger.info(f"Выбрано {len(frames)} кадров из {source}")
+    return frames
+
+
+class FrameCalibrationReader:
+    """
+    Источник калибровочных данных для ONNX Runtime.
+
+    Кадры проходят ту же предобработку, что и в бэкенде (letterbox, RGB,
+    нормализация), поэтому диапазоны активаций соответствуют реальной работе.
+    """
+
+    def __init__(self, backend: OnnxBackend, frames: List[np.ndarray]):
+        """
+        Инициализация источника.
+
+        Args:
+            backend: Бэкенд FP32-модели (для имени входа и предобработки)
+            frames: Калибровочные кадры
+        """
+        self.backend = backend
+        self.frames = frames
+        self._iterator: Optional[Iterator[np.ndarray]] = None
+        self.rewind()
+
+    def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+        frame = next(self._iterator, None)
+        if frame is None:
+            return None
+        blob, _ = self.backend._preprocess([frame])
+        # Входной тензор бэкенда переиспользуется для следующего кадра
+        return {self.backend.input_name: blob.copy()}
+
+    def rewind(self) -> None:
+        self._iterator = iter(self.frames)
+
+
+def _head_nodes(model_path: str) -> List[str]:
+    """
+    Узлы последнего модуля модели (головы Detect) в экспорте ultralytics.
+
+    Декодирование рамок (DFL, сигмоиды, конкатенация выходов) чувствительно
+    к квантованию, поэтому голова по умолчанию остается в FP32.
+    """
+    import onnx
+
+    model = onnx.load(model_path, load_external_data=False)
+    modules = {}
+    for node in model.graph.node:
+        match = re.match(r"^/model\.(\d+)/", node.name)
+        if match:
+            modules.setdefault(int(match.group(1)), []).append(node.name)
+    return modules[max(modules)] if modules else []
+
+
+def quantize_model(
+    model_path: str,
+    output_path: str,
+    frames: List[np.ndarray],
+    method: str = "minmax",
+    per_channel: bool = True,
+    keep_head_fp32: bool = True,
+) -> bool:
+    """
+    Статическое INT8-квантование модели ONNX.
+
+    Args:
+        model_path: Путь к FP32-модели .onnx
+        output_path: Путь для сохранения INT8-модели .onnx
+        frames: Калибровочные кадры
+        method: Метод калибровки: minmax, entropy или percentile
+        per_channel: Поканальное квантование весов сверток
+        keep_head_fp32: Не квантовать голову Detect
+
+    Returns:
+        True, если модель сохранена
+    """
+    from onnxruntime.quantization import (
+        CalibrationMethod,
+        QuantFormat,
+        QuantType,
+        quantize_static,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    if method not in CALIBRATION_METHODS:
+        logger.error(f"Неизвестный метод калибровки '{method}'")
+        return False
+    if not frames:
+        logger.error("Нет калибровочных кадров")
+        return False
+
+    methods = {
+        "minmax": CalibrationMethod.MinMax,
+        "entropy": CalibrationMethod.Entropy,
+        "percentile": CalibrationMethod.Percentile,
+    }
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+    # Вывод форм и упрощение графа повышают долю квантуемых узлов
+    prepared_path = str(Path(output_path).with_suffix(".prep.onnx"))
+    try:
+        quant_pre_process(model_path, prepared_path)
+    except Exception as e:
+        logger.warning(f"Предобработка модели для квантования не выполнена: {str(e)}")
+        prepared_path = model_path
+
+    excluded = _head_nodes(model_path) if keep_head_fp32 else []
+    reader = FrameCalibrationReader(OnnxBackend(model_path), frames)
+
+    start_time = time.time()
+    try:
+        quantize_static(
+            prepared_path,
+            output_path,
+            reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=per_channel,
+            calibrate_method=methods[method],
+            nodes_to_exclude=excluded,
+        )
+    except Exception as e:
+        logger.error(f"Ошибка квантования модели {model_path}: {str(e)}")
+        return False
+    finally:
+        if prepared_path != model_path:
+            Path(prepared_path).unlink(missing_ok=True)
+
+    logger.info(
+        f"INT8-модель сохранена в {output_path} за {time.time() - start_time:.1f} с "
+        f"({len(frames)} калибровочных кадров, метод {method}, "
+        f"узлов головы в FP32: {len(excluded)})"
+    )
+    return True
+
+
+def evaluate_drift(
+    reference: DetectorBackend,
+    candidate: DetectorBackend,
+    frames: List[np.ndarray],
+    conf: float = 0.5,
+    iou_threshold: float = 0.5,
+) -> Dict[str, Any]:
+    """
+    Оценка расхождения детекций проверяемой модели (INT8, экспорт) с эталонной
+    на отложенных кадрах.
+
+    Детекции эталонной модели служат разметкой: полнота - доля эталонных
+    детекций, найденных проверяемой моделью, точность - доля ее детекций,
+    совпавших с эталоном.
+
+    Args:
+        reference: Бэкенд эталонной модели (FP32)
+        candidate: Бэкенд проверяемой модели
+        frames: Отложенные кадры
+        conf: Порог уверенности
+        iou_threshold: Минимальный IoU совпадения
+
+    Returns:
+        Словарь с полнотой, точностью, средним IoU, разницей уверенности
+        и временем на кадр обеих моделей
+    """
+    matched = total_reference = total_candidate = 0
+    ious = []
+    max_conf_diff = 0.0
+    reference_time = candidate_time = 0.0
+
+    reference.detect(frames[0], conf)  # Прогрев
+    candidate.detect(frames[0], conf)
+    for frame in frames:
+        start_time = time.perf_counter()
+        expected = reference.detect(frame, conf)
+        reference_time += time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        actual = candidate.detect(frame, conf)
+        candidate_time += time.perf_counter() - start_time
+
+        stats = compare_detections(expected, actual, iou_threshold)
+        matched += stats["matched"]
+        total_reference += stats["reference"]
+        total_candidate += stats["candidate"]
+        if stats["matched"]:
+            ious.append(stats["mean_iou"])
+        max_conf_diff = max(max_conf_diff, stats["max_conf_diff"])
+
+    reference_ms = reference_time / len(frames) * 1000
+    candidate_ms = candidate_time / len(frames) * 1000
+    return {
+        "frames": len(frames),
+        "reference_detections": total_reference,
+        "candidate_detections": total_candidate,
+        "recall": matched / total_reference if total_reference else 1.0,
+        "precision": matched / total_candidate if total_candidate else 1.0,
+        "mean_iou": float(np.mean(ious)) if ious else 0.0,
+        "max_conf_diff": max_conf_diff,
+        "reference_ms": reference_ms,
+        "candidate_ms": candidate_ms,
+        "speedup": reference_ms / candidate_ms if candidate_ms > 0 else 0.0,
+    }
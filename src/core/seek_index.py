@@ -0,0 +1,252 @@
+"""
+Модуль индекса ключевых кадров для быстрой перемотки видеофайлов.
+
+Индекс строится один раз чтением пакетов без декодирования и сохраняется
+рядом с видео. По нему перемотка выполняется к ближайшему предшествующему
+ключевому кадру с декодированием вперед только до нужного кадра.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+
+from src.utils.logger import logger
+
+INDEX_SUFFIX = ".seekindex.json"
+INDEX_VERSION = 1
+# Размер фрагментов начала и конца файла, по которым считается хеш
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_hash(path: str) -> str:
+    """
+    Хеш видеофайла для проверки актуальности индекса.
+
+    Учитываются размер файла и его первый и последний мегабайт, чтобы не
+    читать целиком многогигабайтные записи.
+
+    Args:
+        path: Путь к файлу
+
+    Returns:
+        Шестнадцатеричная строка хеша
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(HASH_CHUNK_SIZE))
+        if size > HASH_CHUNK_SIZE:
+            f.seek(max(HASH_CHUNK_SIZE, size - HASH_CHUNK_SIZE))
+            digest.update(f.read(HASH_CHUNK_SIZE))
+    return digest.hexdigest()
+
+
+class KeyframeIndex:
+    """Индекс времени кадров и ключевых кадров видеофайла."""
+
+    def __init__(
+        self,
+        frame_pts: List[float],
+        keyframes: List[int],
+        fps: float,
+        source_hash: str = "",
+    ):
+        """
+        Инициализация индекса.
+
+        Args:
+            frame_pts: Время кадров в миллисекундах в порядке показа
+            keyframes: Номера ключевых кадров в порядке показа (по возрастанию)
+            fps: Частота кадров видео
+            source_hash: Хеш видеофайла, для которого построен индекс
+        """
+        self.frame_pts = frame_pts
+        self.keyframes = keyframes
+        self.fps = fps
+        self.source_hash = source_hash
+
+    @property
+    def frame_count(self) -> int:
+        """Количество кадров в видео."""
+        return len(self.frame_pts)
+
+    @staticmethod
+    def index_path(source: str) -> Path:
+        """Путь к файлу индекса рядом с видео."""
+        return Path(source + INDEX_SUFFIX)
+
+    @classmethod
+    def build(cls, source: str) -> Optional["KeyframeIndex"]:
+        """
+        Построение индекса чтением пакетов без декодирования.
+
+        Args:
+            source: Путь к видеофайлу
+
+        Returns:
+            Индекс или None, если файл не удалось прочитать
+        """
+        start_time = time.time()
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            logger.error(f"Не удалось открыть видео для построения индекса: {source}")
+            return None
+
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            # Режим чтения сырых пакетов: grab() не декодирует кадры
+            if not cap.set(cv2.CAP_PROP_FORMAT, -1):
+                logger.warning("Чтение пакетов без декодирования не поддерживается")
+                return None
+
+            packets = []
+            while cap.grab():
+                packets.append(
+                    (
+                        cap.get(cv2.CAP_PROP_POS_MSEC),
+                        bool(cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME)),
+                    )
+                )
+        finally:
+            cap.release()
+
+        if not packets:
+            logger.error(f"В видео не найдено ни одного кадра: {source}")
+            return None
+
+        # Пакеты идут в порядке декодирования, а номера кадров - в порядке показа
+        packets.sort(key=lambda packet: packet[0])
+        frame_pts = [pts for pts, _ in packets]
+        keyframes = [i for i, (_, is_key) in enumerate(packets) if is_key] or [0]
+        if keyframes[0] != 0:
+            keyframes.insert(0, 0)
+
+        index = cls(frame_pts, keyframes, fps, file_hash(source))
+        logger.info(
+            f"Построен индекс перемотки: {index.frame_count} кадров, "
+            f"{len(keyframes)} ключевых, за {time.time() - start_time:.2f} с"
+        )
+        return index
+
+    @classmethod
+    def load(cls, source: str) -> Optional["KeyframeIndex"]:
+        """
+        Загрузка сохраненного индекса, если он соответствует файлу.
+
+        Args:
+            source: Путь к видеофайлу
+
+        Returns:
+            Индекс или None, если он отсутствует или устарел
+        """
+        path = cls.index_path(source)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                return None
+            if data.get("hash") != file_hash(source):
+                logger.info(f"Индекс перемотки устарел: {path}")
+                return None
+            return cls(data["frame_pts"], data["keyframes"], data["fps"], data["hash"])
+        except Exception as e:
+            logger.warning(f"Не удалось загрузить индекс перемотки {path}: {str(e)}")
+            return None
+
+    def save(self, source: str) -> bool:
+        """
+        Сохранение индекса рядом с видеофайлом.
+
+        Args:
+            source: Путь к видеофайлу
+
+        Returns:
+            True, если индекс сохранен
+        """
+        path = self.index_path(source)
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f)
+            logger.debug(f"Индекс перемотки сохранен: {path}")
+            return True
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить индекс перемотки {path}: {str(e)}")
+            return False
+
+    @classmethod
+    def load_or_build(cls, source: str) -> Optional["KeyframeIndex"]:
+        """
+        Загрузка индекса или его построение и сохранение.
+
+        Args:
+            source: Путь к видеофайлу
+
+        Returns:
+            Индекс или None, если его не удалось получить
+        """
+        index = cls.load(source)
+        if index is not None:
+            return index
+
+        index = cls.build(source)
+        if index is not None:
+            index.save(source)
+        return index
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Представление индекса для сохранения в JSON."""
+        return {
+            "version": INDEX_VERSION,
+            "hash": self.source_hash,
+            "fps": self.fps,
+            "frame_pts": self.frame_pts,
+            "keyframes": self.keyframes,
+        }
+
+    def keyframe_before(self, frame_index: int) -> int:
+        """
+        Номер ближайшего ключевого кадра не позже указанного.
+
+        Args:
+            frame_index: Номер кадра
+
+        Returns:
+            Номер ключевого кадра
+        """
+        position = bisect.bisect_right(self.keyframes, frame_index) - 1
+        return self.keyframes[max(0, position)]
+
+    def pts_of(self, frame_index: int) -> float:
+        """
+        Время кадра в миллисекундах.
+
+        Args:
+            frame_index: Номер кадра
+
+        Returns:
+            Время кадра
+        """
+        frame_index = min(max(0, frame_index), self.frame_count - 1)
+        return self.frame_pts[frame_index]
+
+    def frame_at(self, position_seconds: float) -> int:
+        """
+        Номер кадра, показываемого в указанный момент.
+
+        Args:
+            position_seconds: Позиция в секундах
+
+        Returns:
+            Номер последнего кадра с временем не позже позиции
+        """
+        position = bisect.bisect_right(self.frame_pts, position_seconds * 1000.0 + 0.5)
+        return min(max(0, position - 1), self.frame_count - 1)
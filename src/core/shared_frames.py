@@ -0,0 +1,552 @@
+"""
+Модуль для обмена кадрами между процессами через разделяемую память.
+
+Процесс-декодер открывает видеопоток один раз (одно RTSP-подключение на
+камеру) и записывает кадры в кольцевой буфер фиксированного размера в
+`multiprocessing.shared_memory`. Любое количество читателей (детектор,
+превью, запись) подключаются к буферу по имени: SharedFrameRing.read отдает
+представление слота без копирования, SharedFrameCapture - проверенную копию.
+
+Структура сегмента:
+    [заголовок int64 x 8][seq int64 x N][timestamp float64 x N][кадры uint8 x N*H*W*C]
+"""
+
+import multiprocessing as mp
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.utils.config import config
+from src.utils.logger import logger
+
+SHM_SCHEME = "shm://"
+
+_MAGIC = 0x50_5A_46_52  # "PZFR"
+_HEADER_FIELDS = 8
+# Индексы полей заголовка
+_H_MAGIC = 0
+_H_SLOTS = 1
+_H_HEIGHT = 2
+_H_WIDTH = 3
+_H_CHANNELS = 4
+_H_LATEST_SEQ = 5
+_H_CLOSED = 6
+_H_FPS_MILLI = 7
+
+_SLOT_WRITING = -1  # Метка слота, в который идет запись
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Подключение к сегменту без регистрации в resource_tracker.
+
+    До Python 3.13 присоединившийся процесс регистрирует сегмент в своем
+    resource_tracker и удаляет его при завершении, что ломает остальных
+    читателей. Удалением сегмента занимается только писатель.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, create=False, track=False)
+
+    from multiprocessing import resource_tracker
+
+    original_register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name, create=False)
+    finally:
+        resource_tracker.register = original_register
+
+
+class SharedFrameRing:
+    """Кольцевой буфер кадров в разделяемой памяти."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        """
+        Инициализация поверх существующего сегмента.
+
+        Используйте SharedFrameRing.create или SharedFrameRing.attach.
+
+        Args:
+            shm: Сегмент разделяемой памяти
+            owner: True, если буфер создан этим процессом (он удаляет сегмент)
+        """
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+
+        self._header = np.ndarray(
+            (_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf, offset=0
+        )
+        if int(self._header[_H_MAGIC]) != _MAGIC:
+            raise ValueError(f"Сегмент {shm.name} не является буфером кадров")
+
+        self.slots = int(self._header[_H_SLOTS])
+        self.height = int(self._header[_H_HEIGHT])
+        self.width = int(self._header[_H_WIDTH])
+        self.channels = int(self._header[_H_CHANNELS])
+
+        offset = _HEADER_FIELDS * 8
+        self._seqs = np.ndarray(
+            (self.slots,), dtype=np.int64, buffer=shm.buf, offset=offset
+        )
+        offset += self.slots * 8
+        self._timestamps = np.ndarray(
+            (self.slots,), dtype=np.float64, buffer=shm.buf, offset=offset
+        )
+        offset += self.slots * 8
+        self._frames = np.ndarray(
+            (self.slots, self.height, self.width, self.channels),
+            dtype=np.uint8,
+            buffer=shm.buf,
+            offset=offset,
+        )
+
+    @staticmethod
+    def _segment_size(slots: int, height: int, width: int, channels: int) -> int:
+        return _HEADER_FIELDS * 8 + slots * 16 + slots * height * width * channels
+
+    @classmethod
+    def create(
+        cls,
+        name: str,
+        slots: int,
+        height: int,
+        width: int,
+        channels: int = 3,
+        fps: float = 0.0,
+    ) -> "SharedFrameRing":
+        """
+        Создание нового кольцевого буфера.
+
+        Args:
+            name: Имя сегмента разделяемой памяти
+            slots: Количество слотов в кольце
+            height: Высота кадра
+            width: Ширина кадра
+            channels: Количество каналов
+            fps: FPS источника (для информации читателям)
+
+        Returns:
+            Созданный буфер
+        """
+        size = cls._segment_size(slots, height, width, channels)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_H_MAGIC] = _MAGIC
+        header[_H_SLOTS] = slots
+        header[_H_HEIGHT] = height
+        header[_H_WIDTH] = width
+        header[_H_CHANNELS] = channels
+        header[_H_FPS_MILLI] = int(fps * 1000)
+        del header
+
+        ring = cls(shm, owner=True)
+        ring._seqs[:] = 0
+        ring._timestamps[:] = 0.0
+
+        logger.info(
+            f"Создан буфер кадров '{name}': {slots} слотов {width}x{height}x{channels} "
+            f"({size / (1024 * 1024):.1f} MB)"
+        )
+        return ring
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedFrameRing":
+        """
+        Подключение к существующему кольцевому буферу.
+
+        Args:
+            name: Имя сегмента разделяемой памяти
+
+        Returns:
+            Подключенный буфер
+        """
+        return cls(_attach_untracked(name), owner=False)
+
+    @property
+    def latest_seq(self) -> int:
+        """Номер последнего записанного кадра (0 - кадров еще нет)."""
+        return int(self._header[_H_LATEST_SEQ])
+
+    @property
+    def closed(self) -> bool:
+        """True, если писатель завершил работу."""
+        return bool(self._header[_H_CLOSED])
+
+    @property
+    def fps(self) -> float:
+        """FPS источника."""
+        return int(self._header[_H_FPS_MILLI]) / 1000.0
+
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        """
+        Запись кадра в следующий слот.
+
+        Args:
+            frame: Кадр размера (height, width, channels)
+            timestamp: Время захвата кадра (по умолчанию - текущее)
+
+        Returns:
+            Номер записанного кадра
+        """
+        seq = self.latest_seq + 1
+        slot = seq % self.slots
+
+        # Помечаем слот как записываемый, чтобы читатели не получили рваный кадр
+        self._seqs[slot] = _SLOT_WRITING
+        self._frames[slot] = frame
+        self._timestamps[slot] = time.time() if timestamp is None else timestamp
+        self._seqs[slot] = seq
+        self._header[_H_LATEST_SEQ] = seq
+        return seq
+
+    def read(
+        self, seq: Optional[int] = None, copy: bool = False
+    ) -> Tuple[bool, Optional[np.ndarray], int, float]:
+        """
+        Получение кадра из буфера.
+
+        Без копирования возвращается представление слота: оно действительно,
+        пока писатель не сделает еще `slots` записей (проверяется через is_valid).
+
+        Args:
+            seq: Номер кадра (None - последний записанный)
+            copy: Вернуть копию кадра вместо представления
+
+        Returns:
+            Кортеж (успех, кадр, номер кадра, время захвата)
+        """
+        if seq is None:
+            seq = self.latest_seq
+        if seq <= 0:
+            return False, None, 0, 0.0
+
+        slot = seq % self.slots
+        if int(self._seqs[slot]) != seq:
+            return False, None, seq, 0.0
+
+        frame = self._frames[slot]
+        timestamp = float(self._timestamps[slot])
+        if copy:
+            frame = frame.copy()
+            # Слот мог быть перезаписан во время копирования
+            if int(self._seqs[slot]) != seq:
+                return False, None, seq, 0.0
+
+        return True, frame, seq, timestamp
+
+    def is_valid(self, seq: int) -> bool:
+        """
+        Проверка, что кадр с указанным номером еще не перезаписан.
+
+        Args:
+            seq: Номер кадра
+
+        Returns:
+            True, если слот по-прежнему содержит этот кадр
+        """
+        return seq > 0 and int(self._seqs[seq % self.slots]) == seq
+
+    def mark_closed(self) -> None:
+        """Пометка буфера как закрытого писателем."""
+        self._header[_H_CLOSED] = 1
+
+    def close(self) -> None:
+        """Отключение от буфера (владелец также удаляет сегмент)."""
+        # Представления должны быть освобождены до закрытия сегмента
+        del self._header, self._seqs, self._timestamps, self._frames
+        try:
+            self.shm.close()
+        except BufferError:
+            logger.warning(
+                f"Буфер кадров '{self.name}': остались внешние ссылки на кадры"
+            )
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            logger.info(f"Буфер кадров '{self.name}' удален")
+
+
+class SharedFrameCapture:
+    """
+    Источник кадров из кольцевого буфера с интерфейсом cv2.VideoCapture.
+
+    Позволяет VideoReader читать источник вида "shm://<имя>".
+    """
+
+    def __init__(
+        self, name: str, attach_timeout: float = 10.0, read_timeout: float = 5.0
+    ):
+        """
+        Инициализация источника.
+
+        Args:
+            name: Имя сегмента разделяемой памяти
+            attach_timeout: Время ожидания появления буфера в секундах
+            read_timeout: Время ожидания нового кадра в секундах
+        """
+        self.name = name
+        self.read_timeout = read_timeout
+        self.ring: Optional[SharedFrameRing] = None
+        self.last_seq = 0
+        self.last_timestamp = 0.0
+        self.missed_frames = 0
+        self._grabbed = False  # grab() получил кадр, который еще можно забрать
+
+        deadline = time.time() + attach_timeout
+        while self.ring is None:
+            try:
+                self.ring = SharedFrameRing.attach(name)
+            except FileNotFoundError:
+                if time.time() >= deadline:
+                    logger.error(f"Буфер кадров '{name}' не найден")
+                    return
+                time.sleep(0.1)
+
+        # Начинаем с текущего положения писателя
+        self.last_seq = self.ring.latest_seq
+
+    def isOpened(self) -> bool:
+        return self.ring is not None
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Получение копии следующего нового кадра.
+
+        Слот может быть перезаписан писателем во время копирования, поэтому
+        после копирования номер кадра в слоте сверяется повторно; рваный кадр
+        отбрасывается и берется более новый.
+
+        Args:
+            image: Если указан, кадр копируется в этот массив
+
+        Returns:
+            Кортеж (успех, кадр)
+        """
+        if self.ring is None:
+            return False, None
+
+        deadline = time.time() + self.read_timeout
+        while True:
+            latest = self.ring.latest_seq
+            if latest > self.last_seq:
+                ok, frame = self._copy_slot(latest, image)
+                if ok:
+                    self.missed_frames += latest - self.last_seq - 1
+                    self.last_seq = latest
+                    return True, frame
+            elif self.ring.closed or time.time() >= deadline:
+                return False, None
+            time.sleep(0.001)
+
+    def _copy_slot(
+        self, seq: int, image: Optional[np.ndarray]
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        """Копирование кадра seq с проверкой, что слот не перезаписан."""
+        if image is None:
+            ok, frame, _, timestamp = self.ring.read(seq, copy=True)
+        else:
+            ok, frame, _, timestamp = self.ring.read(seq)
+            if ok:
+                np.copyto(image, frame)
+                ok = self.ring.is_valid(seq)
+                frame = image
+        if not ok:
+            return False, None
+        self.last_timestamp = timestamp
+        return True, frame
+
+    def grab(self) -> bool:
+        """Ожидание нового кадра без его копирования."""
+        if self.ring is None:
+            return False
+
+        deadline = time.time() + self.read_timeout
+        while True:
+            latest = self.ring.latest_seq
+            if latest > self.last_seq:
+                self.missed_frames += latest - self.last_seq - 1
+                self.last_seq = latest
+                self._grabbed = True
+                return True
+            if self.ring.closed or time.time() >= deadline:
+                self._grabbed = False
+                return False
+            time.sleep(0.001)
+
+    def retrieve(
+        self, image: Optional[np.ndarray] = None
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Получение копии кадра, захваченного последним вызовом grab().
+
+        Args:
+            image: Массив для записи кадра
+
+        Returns:
+            Кортеж (успех, кадр); False, если слот уже перезаписан
+        """
+        if not self._grabbed:
+            return False, None
+        return self._copy_slot(self.last_seq, image)
+
+    def get(self, prop_id: int) -> float:
+        if self.ring is None:
+            return 0.0
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.ring.width)
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.ring.height)
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.ring.fps
+        if prop_id == cv2.CAP_PROP_POS_MSEC:
+            return self.last_timestamp * 1000.0
+        return 0.0
+
+    def set(self, prop_id: int, value: float) -> bool:
+        # Перемотка и смена параметров живого буфера не поддерживаются
+        return False
+
+    def release(self) -> None:
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+
+def _decoder_main(
+    source: str,
+    name: str,
+    slots: int,
+    stop_event: Any,
+    config_path: Optional[str] = None,
+) -> None:
+    """
+    Точка входа процесса-декодера.
+
+    Args:
+        source: Источник видео для VideoReader
+        name: Имя сегмента разделяемой памяти
+        slots: Количество слотов в кольце
+        stop_event: Событие остановки
+        config_path: Путь к файлу конфигурации родительского процесса
+    """
+    from src.core.video import VideoReader
+
+    # Процесс запущен через spawn: конфигурация по умолчанию загружается заново
+    if config_path and os.path.exists(config_path):
+        config.__init__(config_path)
+    reader = VideoReader(source)
+    if not reader.open():
+        logger.error(f"Декодер '{name}': не удалось открыть источник")
+        return
+
+    ring: Optional[SharedFrameRing] = None
+    frames_written = 0
+    try:
+        while not stop_event.is_set():
+            ret, frame = reader.read_frame()
+            if not ret:
+                logger.warning(f"Декодер '{name}': поток завершен")
+                break
+
+            if ring is None:
+                height, width = frame.shape[:2]
+                channels = frame.shape[2] if frame.ndim == 3 else 1
+                ring = SharedFrameRing.create(
+                    name, slots, height, width, channels, fps=reader.fps
+                )
+
+            ring.write(frame, reader.last_frame_timestamp)
+            frames_written += 1
+    finally:
+        reader.close()
+        if ring is not None:
+            ring.mark_closed()
+            ring.close()
+        logger.info(f"Декодер '{name}' остановлен, записано кадров: {frames_written}")
+
+
+class DecoderProcess:
+    """Процесс-декодер, публикующий кадры источника в разделяемую память."""
+
+    def __init__(self, source: str, name: str, slots: int = 8):
+        """
+        Инициализация процесса-декодера.
+
+        Args:
+            source: Источник видео (файл или RTSP-поток)
+            name: Имя буфера, по которому подключаются читатели ("shm://<имя>")
+            slots: Количество слотов в кольце
+        """
+        self.source = source
+        self.name = name
+        self.slots = slots
+        self._ctx = mp.get_context("spawn")
+        self._stop_event = self._ctx.Event()
+        self._process: Optional[mp.process.BaseProcess] = None
+
+    def start(self) -> None:
+        """Запуск процесса-декодера."""
+        self._process = self._ctx.Process(
+            target=_decoder_main,
+            args=(
+                self.source,
+                self.name,
+                self.slots,
+                self._stop_event,
+                str(config.config_path),
+            ),
+            name=f"decoder-{self.name}",
+            daemon=True,
+        )
+        self._process.start()
+        logger.info(
+            f"Запущен процесс-декодер '{self.name}' (pid {self._process.pid}) "
+            f"для источника {self.source}"
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Остановка процесса-декодера.
+
+        Args:
+            timeout: Время ожидания завершения процесса в секундах
+        """
+        if self._process is None:
+            return
+
+        self._stop_event.set()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            logger.warning(f"Декодер '{self.name}' не завершился, принудительная остановка")
+            self._process.terminate()
+            self._process.join(timeout)
+        self._process = None
+
+    def is_alive(self) -> bool:
+        """Проверка, работает ли процесс-декодер."""
+        return self._process is not None and self._process.is_alive()
+
+    def get_info(self) -> Dict[str, Any]:
+        """
+        Получение информации о декодере.
+
+        Returns:
+            Словарь с параметрами процесса-декодера
+        """
+        return {
+            "source": self.source,
+            "name": self.name,
+            "slots": self.slots,
+            "pid": self._process.pid if self._process is not None else None,
+            "alive": self.is_alive(),
+        }
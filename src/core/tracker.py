@@ -0,0 +1,59 @@
+"""
+Модуль трекинга людей по готовым детекциям.
+
+Используется, когда детекции приходят не из model.track() (общая модель
+нескольких камер, пакетный инференс): у каждой камеры свой экземпляр
+трекера ByteTrack, поэтому идентификаторы треков не смешиваются.
+Трекер реализован на numpy (src/core/byte_tracker.py) и не импортирует
+ultralytics и torch.
+"""
+
+from typing import Optional
+
+import numpy as np
+import yaml
+
+from src.core.byte_tracker import BYTETracker
+from src.utils.logger import logger
+
+
+class PersonTracker:
+    """Трекер ByteTrack одной камеры."""
+
+    def __init__(self, frame_rate: int = 30, tracker_config: Optional[str] = None):
+        """
+        Инициализация трекера.
+
+        Args:
+            frame_rate: Частота обрабатываемых кадров (влияет на время жизни потерянных треков)
+            tracker_config: Файл YAML с параметрами ByteTrack (track_high_thresh,
+                track_buffer и др.; по умолчанию - параметры bytetrack.yaml ultralytics)
+        """
+        params = {}
+        if tracker_config:
+            with open(tracker_config, "r", encoding="utf-8") as f:
+                params = yaml.safe_load(f) or {}
+        self.frame_rate = max(1, int(frame_rate))
+        self.tracker = BYTETracker(params, frame_rate=self.frame_rate)
+        logger.debug(
+            f"Создан трекер ByteTrack {tracker_config or ''} "
+            f"(частота кадров {self.frame_rate})"
+        )
+
+    def update(self, detections: np.ndarray, frame: np.ndarray) -> np.ndarray:
+        """
+        Обновление треков по детекциям кадра.
+
+        Args:
+            detections: Массив (N, 6): x1, y1, x2, y2, confidence, class
+            frame: Кадр, на котором получены детекции (ByteTrack использует
+                только рамки, параметр оставлен для совместимости)
+
+        Returns:
+            Массив (M, 7): x1, y1, x2, y2, track_id, confidence, class
+        """
+        return self.tracker.update(detections)[:, :7]
+
+    def reset(self) -> None:
+        """Сброс всех треков."""
+        self.tracker.reset()
@@ -2,27 +2,65 @@
 Модуль для работы с видеопотоком.
 """
 
+import os
+
 import cv2
 import numpy as np
 from pathlib import Path
 from typing import Tuple, Optional, Iterator, Union, List, Dict, Any
+import threading
 import time
-from collections import deque
-
+from collections import OrderedDict
+
+from src.core.frame_buffer import FrameHistory
+from src.core.frame_cache import FrameCacheCapture, is_frame_cache
+from src.core.connection_supervisor import ConnectionSupervisor
+from src.core.ffmpeg_capture import FFmpegCapture
+from src.core.frame_grabber import FrameGrabber
+from src.core.frame_pacer import FramePacer
+from src.core.seek_index import KeyframeIndex
+from src.core.shared_frames import SHM_SCHEME, SharedFrameCapture
 from src.utils.logger import logger
-from src.utils.config import config
+from src.utils.config import Config, ScopedConfig, config
+from src.utils.threads import get_thread_budget
+
+
+def merge_capture_options(options: Dict[str, str]) -> None:
+    """
+    Добавление параметров в OPENCV_FFMPEG_CAPTURE_OPTIONS.
+
+    Переменная общая для всех захватов процесса, поэтому параметры
+    объединяются с уже заданными, а не заменяют их.
+
+    Args:
+        options: Параметры FFmpeg (имя -> значение)
+    """
+    current = os.environ.get("OPENCV_FFMPEG_CAPTURE_OPTIONS", "")
+    merged = dict(item.split(";", 1) for item in current.split("|") if ";" in item)
+    merged.update(options)
+    os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "|".join(
+        f"{key};{value}" for key, value in merged.items()
+    )
 
 
 class VideoReader:
     """Класс для чтения видеопотока."""
 
-    def __init__(self, source: Optional[str] = None):
+    def __init__(
+        self,
+        source: Optional[str] = None,
+        capture_mode: Optional[str] = None,
+        settings: Optional[Union[Config, ScopedConfig]] = None,
+    ):
         """
         Инициализация VideoReader.
 
         Args:
             source: Источник видео (путь к файлу или RTSP-поток)
+            capture_mode: Режим захвата, переопределяющий video.capture_mode
+            settings: Конфигурация (по умолчанию общая, для камер - с переопределениями)
         """
+        self.config = settings or config
         self.source = source
         self.cap = None
         self.frame_count = 0
@@ -30,33 +68,99 @@ class VideoReader:
         self.width = 0
         self.height = 0
         self.is_rtsp = False
+        self.is_shared = False  # Источник - буфер кадров в разделяемой памяти
+        # Источник - кэш декодированных кадров .npy (см. scripts/cache_frames.py)
+        self.is_cached = is_frame_cache(source)
         self.is_open = False
-        self.buffer_size = config.get("video.buffer_size", 64)
-        self.frame_buffer = deque(maxlen=self.buffer_size)
+        self.buffer_size = self.config.get(
+            "video.buffer_size", 64
+        )  # Глубина истории кадров (0 - история отключена)
+        self.frame_buffer = FrameHistory(self.buffer_size)
+        self._decode_buffer: Optional[np.ndarray] = None  # Кадр до изменения размера
+        self._batch_frames: Optional[np.ndarray] = None  # Буфер для read_batch
+        self._batch_pts: Optional[np.ndarray] = None
         self.current_frame_index = 0
-        self.loop_video = config.get(
+        self.loop_video = self.config.get(
             "video.loop", True
         )  # Параметр для зацикливания видео
-        self.target_fps = config.get(
+        self.target_fps = self.config.get(
             "video.target_fps", 0
         )  # Целевой FPS (0 - без ограничения)
-        self.last_frame_time = 0  # Время последнего кадра для ограничения FPS
+        # Выдача кадров: "auto" - fixed при target_fps > 0, иначе asap;
+        # "fixed" - с частотой target_fps, "source" - по времени кадров файла
+        # (воспроизведение в реальном времени), "asap" - без ожидания
+        self.pacing_mode = self.config.get("video.pacing", "auto")
+        self.pacer = FramePacer()
+
+        # Режим захвата: "sync" - чтение в потоке обработки,
+        # "threaded" - фоновый поток, выдающий только самый свежий кадр,
+        # "lazy" - фоновый поток захватывает кадры, а декодирует в BGR только по запросу,
+        # "auto" - threaded для живых источников под сторожем, иначе sync
+        self.capture_mode = capture_mode or self.config.get("video.capture_mode", "auto")
+        self.max_frame_age = self.config.get(
+            "video.max_frame_age", 0.0
+        )  # Максимальный возраст кадра в секундах (0 - без ограничения)
+        self.frame_wait_timeout = self.config.get("video.frame_wait_timeout", 5.0)
+        self.grabber: Optional[FrameGrabber] = None
+        self._cap_lock = threading.Lock()  # Защита захвата от конкурентного доступа
+
+        # Бэкенд декодирования: "opencv" (cv2.VideoCapture) или
+        # "ffmpeg" (процесс ffmpeg с обрезкой и масштабированием в фильтрах)
+        self.backend = self.config.get("video.backend", "opencv")
+        self.supervisor: Optional[ConnectionSupervisor] = None
+
+        # Индекс ключевых кадров для перемотки файлов (строится при первой перемотке)
+        self.seek_index_enabled = self.config.get("video.seek_index", True)
+        self.seek_index: Optional[KeyframeIndex] = None
+        self._seek_index_loaded = False
+        self.seek_stats = {"forward": 0, "jumps": 0, "corrections": 0, "cached": 0}
+        # Кадры, декодированные при перемотке назад, для покадрового шага назад
+        self.seek_cache_frames = self.config.get("video.seek_cache_frames", 8)
+        self._seek_cache: "OrderedDict[int, np.ndarray]" = OrderedDict()
+
+        # Сторож зависаний чтения: если кадров нет дольше срока, зависший
+        # захват бросается и подключение пересоздается
+        self.watchdog_enabled = self.config.get("video.watchdog.enabled", True)
+        self.watchdog_deadline = self.config.get("video.watchdog.deadline", 5.0)
+        self.gap_threshold = self.config.get(
+            "video.watchdog.gap_threshold", 1.0
+        )  # Разрыв между кадрами, о котором сообщается логике зон, с
+        self._capture_generation = 0  # Меняется при пересоздании захвата сторожем
+        self.stall_count = 0
+        self.stall_durations: List[float] = []
+        self._pending_gap = 0.0
+        self.decoder_frame_skip = 1  # Пропуск кадров, выполняемый декодером
+        self.decoder_discard_nonref = False
+        self.last_frame_timestamp = 0.0  # Время захвата последнего выданного кадра
+
+        # Время кадра для логики зон: "pts" - время кадра в источнике
+        # (CAP_PROP_POS_MSEC), "capture" - время захвата, "auto" - pts для
+        # файлов и разделяемой памяти, время захвата для RTSP
+        self.timestamp_source = self.config.get("video.timestamp_source", "auto")
+        self.last_frame_pts = 0.0  # Время последнего выданного кадра в секундах
+        self._pts_offset = 0.0  # Сдвиг шкалы времени при зацикливании файла
+        self._last_source_pts = -1.0
 
         # Проверяем, является ли источник RTSP-потоком
         if source and source.lower().startswith("rtsp://"):
             self.is_rtsp = True
-            # Настраиваем OpenCV для работы с RTSP через TCP
-            import os
-
-            os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = (
-                "rtsp_transport;tcp|stimeout;30000000"
-            )
+            # Настраиваем OpenCV для работы с RTSP через TCP, сохраняя
+            # уже заданные параметры захвата
+            merge_capture_options({"rtsp_transport": "tcp", "stimeout": "30000000"})
             logger.info("Настроен RTSP транспорт через TCP с увеличенным таймаутом")
 
+        if source and source.startswith(SHM_SCHEME):
+            self.is_shared = True
+
         logger.info(f"Инициализация VideoReader с источником: {source}")
         if self.target_fps > 0:
             logger.info(f"Установлено жесткое ограничение FPS: {self.target_fps}")
 
+    @property
+    def is_live(self) -> bool:
+        """True для источников без перемотки (RTSP-поток, разделяемая память)."""
+        return self.is_rtsp or self.is_shared
+
     def open(self) -> bool:
         """
         Открытие видеопотока.
@@ -69,13 +173,10 @@ class VideoReader:
             return False
 
         try:
-            # Для RTSP используем FFmpeg backend
-            if self.is_rtsp:
-                self.cap = cv2.VideoCapture(self.source, cv2.CAP_FFMPEG)
-            else:
-                self.cap = cv2.VideoCapture(self.source)
+            self._resolve_capture_mode()
+            self.cap = self._create_capture()
 
-            if not self.cap.isOpened():
+            if self.cap is None:
                 logger.error(f"Не удалось открыть видеопоток: {self.source}")
                 return False
 
@@ -88,7 +189,7 @@ class VideoReader:
             # is_rtsp уже определен в __init__
 
             # Если это файл и количество кадров неизвестно, пытаемся определить
-            if not self.is_rtsp and self.frame_count <= 0:
+            if not self.is_live and self.frame_count <= 0:
                 logger.warning(
                     "Не удалось определить количество кадров, попытка подсчета..."
                 )
@@ -96,9 +197,9 @@ class VideoReader:
 
             self.is_open = True
             self.current_frame_index = 0
-            self.last_frame_time = (
-                time.time()
-            )  # Инициализируем время сразу при открытии
+            self._pts_offset = 0.0
+            self._last_source_pts = -1.0
+            self.pacer = self._create_pacer()
 
             # Если задан целевой FPS, принудительно устанавливаем его
             if self.target_fps > 0:
@@ -112,11 +213,316 @@ class VideoReader:
                 f"Целевой FPS: {self.target_fps if self.target_fps > 0 else 'не ограничен'}"
             )
 
+            # Супервизор переподключения для живых источников
+            if self.is_live and self.config.get("video.reconnect.enabled", True):
+                self.supervisor = ConnectionSupervisor(
+                    self._create_capture,
+                    initial_delay=self.config.get("video.reconnect.initial_delay", 0.5),
+                    max_delay=self.config.get("video.reconnect.max_delay", 30.0),
+                    multiplier=self.config.get("video.reconnect.multiplier", 2.0),
+                    jitter=self.config.get("video.reconnect.jitter", 0.3),
+                    max_attempts=self.config.get("video.reconnect.max_attempts", 0),
+                    standby=self.config.get("video.reconnect.standby", False),
+                )
+                self.supervisor.start_standby()
+
+            self._start_grabber()
+
             return True
         except Exception as e:
             logger.error(f"Ошибка при открытии видеопотока: {str(e)}")
             return False
 
+    def _resolve_capture_mode(self) -> None:
+        """
+        Выбор режима захвата для режима auto.
+
+        Сторож может бросить зависший захват, только если чтение идет в
+        фоновом потоке, поэтому для живых источников под сторожем выбирается
+        threaded. Явно заданный sync сохраняется: зависание чтения в нем
+        ограничивается таймаутом чтения захвата (video.watchdog.deadline).
+        """
+        if self.capture_mode == "auto":
+            self.capture_mode = "threaded" if self.watchdog_active else "sync"
+            if self.watchdog_active:
+                logger.info(
+                    "Сторож зависаний включен: используется фоновый захват кадров"
+                )
+        elif self.capture_mode == "sync" and self.watchdog_active:
+            logger.warning(
+                "Синхронный захват живого источника: сторож ограничен таймаутом "
+                f"чтения {self.watchdog_deadline:.1f} с, зависшее подключение "
+                "пересоздается после его истечения"
+            )
+
+    @property
+    def watchdog_active(self) -> bool:
+        """True, если сторож зависаний чтения работает для этого источника."""
+        return self.watchdog_enabled and self.watchdog_deadline > 0 and self.is_live
+
+    def _create_pacer(self) -> FramePacer:
+        """Создание планировщика выдачи кадров по настройкам."""
+        mode = self.pacing_mode
+        if mode == "auto":
+            mode = "fixed" if self.target_fps > 0 else "asap"
+        elif mode == "source" and self.is_live:
+            # Живой поток и так приходит в реальном времени
+            mode = "asap"
+
+        pacer = FramePacer(
+            mode,
+            target_fps=self.target_fps,
+            speed=self.config.get("video.playback_speed", 1.0),
+        )
+        if pacer.enabled:
+            logger.info(f"Выдача кадров по расписанию: режим {pacer.mode}")
+        return pacer
+
+    @property
+    def uses_source_pts(self) -> bool:
+        """True, если время кадра берется из источника, а не из часов захвата."""
+        if self.timestamp_source == "auto":
+            # Время RTSP-потока в OpenCV сбрасывается при переподключении
+            return not self.is_rtsp
+        return self.timestamp_source == "pts"
+
+    def _frame_pts(self) -> float:
+        """
+        Время только что захваченного кадра на шкале источника.
+
+        Шкала монотонна: при зацикливании файла время продолжает расти,
+        а если источник не отдает время кадра, оно считается по FPS.
+
+        Returns:
+            Время кадра в секундах
+        """
+        pts = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        if pts <= self._last_source_pts:
+            pts = self._last_source_pts + (1.0 / self.fps if self.fps > 0 else 0.0)
+        self._last_source_pts = pts
+        return self._pts_offset + pts
+
+    def _rewind(self) -> None:
+        """Перемотка файла в начало с продолжением шкалы времени кадров."""
+        logger.info("Достигнут конец видео, перезапуск с начала")
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        if self._last_source_pts >= 0:
+            self._pts_offset += self._last_source_pts + (
+                1.0 / self.fps if self.fps > 0 else 0.0
+            )
+        self._last_source_pts = -1.0
+        self.current_frame_index = 0
+
+    def _start_grabber(self) -> None:
+        """Запуск фонового потока захвата для режимов threaded и lazy."""
+        if self.capture_mode == "threaded":
+            self.grabber = FrameGrabber(
+                self._read_from_capture,
+                max_frame_age=self.max_frame_age,
+                pts_fn=self._frame_pts if self.uses_source_pts else None,
+            )
+            self.grabber.start()
+        elif self.capture_mode == "lazy":
+            self.grabber = FrameGrabber(
+                self._read_from_capture,
+                max_frame_age=self.max_frame_age,
+                name="LazyFrameGrabber",
+                grab_fn=self._grab_from_capture,
+                retrieve_fn=self._retrieve_from_capture,
+                pts_fn=self._frame_pts if self.uses_source_pts else None,
+            )
+            self.grabber.start()
+
+    def _recycle_capture(self, stall: float) -> bool:
+        """
+        Пересоздание зависшего захвата.
+
+        Заблокированный в read() захват нельзя безопасно освободить из другого
+        потока, поэтому он бросается: старый поток захвата сам освободит его,
+        когда чтение вернется. Новый захват получает свою блокировку.
+
+        Args:
+            stall: Время без кадров в секундах
+
+        Returns:
+            True, если захват пересоздан
+        """
+        self.stall_count += 1
+        logger.warning(
+            f"Чтение видеопотока зависло: нет кадров {stall:.1f} с "
+            f"(срок {self.watchdog_deadline:.1f} с), подключение пересоздается"
+        )
+
+        if self.grabber is not None:
+            self.grabber.abandon()
+            self.grabber = None
+
+        self._capture_generation += 1
+        self._cap_lock = threading.Lock()
+        self._decode_buffer = None
+
+        with self._cap_lock:
+            cap = self._create_capture()
+            if cap is None and self.supervisor is not None:
+                cap = self.supervisor.reconnect(lambda: None)
+        if cap is None:
+            logger.error("Не удалось пересоздать подключение после зависания")
+            return False
+
+        self.cap = cap
+        self._start_grabber()
+        return True
+
+    def pop_stream_gap(self) -> float:
+        """
+        Получение и сброс разрыва в потоке кадров.
+
+        Разрыв фиксируется, когда между двумя выданными кадрами прошло больше
+        video.watchdog.gap_threshold секунд (зависание, обрыв связи). Логика
+        зон должна сбросить накопленную историю, чтобы она не сработала на
+        устаревших данных.
+
+        Returns:
+            Длительность разрыва в секундах (0 - разрыва не было)
+        """
+        gap, self._pending_gap = self._pending_gap, 0.0
+        return gap
+
+    def _create_capture(self) -> Optional[Any]:
+        """
+        Создание и открытие захвата для текущего источника и бэкенда.
+
+        Returns:
+            Открытый захват или None, если открыть источник не удалось
+        """
+        # Для RTSP используем FFmpeg backend
+        if self.is_shared:
+            cap = SharedFrameCapture(
+                self.source[len(SHM_SCHEME) :],
+                read_timeout=self.frame_wait_timeout,
+            )
+        elif self.is_cached:
+            cap = FrameCacheCapture(self.source)
+        elif self.backend == "ffmpeg":
+            cap = self._create_ffmpeg_capture()
+        elif self.is_rtsp:
+            cap = cv2.VideoCapture(self.source, cv2.CAP_FFMPEG, self._open_params())
+        else:
+            cap = cv2.VideoCapture(self.source, cv2.CAP_ANY, self._open_params())
+
+        if not cap.isOpened():
+            cap.release()
+            return None
+        return cap
+
+    def _open_params(self) -> List[int]:
+        """
+        Параметры открытия cv2.VideoCapture.
+
+        Число потоков декодера берется из бюджета (threads.decode). В
+        синхронном режиме под сторожем чтение ограничивается таймаутом:
+        заблокированный read() возвращает ошибку, и подключение пересоздается.
+
+        Returns:
+            Список пар (свойство, значение)
+        """
+        params = [cv2.CAP_PROP_N_THREADS, get_thread_budget()["decode"]]
+        if self.capture_mode == "sync" and self.watchdog_active:
+            timeout = int(self.watchdog_deadline * 1000)
+            params += [
+                cv2.CAP_PROP_OPEN_TIMEOUT_MSEC,
+                timeout,
+                cv2.CAP_PROP_READ_TIMEOUT_MSEC,
+                timeout,
+            ]
+        return params
+
+    def _release_capture(self) -> None:
+        """Освобождение текущего захвата."""
+        if self.cap is not None:
+            try:
+                self.cap.release()
+            except Exception as e:
+                logger.debug(f"Ошибка при освобождении захвата: {str(e)}")
+
+    def _reconnect(self, generation: int) -> bool:
+        """
+        Переподключение к источнику через супервизор.
+
+        Вызывается при захваченной блокировке _cap_lock.
+
+        Args:
+            generation: Поколение захвата, для которого выполняется переподключение
+
+        Returns:
+            True, если подключение восстановлено
+        """
+        if (
+            self.supervisor is None
+            or not self.is_open
+            or generation != self._capture_generation
+        ):
+            return False
+
+        cap = self.supervisor.reconnect(self._release_capture)
+        if cap is None:
+            return False
+
+        if generation != self._capture_generation:
+            # Пока шло переподключение, сторож уже пересоздал захват
+            cap.release()
+            return False
+
+        self.cap = cap
+        return True
+
+    def get_connection_stats(self) -> Dict[str, Any]:
+        """
+        Получение метрик подключения (обрывы и переподключения).
+
+        Returns:
+            Словарь с метриками супервизора (пустой, если супервизор не используется)
+        """
+        if self.supervisor is None:
+            return {}
+        return self.supervisor.get_stats()
+
+    def _create_ffmpeg_capture(self) -> FFmpegCapture:
+        """
+        Создание источника на основе процесса ffmpeg.
+
+        Returns:
+            Источник FFmpegCapture с параметрами из секции video.ffmpeg
+        """
+        size = self.config.get("video.ffmpeg.size")
+        return FFmpegCapture(
+            self.source,
+            max_side=self.config.get("video.ffmpeg.max_side", 0),
+            size=tuple(size) if size else None,
+            crop=self.config.get("video.ffmpeg.crop"),
+            ffmpeg_path=self.config.get("video.ffmpeg.path", "ffmpeg"),
+            threads=self.config.get("video.ffmpeg.threads", 0)
+            or get_thread_budget()["decode"],
+            frame_skip=self.decoder_frame_skip,
+            discard_nonref=self.decoder_discard_nonref,
+        )
+
+    def get_frame_geometry(self) -> Dict[str, Any]:
+        """
+        Получение геометрии выдаваемого кадра относительно исходного.
+
+        Returns:
+            Словарь с исходным разрешением, областью обрезки (или None)
+            и разрешением выдаваемого кадра
+        """
+        if isinstance(self.cap, FFmpegCapture):
+            return self.cap.get_geometry()
+        return {
+            "source_resolution": (self.width, self.height),
+            "crop": None,
+            "output_resolution": (self.width, self.height),
+        }
+
     def read_frame(self) -> Tuple[bool, np.ndarray]:
         """
         Чтение следующего кадра из видеопотока.
@@ -128,58 +534,547 @@ class VideoReader:
             logger.error("Видеопоток не открыт")
             return False, np.zeros((480, 640, 3), dtype=np.uint8)
 
-        # Жесткое ограничение FPS
-        if self.target_fps > 0:
-            current_time = time.time()
-            frame_interval = 1.0 / self.target_fps
-            elapsed = current_time - self.last_frame_time
+        if self.grabber is not None:
+            ret, frame, timestamp, pts = self._next_frame()
+            if ret:
+                self.frame_buffer.append(frame)
+        else:
+            # Декодируем прямо в слот буфера истории, чтобы избежать копирования
+            slot = self.frame_buffer.next_slot(self._output_frame_shape())
+            ret, frame, timestamp, pts = self._next_frame(slot)
+
+            if ret and slot is not None:
+                if np.may_share_memory(frame, slot):
+                    self.frame_buffer.commit()
+                else:
+                    # Размер кадра не совпал со слотом - сохраняем копию
+                    self.frame_buffer.append(frame)
+
+        if ret:
+            self._on_frame(timestamp, pts)
+            return True, frame
+        else:
+            logger.debug("Не удалось прочитать кадр")
+            return False, np.zeros((480, 640, 3), dtype=np.uint8)
+
+    def read_batch(
+        self, batch_size: int, frame_skip: int = 1, skip_mode: str = "grab"
+    ) -> Tuple[int, np.ndarray, np.ndarray]:
+        """
+        Чтение пачки кадров в один непрерывный массив (N, H, W, 3).
+
+        Массив выделяется один раз и переиспользуется: кадры декодируются
+        прямо в его слоты. Предназначено для офлайн-обработки записей с
+        пакетным инференсом; кадры пачки не попадают в буфер истории.
+
+        Args:
+            batch_size: Количество кадров в пачке
+            frame_skip: Брать каждый N-й кадр (не учитывается, если кадры
+                уже пропускает декодер, см. set_decoder_skip)
+            skip_mode: Способ пропуска: "grab" - без декодирования в BGR,
+                "read" - полное чтение
 
-            # Если прошло меньше времени, чем нужно для соблюдения FPS, ждем
-            if elapsed < frame_interval:
-                sleep_time = frame_interval - elapsed
-                time.sleep(sleep_time)
-                # Логируем информацию о задержке (раз в 100 кадров)
-                if self.current_frame_index % 100 == 0:
-                    logger.debug(f"Задержка для соблюдения FPS: {sleep_time:.4f} с")
+        Returns:
+            Кортеж (количество прочитанных кадров, кадры, время кадров в секундах).
+            Массивы действительны до следующего вызова
+        """
+        if not self.is_open or self.cap is None:
+            logger.error("Видеопоток не открыт")
+            return 0, np.zeros((0, 480, 640, 3), dtype=np.uint8), np.zeros(0)
+
+        shape = (batch_size,) + tuple(self._output_frame_shape())
+        if self._batch_frames is None or self._batch_frames.shape != shape:
+            self._batch_frames = np.empty(shape, dtype=np.uint8)
+            self._batch_pts = np.zeros(batch_size, dtype=np.float64)
+            logger.debug(
+                f"Выделен буфер пачки кадров {shape} "
+                f"({self._batch_frames.nbytes / (1024 * 1024):.1f} MB)"
+            )
+
+        skip = 0 if self.decoder_frame_skip > 1 else max(0, frame_skip - 1)
+        count = 0
+        while count < batch_size:
+            slot = self._batch_frames[count]
+            if skip > 0:
+                if skip_mode == "read":
+                    # Пропускаемые кадры декодируются в тот же слот
+                    if not all(self._next_frame(slot)[0] for _ in range(skip)):
+                        break
+                elif not self.skip_frames(skip):
+                    break
+
+            ret, frame, timestamp, pts = self._next_frame(slot)
+            if not ret:
+                break
+            if not np.may_share_memory(frame, slot):
+                if frame.shape == slot.shape:
+                    np.copyto(slot, frame)
+                else:
+                    cv2.resize(frame, (slot.shape[1], slot.shape[0]), dst=slot)
+
+            self._on_frame(timestamp, pts)
+            self._batch_pts[count] = pts
+            count += 1
+
+        return count, self._batch_frames[:count], self._batch_pts[:count]
+
+    def _next_frame(
+        self, out: Optional[np.ndarray] = None
+    ) -> Tuple[bool, Optional[np.ndarray], float, float]:
+        """
+        Получение следующего кадра из фонового потока или из захвата.
 
-            self.last_frame_time = time.time()  # Обновляем время после сна
+        Args:
+            out: Массив для записи кадра при синхронном чтении
+
+        Returns:
+            Кортеж (успех, кадр, время захвата, время кадра на шкале источника)
+        """
+        if self.grabber is not None:
+            ret, frame, timestamp = self._wait_for_frame()
+            return ret, frame, timestamp, self.grabber.last_pts if ret else 0.0
 
         try:
-            ret, frame = self.cap.read()
+            ret, frame = self._read_from_capture(out)
+            if not ret and self._sync_stalled():
+                ret, frame = self._read_from_capture(out)
+        except Exception as e:
+            logger.error(f"Ошибка при чтении кадра: {str(e)}")
+            return False, None, 0.0, 0.0
+
+        timestamp = time.time()
+        pts = timestamp
+        if ret and self.uses_source_pts:
+            pts = self._frame_pts()
+        return ret, frame, timestamp, pts
+
+    def _sync_stalled(self) -> bool:
+        """
+        Проверка сторожа после неудачного синхронного чтения.
+
+        Чтение вернулось по таймауту, а супервизор не восстановил подключение
+        (переподключение отключено): захват пересоздается, как в фоновом
+        режиме.
+
+        Returns:
+            True, если захват пересоздан и чтение можно повторить
+        """
+        if not self.watchdog_active or self.supervisor is not None:
+            return False
+        stall = time.time() - self.last_frame_timestamp
+        if self.last_frame_timestamp <= 0 or stall < self.watchdog_deadline:
+            return False
+        self.stall_durations.append(stall)
+        cap = self.cap
+        if not self._recycle_capture(stall):
+            return False
+        cap.release()  # Чтение завершено, брошенный захват никем не используется
+        return True
+
+    def _on_frame(self, timestamp: float, pts: float) -> None:
+        """
+        Учет выданного кадра: разрывы потока, счетчики, время и расписание выдачи.
+
+        Args:
+            timestamp: Время захвата кадра
+            pts: Время кадра на шкале источника
+        """
+        # Разрыв в потоке (зависание, обрыв) - сообщаем логике зон
+        if (
+            self.last_frame_timestamp > 0
+            and self.gap_threshold > 0
+            and timestamp - self.last_frame_timestamp > self.gap_threshold
+        ):
+            self._pending_gap = timestamp - self.last_frame_timestamp
+            logger.warning(f"Разрыв в видеопотоке: {self._pending_gap:.2f} с")
+
+        # Увеличиваем счетчик кадров
+        self.current_frame_index += 1
+        self.last_frame_timestamp = timestamp
+        self.last_frame_pts = pts
+
+        # Ожидание срока выдачи после декодирования, а не перед ним
+        self.pacer.wait(pts)
+
+    def _wait_for_frame(self) -> Tuple[bool, Optional[np.ndarray], float]:
+        """
+        Ожидание кадра от фонового потока захвата под наблюдением сторожа.
+
+        Returns:
+            Кортеж (успех, кадр, время захвата)
+        """
+        wait = self.frame_wait_timeout
+        if self.watchdog_active:
+            wait = min(wait, self.watchdog_deadline)
+
+        waited = 0.0
+        while self.grabber is not None:
+            ret, frame, timestamp = self.grabber.get_latest(wait)
+            if ret:
+                return ret, frame, timestamp
+
+            # Во время переподключения продолжаем ждать кадр
+            if self._reconnecting():
+                continue
+
+            stall = self.grabber.seconds_since_frame()
+            if (
+                self.watchdog_active
+                and not self.grabber.finished
+                and stall >= self.watchdog_deadline
+            ):
+                self.stall_durations.append(stall)
+                if not self._recycle_capture(stall):
+                    break
+                waited = 0.0
+                continue
+
+            waited += wait
+            if self.grabber.finished or waited >= self.frame_wait_timeout:
+                break
+
+        return False, None, 0.0
+
+    def _reconnecting(self) -> bool:
+        """True, если супервизор восстанавливает подключение."""
+        return (
+            self.is_open
+            and self.supervisor is not None
+            and self.supervisor.in_outage
+            and self.grabber is not None
+            and not self.grabber.finished
+        )
+
+    def skip_frames(self, count: int) -> bool:
+        """
+        Пропуск кадров без их полного получения.
+
+        Кадры захватываются через grab() без retrieve(): пропускаются
+        преобразование в BGR, изменение размера и запись в буфер истории.
+
+        Args:
+            count: Количество пропускаемых кадров
+
+        Returns:
+            True, если все кадры успешно пропущены
+        """
+        if not self.is_open or self.cap is None:
+            logger.error("Видеопоток не открыт")
+            return False
+
+        # Пропущенные кадры сдвигают расписание без ожидания на каждом
+        self.pacer.skip(count)
+
+        for _ in range(count):
+            if self.grabber is not None:
+                # Фоновый поток декодирует сам - просто отдаем кадр
+                ret, _, _ = self.grabber.get_latest(self.frame_wait_timeout)
+            else:
+                try:
+                    ret = self._grab_from_capture()
+                except Exception as e:
+                    logger.error(f"Ошибка при пропуске кадра: {str(e)}")
+                    return False
+
+            if not ret:
+                logger.debug("Не удалось пропустить кадр")
+                return False
+
+            self.current_frame_index += 1
+
+        return True
+
+    def _grab_from_capture(self) -> bool:
+        """
+        Захват кадра без получения (grab) с зацикливанием видеофайла.
+
+        Returns:
+            True, если кадр захвачен
+        """
+        generation = self._capture_generation
+        with self._cap_lock:
+            cap = self.cap
+            ret = cap.grab()
+
+            if generation != self._capture_generation:
+                # Захват был брошен сторожем, пока чтение было заблокировано
+                cap.release()
+                return False
+
+            if not ret and self.loop_video and not self.is_live and self.frame_count > 0:
+                self._rewind()
+                ret = self.cap.grab()
+
+            while not ret and self._reconnect(generation):
+                ret = self.cap.grab()
+
+        if ret and self.supervisor is not None:
+            self.supervisor.on_frame()
+        return ret
+
+    def _retrieve_from_capture(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Получение последнего захваченного кадра (retrieve) с изменением размера.
+
+        Returns:
+            Кортеж (успех, кадр)
+        """
+        with self._cap_lock:
+            ret, frame = self.cap.retrieve()
+
+        if not ret:
+            return False, None
+
+        resize_width = self.config.get("video.resize_width", 0)
+        resize_height = self.config.get("video.resize_height", 0)
+        if resize_width > 0 and resize_height > 0:
+            frame = cv2.resize(frame, (resize_width, resize_height))
+
+        return True, frame
+
+    def request_frame(self) -> None:
+        """
+        Запрос кадра в ленивом режиме захвата.
+
+        Кадр, захваченный сразу после запроса, будет декодирован в BGR и
+        выдан следующим вызовом read_frame(). Позволяет запросить кадр
+        заранее, чтобы он был выровнен по времени с моментом запроса.
+        """
+        if self.grabber is not None and self.grabber.lazy:
+            self.grabber.request()
+
+    def set_decoder_skip(self, frame_skip: int, discard_nonref: bool = False) -> bool:
+        """
+        Передача пропуска кадров в декодер.
+
+        Поддерживается бэкендом ffmpeg: лишние кадры отбрасываются в графе
+        фильтров, а при discard_nonref декодер вообще не декодирует
+        неопорные кадры. Вызывается до open().
+
+        Args:
+            frame_skip: Обрабатывать каждый N-й кадр
+            discard_nonref: Разрешить декодеру отбрасывать неопорные кадры
+
+        Returns:
+            True, если пропуск кадров будет выполняться декодером
+        """
+        if frame_skip <= 1:
+            return False
+
+        if self.backend != "ffmpeg" or self.is_shared or self.is_cached:
+            logger.warning(
+                "Пропуск кадров в декодере поддерживается только бэкендом ffmpeg, "
+                "используется grab() без retrieve()"
+            )
+            return False
+
+        self.decoder_frame_skip = frame_skip
+        self.decoder_discard_nonref = discard_nonref
+        logger.info(
+            f"Пропуск кадров в декодере: каждый {frame_skip}-й кадр"
+            f"{', неопорные кадры отбрасываются' if discard_nonref else ''}"
+        )
+        return True
+
+    def _output_frame_shape(self) -> Tuple[int, int, int]:
+        """
+        Ожидаемый размер кадра после предобработки.
+
+        Returns:
+            Размер кадра (height, width, channels)
+        """
+        resize_width = self.config.get("video.resize_width", 0)
+        resize_height = self.config.get("video.resize_height", 0)
+        if resize_width > 0 and resize_height > 0:
+            return (resize_height, resize_width, 3)
+        return self.frame_buffer.frame_shape or (self.height, self.width, 3)
+
+    def _read_from_capture(
+        self, out: Optional[np.ndarray] = None
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Чтение и предобработка одного кадра непосредственно из захвата.
+
+        Используется как в синхронном режиме, так и фоновым потоком захвата.
+
+        Args:
+            out: Массив, в который нужно записать кадр (None - выделить новый)
+
+        Returns:
+            Кортеж (успех, кадр)
+        """
+        resize_width = self.config.get("video.resize_width", 0)
+        resize_height = self.config.get("video.resize_height", 0)
+        need_resize = resize_width > 0 and resize_height > 0
+
+        # Без изменения размера декодируем сразу в целевой массив,
+        # иначе - в переиспользуемый промежуточный буфер
+        target = self._decode_buffer if need_resize else out
+
+        generation = self._capture_generation
+        with self._cap_lock:
+            cap = self.cap
+            ret, frame = self._read_into(target, cap)
+
+            if generation != self._capture_generation:
+                # Захват был брошен сторожем, пока чтение было заблокировано
+                cap.release()
+                return False, None
 
             # Если достигнут конец видео и включено зацикливание
             if (
                 not ret
                 and self.loop_video
-                and not self.is_rtsp
+                and not self.is_live
                 and self.frame_count > 0
             ):
-                logger.info("Достигнут конец видео, перезапуск с начала")
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                ret, frame = self.cap.read()
-                self.current_frame_index = 0
+                self._rewind()
+                ret, frame = self._read_into(target, self.cap)
 
-            if ret:
-                # Изменяем размер кадра, если указаны параметры
-                resize_width = config.get("video.resize_width", 0)
-                resize_height = config.get("video.resize_height", 0)
+            # Обрыв живого потока - переподключаемся без остановки системы
+            while not ret and self._reconnect(generation):
+                ret, frame = self._read_into(target, self.cap)
 
-                if resize_width > 0 and resize_height > 0:
-                    frame = cv2.resize(frame, (resize_width, resize_height))
+        if not ret:
+            return False, None
 
-                # Добавляем кадр в буфер
-                self.frame_buffer.append(frame.copy())
+        if self.supervisor is not None:
+            self.supervisor.on_frame()
 
-                # Увеличиваем счетчик кадров
-                self.current_frame_index += 1
-
-                return True, frame
+        # Изменяем размер кадра, если указаны параметры
+        if need_resize:
+            self._decode_buffer = frame
+            if out is not None and out.shape == (resize_height, resize_width, 3):
+                frame = cv2.resize(frame, (resize_width, resize_height), dst=out)
             else:
-                logger.debug("Не удалось прочитать кадр")
-                return False, np.zeros((480, 640, 3), dtype=np.uint8)
-        except Exception as e:
-            logger.error(f"Ошибка при чтении кадра: {str(e)}")
-            return False, np.zeros((480, 640, 3), dtype=np.uint8)
+                frame = cv2.resize(frame, (resize_width, resize_height))
+
+        return True, frame
+
+    def _read_into(
+        self, image: Optional[np.ndarray], cap: Any
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Чтение кадра из захвата с декодированием в указанный массив.
+
+        Args:
+            image: Массив для записи кадра (None - выделить новый)
+            cap: Захват, из которого читается кадр
+
+        Returns:
+            Кортеж (успех, кадр)
+        """
+        if image is None:
+            return cap.read()
+        return cap.read(image=image)
+
+    def get_seek_index(self) -> Optional[KeyframeIndex]:
+        """
+        Получение индекса ключевых кадров файла.
+
+        При первом вызове индекс загружается из файла рядом с видео или
+        строится и сохраняется.
+
+        Returns:
+            Индекс или None, если он недоступен (живой поток, ошибка, отключен)
+        """
+        if not self._seek_index_loaded:
+            self._seek_index_loaded = True
+            # Кэш кадров перематывается точно и без индекса
+            if (
+                self.seek_index_enabled
+                and not self.is_live
+                and not self.is_cached
+                and self.source
+            ):
+                self.seek_index = KeyframeIndex.load_or_build(self.source)
+        return self.seek_index
+
+    def _read_at(self, frame_index: int) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Чтение кадра с указанным номером.
+
+        Если кадр находится между текущей позицией и ближайшим предшествующим
+        ему ключевым кадром, декодирование продолжается вперед без перемотки.
+        Иначе выполняется перемотка, после которой позиция сверяется со
+        временем кадра из индекса. Вызывается при захваченной блокировке _cap_lock.
+
+        Args:
+            frame_index: Номер кадра
+
+        Returns:
+            Кортеж (успех, кадр)
+        """
+        index = self.get_seek_index()
+        if index is None:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            return self.cap.read()
+
+        frame_index = min(max(0, frame_index), index.frame_count - 1)
+        cached = self._seek_cache.get(frame_index)
+        if cached is not None:
+            self._seek_cache.move_to_end(frame_index)
+            self.seek_stats["cached"] += 1
+            return True, cached.copy()
+
+        position = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        keyframe = index.keyframe_before(frame_index)
+        first = frame_index  # Первый кадр, который будет получен полностью
+        if keyframe <= position <= frame_index:
+            # Декодирование вперед дешевле, чем перемотка к ключевому кадру
+            self.seek_stats["forward"] += 1
+        else:
+            if position > frame_index and self.seek_cache_frames > 0:
+                # При шаге назад сохраняем и предшествующие кадры того же GOP:
+                # следующие шаги назад не потребуют новой перемотки
+                first = max(keyframe, frame_index - self.seek_cache_frames + 1)
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+            self.seek_stats["jumps"] += 1
+            position = first
+
+        for _ in range(first - position):
+            if not self.cap.grab():
+                return False, None
+
+        ret, frame = self._read_verified(index, first)
+        for current in range(first + 1, frame_index + 1):
+            if not ret:
+                break
+            self._cache_seek_frame(current - 1, frame)
+            ret, frame = self._read_verified(index, current)
+
+        return ret, frame
+
+    def _read_verified(
+        self, index: KeyframeIndex, frame_index: int
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Чтение кадра со сверкой его времени с индексом.
+
+        Перемотка OpenCV может остановиться раньше нужного кадра - тогда
+        недостающие кадры дочитываются.
+
+        Args:
+            index: Индекс ключевых кадров
+            frame_index: Ожидаемый номер кадра
+
+        Returns:
+            Кортеж (успех, кадр)
+        """
+        ret, frame = self.cap.read()
+        expected = index.pts_of(frame_index)
+        tolerance = 500.0 / index.fps if index.fps > 0 else 1.0
+        while ret and self.cap.get(cv2.CAP_PROP_POS_MSEC) + tolerance < expected:
+            self.seek_stats["corrections"] += 1
+            ret, frame = self.cap.read()
+        return ret, frame
+
+    def _cache_seek_frame(self, frame_index: int, frame: np.ndarray) -> None:
+        """Сохранение кадра в кэше перемотки с вытеснением самого старого."""
+        self._seek_cache[frame_index] = frame
+        self._seek_cache.move_to_end(frame_index)
+        while len(self._seek_cache) > self.seek_cache_frames:
+            self._seek_cache.popitem(last=False)
 
     def get_frame_at_position(self, position_seconds: float) -> Tuple[bool, np.ndarray]:
         """
@@ -195,19 +1090,20 @@ class VideoReader:
             logger.error("Видеопоток не открыт")
             return False, np.zeros((480, 640, 3), dtype=np.uint8)
 
-        if self.is_rtsp:
-            logger.warning("Невозможно перемотать RTSP-поток")
+        if self.is_live:
+            logger.warning("Невозможно перемотать живой поток")
             return False, np.zeros((480, 640, 3), dtype=np.uint8)
 
         try:
-            # Вычисляем номер кадра
-            frame_number = int(position_seconds * self.fps)
-
-            # Устанавливаем позицию
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            # Вычисляем номер кадра (по индексу - с учетом переменного FPS)
+            index = self.get_seek_index()
+            if index is not None:
+                frame_number = index.frame_at(position_seconds)
+            else:
+                frame_number = int(position_seconds * self.fps)
 
-            # Читаем кадр
-            ret, frame = self.cap.read()
+            with self._cap_lock:
+                ret, frame = self._read_at(frame_number)
 
             if ret:
                 return True, frame
@@ -234,16 +1130,13 @@ class VideoReader:
             logger.error("Видеопоток не открыт")
             return False, np.zeros((480, 640, 3), dtype=np.uint8)
 
-        if self.is_rtsp:
-            logger.warning("Невозможно перемотать RTSP-поток")
+        if self.is_live:
+            logger.warning("Невозможно перемотать живой поток")
             return False, np.zeros((480, 640, 3), dtype=np.uint8)
 
         try:
-            # Устанавливаем позицию
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
-
-            # Читаем кадр
-            ret, frame = self.cap.read()
+            with self._cap_lock:
+                ret, frame = self._read_at(frame_index)
 
             if ret:
                 return True, frame
@@ -254,28 +1147,31 @@ class VideoReader:
             logger.error(f"Ошибка при получении кадра по индексу: {str(e)}")
             return False, np.zeros((480, 640, 3), dtype=np.uint8)
 
-    def get_buffered_frame(self, offset: int = 0) -> Tuple[bool, np.ndarray]:
+    def get_buffered_frame(
+        self, offset: int = 0, copy: bool = False
+    ) -> Tuple[bool, np.ndarray]:
         """
         Получение кадра из буфера с указанным смещением от текущего.
 
+        По умолчанию возвращается представление слота буфера без копирования:
+        оно остается действительным, пока слот не будет перезаписан новыми кадрами.
+
         Args:
             offset: Смещение от текущего кадра (-1 для предыдущего, -2 для пред-предыдущего и т.д.)
+            copy: Вернуть копию кадра вместо представления
 
         Returns:
             Кортеж (успех, кадр)
         """
-        if not self.frame_buffer:
+        if not len(self.frame_buffer):
             return False, np.zeros((480, 640, 3), dtype=np.uint8)
 
         try:
-            # Вычисляем индекс в буфере
-            buffer_index = len(self.frame_buffer) + offset if offset < 0 else offset
-
-            # Проверяем границы
-            if 0 <= buffer_index < len(self.frame_buffer):
-                return True, self.frame_buffer[buffer_index].copy()
+            frame = self.frame_buffer.get(offset, copy=copy)
+            if frame is not None:
+                return True, frame
             else:
-                logger.error(f"Индекс {buffer_index} выходит за границы буфера")
+                logger.error(f"Смещение {offset} выходит за границы буфера")
                 return False, np.zeros((480, 640, 3), dtype=np.uint8)
         except Exception as e:
             logger.error(f"Ошибка при получении кадра из буфера: {str(e)}")
@@ -283,6 +1179,29 @@ class VideoReader:
 
     def close(self) -> None:
         """Закрытие видеопотока."""
+        if self.supervisor is not None:
+            self.supervisor.close()
+
+        if self.grabber is not None:
+            self.grabber.stop()
+            self.grabber = None
+
+        if self.supervisor is not None:
+            stats = self.supervisor.get_stats()
+            if stats["outages"]:
+                logger.info(
+                    f"Обрывов связи: {stats['outages']}, суммарно {stats['outage_total']:.1f} с, "
+                    f"средняя задержка переподключения {stats['reconnect_latency_avg']:.2f} с"
+                )
+            self.supervisor = None
+
+        if self.pacer.enabled and self.pacer.frames > 1:
+            stats = self.pacer.get_stats()
+            logger.info(
+                f"Выдача кадров ({stats['mode']}): достигнуто {stats['achieved_fps']:.2f} FPS "
+                f"при целевых {stats['target_fps']:.2f}, опозданий: {stats['late_frames']}"
+            )
+
         if self.cap is not None:
             self.cap.release()
             self.is_open = False
@@ -331,13 +1250,36 @@ class VideoReader:
             "fps": self.fps,
             "frame_count": self.frame_count,
             "is_rtsp": self.is_rtsp,
+            "is_shared": self.is_shared,
+            "is_cached": self.is_cached,
+            "backend": self.backend,
+            "seek_stats": dict(self.seek_stats),
             "is_open": self.is_open,
             "current_frame": self.current_frame_index,
             "buffer_size": self.buffer_size,
             "loop_video": self.loop_video,
             "target_fps": self.target_fps,
+            "pacing": self.pacer.get_stats(),
+            "capture_mode": self.capture_mode,
+            "last_frame_timestamp": self.last_frame_timestamp,
+            "capture_stats": self.get_capture_stats(),
+            "connection_stats": self.get_connection_stats(),
+            "stall_count": self.stall_count,
+            "stall_durations": list(self.stall_durations),
         }
 
+    def get_capture_stats(self) -> Dict[str, Any]:
+        """
+        Получение статистики фонового захвата.
+
+        Returns:
+            Словарь со счетчиками отброшенных и устаревших кадров
+            (пустой, если фоновый захват не используется)
+        """
+        if self.grabber is None:
+            return {}
+        return self.grabber.get_stats()
+
 
 def get_video_info(source: str) -> dict:
     """
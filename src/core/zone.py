@@ -5,8 +5,9 @@
 import cv2
 import numpy as np
 import json
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Any, Tuple, Union, Optional
+from typing import List, Dict, Any, Deque, Tuple, Union, Optional
 
 from shapely.geometry import Point, Polygon
 from src.utils.logger import logger
@@ -33,6 +34,8 @@ class Zone:
         self.points = points
         self.name = name
         self.color = color
+        # Точки в исходном разрешении файла зон (для повторного пересчета)
+        self.original_points: Optional[List[List[int]]] = None
 
         # Создаем полигон для проверки вхождения точек
         self.polygon = Polygon(points)
@@ -168,7 +171,9 @@ class ZoneManager:
                         f"Зона '{name}' масштабирована с {self.original_resolution} на {self.target_resolution}"
                     )
 
-                self.zones.append(Zone(points, name, color))
+                zone = Zone(points, name, color)
+                zone.original_points = zone_data.get("points", [])
+                self.zones.append(zone)
 
             logger.info(f"Загружено {len(self.zones)} зон из {self.zones_file}")
         except Exception as e:
@@ -344,13 +349,25 @@ class ZoneManager:
 
         return scaled_points
 
-    def set_target_resolution(self, resolution: Tuple[int, int]) -> None:
+    def set_target_resolution(
+        self,
+        resolution: Tuple[int, int],
+        crop: Optional[Tuple[int, int, int, int]] = None,
+        source_resolution: Optional[Tuple[int, int]] = None,
+    ) -> None:
         """
         Установка целевого разрешения и автоматическое масштабирование существующих зон.
 
         Args:
             resolution: Целевое разрешение (width, height)
+            crop: Область обрезки (x, y, width, height) в пикселях исходного кадра,
+                если кадр был обрезан перед масштабированием
+            source_resolution: Разрешение исходного кадра до обрезки
         """
+        if crop is not None:
+            self._apply_crop(resolution, crop, source_resolution)
+            return
+
         if self.target_resolution == resolution:
             return
 
@@ -378,3 +395,163 @@ class ZoneManager:
 
                 # Пересоздаем полигон
                 zone.polygon = Polygon(zone.points)
+
+    def _apply_crop(
+        self,
+        resolution: Tuple[int, int],
+        crop: Tuple[int, int, int, int],
+        source_resolution: Optional[Tuple[int, int]],
+    ) -> None:
+        """
+        Пересчет зон в координаты обрезанного и масштабированного кадра.
+
+        Args:
+            resolution: Разрешение итогового кадра (width, height)
+            crop: Область обрезки (x, y, width, height) в пикселях исходного кадра
+            source_resolution: Разрешение исходного кадра до обрезки
+        """
+        crop_x, crop_y, crop_width, crop_height = crop
+        source_resolution = source_resolution or self.original_resolution
+
+        logger.info(
+            f"Пересчет зон для области {crop} кадра {source_resolution} "
+            f"с масштабированием на {resolution}"
+        )
+
+        for zone in self.zones:
+            points = zone.original_points or zone.points
+            if self.original_resolution and source_resolution:
+                points = self._scale_points(
+                    points, self.original_resolution, source_resolution
+                )
+            shifted = [[x - crop_x, y - crop_y] for x, y in points]
+            zone.points = self._scale_points(
+                shifted, (crop_width, crop_height), resolution
+            )
+            zone.polygon = Polygon(zone.points)
+
+        self.target_resolution = resolution
+
+
+class ZoneHistory:
+    """
+    История присутствия людей в зонах с правилом подтверждения.
+
+    Правило задается во времени ("присутствие не менее confirm_seconds за
+    последние window_seconds"), поэтому не зависит от FPS камеры, пропуска
+    кадров и скорости инференса. Каждое наблюдение покрывает интервал от
+    предыдущего наблюдения до своего времени, но не больше
+    max_sample_interval; при max_sample_interval = 0 предел вычисляется по
+    медиане последних интервалов между кадрами (удвоенной, не меньше 0.5 с и
+    не больше окна), поэтому правило выполнимо и при обработке медленнее
+    2 кадров в секунду. При window_seconds <= 0 используется прежнее правило
+    по количеству кадров.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 2.0,
+        confirm_seconds: float = 1.0,
+        max_sample_interval: float = 0.0,
+        window_frames: int = 10,
+        min_frames: int = 5,
+    ):
+        """
+        Инициализация истории.
+
+        Args:
+            window_seconds: Длина окна в секундах (0 - правило по кадрам)
+            confirm_seconds: Необходимое время присутствия в окне в секундах
+            max_sample_interval: Максимальный интервал, который может покрыть
+                одно наблюдение (ограничивает вес кадра после паузы);
+                0 - по измеренному интервалу между кадрами
+            window_frames: Размер окна в кадрах для правила по кадрам
+            min_frames: Необходимое количество кадров с присутствием
+        """
+        self.window_seconds = window_seconds
+        self.confirm_seconds = confirm_seconds
+        self.max_sample_interval = max_sample_interval
+        self.window_frames = window_frames
+        self.min_frames = min_frames
+        self.time_based = window_seconds > 0
+        # Последние интервалы между кадрами для автоматического предела
+        self._intervals: Deque[float] = deque(maxlen=16)
+
+        # Наблюдения (время кадра, присутствие, покрываемый интервал)
+        self._samples: Deque[Tuple[float, bool, float]] = deque(
+            maxlen=None if self.time_based else window_frames
+        )
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def append(self, timestamp: float, present: bool) -> None:
+        """
+        Добавление наблюдения.
+
+        Args:
+            timestamp: Время кадра в секундах
+            present: Есть ли человек хотя бы в одной зоне
+        """
+        if not self.time_based:
+            self._samples.append((timestamp, present, 1.0))
+            return
+
+        if self._samples and timestamp < self._samples[-1][0]:
+            # Шкала времени сбросилась - старые наблюдения несопоставимы
+            self._samples.clear()
+
+        duration = 0.0
+        if self._samples:
+            interval = timestamp - self._samples[-1][0]
+            self._intervals.append(interval)
+            duration = min(interval, self._sample_limit())
+        self._samples.append((timestamp, present, duration))
+
+        window_start = timestamp - self.window_seconds
+        while self._samples and self._samples[0][0] <= window_start:
+            self._samples.popleft()
+
+    def _sample_limit(self) -> float:
+        """Максимальный интервал, который может покрыть одно наблюдение."""
+        if self.max_sample_interval > 0:
+            return self.max_sample_interval
+        # Медиана не чувствительна к единичным паузам потока
+        typical = sorted(self._intervals)[len(self._intervals) // 2]
+        return min(self.window_seconds, max(0.5, 2 * typical))
+
+    def present_amount(self) -> float:
+        """
+        Время присутствия в окне (в секундах или кадрах для правила по кадрам).
+
+        Returns:
+            Суммарное время присутствия
+        """
+        if not self.time_based:
+            return float(sum(present for _, present, _ in self._samples))
+        if not self._samples:
+            return 0.0
+
+        window_start = self._samples[-1][0] - self.window_seconds
+        return sum(
+            min(duration, timestamp - window_start)
+            for timestamp, present, duration in self._samples
+            if present
+        )
+
+    def is_confirmed(self) -> bool:
+        """True, если присутствие подтверждено правилом."""
+        if self.time_based:
+            return self.present_amount() >= self.confirm_seconds
+        return self.present_amount() >= self.min_frames
+
+    def describe(self) -> str:
+        """Текстовое описание состояния для логов и отображения."""
+        if self.time_based:
+            return f"{self.present_amount():.1f}/{self.confirm_seconds:.1f}s"
+        return f"{int(self.present_amount())}/{self.window_frames}"
+
+    def clear(self) -> None:
+        """Очистка истории."""
+        self._samples.clear()
+        self._intervals.clear()
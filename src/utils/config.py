@@ -87,13 +87,14 @@ class Config:
 
         return value
 
-    def set(self, key: str, value: Any) -> None:
+    def set(self, key: str, value: Any, save: bool = True) -> None:
         """
         Установка значения в конфигурацию.
 
         Args:
             key: Ключ в формате "section.key"
             value: Значение для установки
+            save: Сохранить конфигурацию в файл (False - изменить только в памяти)
         """
         parts = key.split(".")
         config = self.config
@@ -108,7 +109,8 @@ class Config:
         config[parts[-1]] = value
 
         # Сохраняем изменения
-        self.save()
+        if save:
+            self.save()
 
     def load_zones(self) -> Dict[str, Any]:
         """
@@ -142,5 +144,94 @@ class Config:
             json.dump(zones_data, f, indent=4)
 
 
+class ScopedConfig:
+    """
+    Конфигурация с локальными переопределениями поверх общей.
+
+    Используется для камер в многокамерном режиме: ключи из overrides
+    имеют приоритет, остальные читаются из базовой конфигурации.
+    """
+
+    def __init__(self, base: Union[Config, "ScopedConfig"], overrides: Dict[str, Any]):
+        """
+        Инициализация конфигурации.
+
+        Args:
+            base: Базовая конфигурация
+            overrides: Переопределения в виде вложенного словаря
+                ({"detection": {"frame_skip": 3}}) или с ключами "section.key"
+        """
+        self.base = base
+        self.overrides: Dict[str, Any] = {}
+        for key, value in (overrides or {}).items():
+            if isinstance(value, dict) and "." not in key:
+                for sub_key, sub_value in _flatten(value, key).items():
+                    self.set(sub_key, sub_value)
+            else:
+                self.set(key, value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Получение значения с учетом переопределений.
+
+        Args:
+            key: Ключ в формате "section.key"
+            default: Значение по умолчанию, если ключ не найден
+
+        Returns:
+            Значение из переопределений или базовой конфигурации; для
+            частично переопределенной секции - секция базовой конфигурации
+            с наложенными переопределениями
+        """
+        value = self.overrides
+        for part in key.split("."):
+            if not isinstance(value, dict) or part not in value:
+                return self.base.get(key, default)
+            value = value[part]
+        if isinstance(value, dict):
+            base_value = self.base.get(key)
+            if isinstance(base_value, dict):
+                return _merge(base_value, value)
+        return value
+
+    def set(self, key: str, value: Any, save: bool = False) -> None:
+        """
+        Установка переопределения (только в памяти, базовая конфигурация не меняется).
+
+        Args:
+            key: Ключ в формате "section.key"
+            value: Значение для установки
+            save: Не используется, оставлен для совместимости с Config.set
+        """
+        parts = key.split(".")
+        overrides = self.overrides
+        for part in parts[:-1]:
+            overrides = overrides.setdefault(part, {})
+        overrides[parts[-1]] = value
+
+
+def _merge(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Рекурсивное наложение переопределений на копию секции."""
+    result = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = _merge(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+def _flatten(value: Dict[str, Any], prefix: str) -> Dict[str, Any]:
+    """Преобразование вложенного словаря в ключи вида "section.key"."""
+    result = {}
+    for key, sub_value in value.items():
+        full_key = f"{prefix}.{key}"
+        if isinstance(sub_value, dict) and sub_value:
+            result.update(_flatten(sub_value, full_key))
+        else:
+            result[full_key] = sub_value
+    return result
+
+
 # Глобальный экземпляр конфигурации
 config = Config()
@@ -0,0 +1,196 @@
+"""
+Модуль распределения потоков между подсистемами с учетом квоты CPU.
+
+В контейнере с ограничением cpus torch, OpenMP и OpenCV по умолчанию создают
+пулы потоков по числу ядер хоста, и потоки конкурируют за квоту. Бюджет
+вычисляется по квоте cgroup (v1 и v2) и маске привязки процесса и
+распределяется между подсистемами:
+    decode    - потоки декодера ffmpeg и захвата OpenCV
+    inference - потоки инференса (ONNX Runtime, OpenVINO, torch, OpenMP)
+    opencv    - пул OpenCV (масштабирование, letterbox, отрисовка, кодирование
+                снимков)
+
+Значения секции threads конфигурации, отличные от 0, заменяют вычисленные.
+"""
+
+import math
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import cv2
+
+from src.utils.config import Config, ScopedConfig, config
+from src.utils.logger import logger
+
+_budget: Optional[Dict[str, int]] = None
+
+
+def _cgroup_v2_quota() -> Optional[float]:
+    """Квота из cpu.max (cgroup v2) группы процесса или корня иерархии."""
+    root = Path("/sys/fs/cgroup")
+    candidates = [root / "cpu.max"]
+    try:
+        for line in Path("/proc/self/cgroup").read_text().splitlines():
+            if line.startswith("0::"):
+                candidates.insert(0, root / line[3:].lstrip("/") / "cpu.max")
+    except OSError:
+        pass
+
+    for path in candidates:
+        try:
+            quota, period = path.read_text().split()[:2]
+        except (OSError, ValueError):
+            continue
+        if quota == "max":
+            return None
+        return int(quota) / int(period)
+    return None
+
+
+def _cgroup_v1_quota() -> Optional[float]:
+    """Квота из cpu.cfs_quota_us и cpu.cfs_period_us (cgroup v1)."""
+    for directory in ("/sys/fs/cgroup/cpu", "/sys/fs/cgroup/cpu,cpuacct"):
+        try:
+            quota = int(Path(directory, "cpu.cfs_quota_us").read_text())
+            period = int(Path(directory, "cpu.cfs_period_us").read_text())
+        except (OSError, ValueError):
+            continue
+        return quota / period if quota > 0 and period > 0 else None
+    return None
+
+
+def detect_cpu_quota() -> Dict[str, Union[float, int, str]]:
+    """
+    Определение доступного процессу числа CPU.
+
+    Returns:
+        Словарь: cpus (эффективное число CPU), quota (квота cgroup или 0),
+        affinity (CPU в маске привязки), source (источник ограничения)
+    """
+    try:
+        affinity = len(os.sched_getaffinity(0))
+    except AttributeError:
+        affinity = os.cpu_count() or 1
+
+    quota = _cgroup_v2_quota()
+    source = "cgroup v2"
+    if quota is None:
+        quota = _cgroup_v1_quota()
+        source = "cgroup v1"
+
+    if quota is not None and quota < affinity:
+        cpus = quota
+    else:
+        cpus = affinity
+        source = "маска привязки"
+    return {"cpus": cpus, "quota": quota or 0, "affinity": affinity, "source": source}
+
+
+def plan_thread_budget(cpus: float) -> Dict[str, int]:
+    """
+    Распределение потоков между подсистемами.
+
+    Декодирование идет параллельно инференсу и получает свою долю, а
+    предобработка выполняется в потоке камеры между инференсами, поэтому ее
+    пул не вычитается из доли инференса.
+
+    Args:
+        cpus: Доступное число CPU (может быть дробным)
+
+    Returns:
+        Словарь: cpus, decode, inference, opencv
+    """
+    total = max(1, math.floor(cpus + 0.5))
+    decode = 1 if total <= 4 else 2
+    inference = total if total <= 2 else total - decode
+    opencv = 1 if total <= 2 else min(4, total // 2)
+    return {"cpus": total, "decode": decode, "inference": inference, "opencv": opencv}
+
+
+def _apply_affinity(cpus: int) -> None:
+    """Привязка процесса к первым cpus доступным CPU."""
+    try:
+        allowed = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, allowed[:cpus])
+        logger.info(f"Процесс привязан к CPU {allowed[:cpus]}")
+    except (AttributeError, OSError) as e:
+        logger.warning(f"Не удалось привязать процесс к CPU: {str(e)}")
+
+
+def configure_threads(
+    settings: Optional[Union[Config, ScopedConfig]] = None,
+) -> Dict[str, int]:
+    """
+    Вычисление и применение бюджета потоков процесса.
+
+    Устанавливает пул OpenCV, переменные окружения OpenMP/BLAS (действуют
+    для библиотек, загружаемых позже, и дочерних процессов), потоки torch,
+    если он уже загружен, и при threads.affinity привязку к CPU. Число
+    потоков декодера захваты OpenCV получают через CAP_PROP_N_THREADS при
+    открытии (см. VideoReader._open_params), процесс ffmpeg - через -threads.
+
+    Args:
+        settings: Конфигурация (по умолчанию глобальная)
+
+    Returns:
+        Бюджет: cpus, decode, inference, opencv
+    """
+    global _budget
+
+    settings = settings or config
+    detected = detect_cpu_quota()
+    cpus = settings.get("threads.cpus", 0)
+    if cpus:
+        detected["source"] = "threads.cpus"
+    else:
+        cpus = detected["cpus"]
+    budget = plan_thread_budget(cpus)
+    for name in ("decode", "inference", "opencv"):
+        budget[name] = settings.get(f"threads.{name}", 0) or budget[name]
+
+    cv2.setNumThreads(budget["opencv"])
+    for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(budget["inference"])
+    if settings.get("threads.affinity", False):
+        _apply_affinity(budget["cpus"])
+
+    _budget = budget
+    configure_torch()
+
+    logger.info(
+        f"Бюджет потоков: CPU={budget['cpus']} ({detected['source']}, "
+        f"квота {detected['quota']:.2f}, ядер в маске {detected['affinity']}), "
+        f"декодирование={budget['decode']}, инференс={budget['inference']}, "
+        f"OpenCV={budget['opencv']}"
+    )
+    return budget
+
+
+def get_thread_budget() -> Dict[str, int]:
+    """
+    Бюджет потоков процесса (вычисляется при первом обращении).
+
+    Returns:
+        Бюджет: cpus, decode, inference, opencv
+    """
+    return _budget or configure_threads()
+
+
+def configure_torch(threads: Optional[int] = None) -> None:
+    """
+    Установка числа потоков torch, если он загружен.
+
+    Args:
+        threads: Число потоков (по умолчанию из бюджета инференса)
+    """
+    torch = sys.modules.get("torch")
+    threads = threads or (_budget or {}).get("inference")
+    if torch is None or not threads:
+        return
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Уже задано: допускается только до первого параллельного вызова